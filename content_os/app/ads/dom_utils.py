@@ -1,17 +1,87 @@
+from functools import lru_cache
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+from bs4.builder import builder_registry
+import soupsieve
+from typing import List, Dict, Any, Sequence, Union
+
+# lxml builds the same tree several times faster; html.parser is the pure-Python fallback
+DEFAULT_PARSER = "lxml" if builder_registry.lookup("lxml") else "html.parser"
+
+@lru_cache(maxsize=256)
+def compile_selectors(selectors: Sequence[str]) -> soupsieve.SoupSieve:
+    """
+    One compiled matcher for a group of CSS selectors, cached so rules are
+    compiled once per process rather than on every select().
+    """
+    return soupsieve.compile(", ".join(selectors))
+
+class HtmlDocument:
+    """
+    A page parsed once and shared by every HTML check (AdsLinter,
+    SEOValidator, lint scripts). Checks accept either raw HTML or an
+    HtmlDocument; pass the document to avoid reparsing.
+    """
+    def __init__(self, html: str, parser: str = None):
+        self.html = html
+        self.parser = parser or DEFAULT_PARSER
+        self.soup = BeautifulSoup(html, self.parser)
+        self._elements = None
+        self._positions = None
+        self._ends = None
+
+    @classmethod
+    def of(cls, html: Union[str, "HtmlDocument"]) -> "HtmlDocument":
+        return html if isinstance(html, HtmlDocument) else cls(html)
+
+    def select(self, selectors: Sequence[str]) -> List[Any]:
+        """
+        Elements matching any of the selectors, in document order.
+        """
+        return compile_selectors(tuple(selectors)).select(self.soup)
+
+    def exists(self, selectors: Sequence[str]) -> bool:
+        return compile_selectors(tuple(selectors)).select_one(self.soup) is not None
+
+    def elements(self) -> List[Any]:
+        """
+        Every element in document order, computed once.
+        """
+        if self._elements is None:
+            self._elements = self.soup.find_all(True)
+        return self._elements
+
+    def position(self, element: Any) -> int:
+        """
+        Index of an element in elements().
+        """
+        if self._positions is None:
+            self._positions = {id(el): i for i, el in enumerate(self.elements())}
+        return self._positions[id(element)]
+
+    def subtree_ends(self) -> List[int]:
+        """
+        For each element, the index of the last element inside it (itself
+        when it has no element children). One reverse pass, O(nodes).
+        """
+        if self._ends is None:
+            elements = self.elements()
+            ends = list(range(len(elements)))
+            for i in range(len(elements) - 1, -1, -1):
+                parent = elements[i].parent
+                if parent is not None and parent is not self.soup:
+                    p = self.position(parent)
+                    if ends[i] > ends[p]:
+                        ends[p] = ends[i]
+            self._ends = ends
+        return self._ends
 
 class DomUtils:
     @staticmethod
-    def find_elements(html: str, selectors: List[str]) -> List[Any]:
+    def find_elements(html: Union[str, HtmlDocument], selectors: List[str]) -> List[Any]:
         """
         Finds elements matching the given CSS selectors.
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        elements = []
-        for selector in selectors:
-            elements.extend(soup.select(selector))
-        return elements
+        return HtmlDocument.of(html).select(selectors)
 
     @staticmethod
     def get_element_info(element: Any) -> Dict[str, Any]:
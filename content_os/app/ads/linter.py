@@ -1,5 +1,41 @@
-from typing import List, Dict, Any
-from .dom_utils import DomUtils
+import math
+from bisect import bisect_left
+from typing import List, Dict, Any, Optional, Union
+from bs4.element import NavigableString, PreformattedString
+from .dom_utils import DomUtils, HtmlDocument, compile_selectors
+
+AD_SELECTORS = (".ad-unit", "ins.adsbygoogle", ".cos-ad")
+
+# Rough rendered heights (px) for the vertical distance estimate
+LINE_HEIGHT_PX = 24
+CHARS_PER_LINE = 40
+BLOCK_MARGIN_PX = 16
+FIXED_HEIGHT_PX = {"h1": 48, "h2": 40, "h3": 32, "h4": 28, "hr": 24, "img": 240, "picture": 240,
+                   "video": 320, "iframe": 320, "embed": 320, "canvas": 240, "svg": 120}
+# Elements whose text never renders
+SKIPPED_TAGS = {"script", "style", "template", "noscript", "head", "title", "meta", "link"}
+
+def estimate_height(element: Any) -> Optional[int]:
+    """
+    Estimated height in px of an element's own content (not its children),
+    or None if it renders nothing by itself (pure containers).
+    """
+    name = element.name
+    if name in SKIPPED_TAGS:
+        return None
+    if name in FIXED_HEIGHT_PX:
+        height = element.get("height")
+        if height and str(height).isdigit():
+            return int(height)
+        return FIXED_HEIGHT_PX[name]
+    # Direct text only; comments, CDATA and doctypes are PreformattedString
+    text = "".join(
+        child for child in element.children
+        if isinstance(child, NavigableString) and not isinstance(child, PreformattedString)
+    ).strip()
+    if not text:
+        return None
+    return math.ceil(len(text) / CHARS_PER_LINE) * LINE_HEIGHT_PX + BLOCK_MARGIN_PX
 
 class AdsLinter:
     def __init__(self, config: Dict[str, Any]):
@@ -7,39 +43,101 @@ class AdsLinter:
         self.rules = config.get("ads_ux", {}).get("rules", {})
         self.min_dist = self.rules.get("min_distance_from_cta_px", 120)
         self.forbidden_near = self.rules.get("forbid_near_elements", ["button", "input", "select"])
+        # Content nodes allowed between an ad and an interactive element before it stops counting as adjacent
+        self.max_adjacent_nodes = self.rules.get("max_adjacent_nodes", 0)
+        self.interactive_selectors = tuple(self.forbidden_near) + (".cta-button",)
+        # Compiled once per linter, reused for every page
+        self._ad_matcher = compile_selectors(AD_SELECTORS)
+        self._interactive_matcher = compile_selectors(self.interactive_selectors)
 
-    def lint(self, html: str) -> Dict[str, Any]:
+    def lint(self, html: Union[str, HtmlDocument]) -> Dict[str, Any]:
         """
         Performs static analysis on HTML to find UX violations in ad placement.
-        Note: Since this is static analysis, 'distance' is approximated by DOM proximity.
+
+        One document-order pass records every content node's estimated height
+        as prefix sums. For each ad, the nearest interactive element before and
+        after it is found by binary search. The content between them gives the
+        node gap and the estimated vertical distance. A gap of at most
+        max_adjacent_nodes is a REJECT. A larger gap that is still estimated
+        closer than min_distance_from_cta_px is a warning, since the pixel
+        figure is only an estimate. The whole page is O(nodes).
         """
         violations = []
-        
-        # 1. Find all ads (assuming they have a specific class or tag)
-        ads = DomUtils.find_elements(html, [".ad-unit", "ins.adsbygoogle", ".cos-ad"])
-        
-        # 2. Find interactive elements
-        interactive_selectors = [f"{tag}" for tag in self.forbidden_near]
-        interactive_selectors.append(".cta-button")
-        interactive_elements = DomUtils.find_elements(html, interactive_selectors)
+        warnings = []
+        doc = HtmlDocument.of(html)
+        elements = doc.elements()
+        ends = doc.subtree_ends()
+
+        # 1. Prefix sums of content nodes and their estimated heights in document order
+        nodes = [0] * (len(elements) + 1)
+        heights = [0] * (len(elements) + 1)
+        for i, element in enumerate(elements):
+            height = estimate_height(element)
+            nodes[i + 1] = nodes[i] + (height is not None)
+            heights[i + 1] = heights[i] + (height or 0)
+
+        # 2. Ads and interactive elements as document positions
+        ads = self._ad_matcher.select(doc.soup)
+        starts = [doc.position(el) for el in self._interactive_matcher.select(doc.soup)]
 
         for ad in ads:
-            ad_info = DomUtils.get_element_info(ad)
-            
-            # Check immediate siblings for forbidden elements
-            # This is a simplified proxy for 'distance' in static analysis
-            siblings = ad.find_next_siblings() + ad.find_previous_siblings()
-            for sibling in siblings:
-                if sibling.name in self.forbidden_near or "cta-button" in sibling.get('class', []):
-                    violations.append({
-                        "level": "REJECT",
-                        "message": f"Ad is immediately adjacent to interactive element: <{sibling.name}>",
-                        "ad": ad_info,
-                        "offending_element": DomUtils.get_element_info(sibling)
-                    })
+            ad_start = doc.position(ad)
+            ad_end = ends[ad_start]
+            ad_info = None
+            for side, pos in (("after", self._next_after(starts, ad_end)),
+                              ("before", self._last_before(starts, ends, ad_start))):
+                if pos is None:
+                    continue
+                if side == "after":
+                    gap = nodes[pos] - nodes[ad_end + 1]
+                    distance = heights[pos] - heights[ad_end + 1]
+                else:
+                    gap = nodes[ad_start] - nodes[ends[pos] + 1]
+                    distance = heights[ad_start] - heights[ends[pos] + 1]
+                if gap > self.max_adjacent_nodes and distance >= self.min_dist:
+                    continue
+
+                element = elements[pos]
+                ad_info = ad_info or DomUtils.get_element_info(ad)
+                finding = {
+                    "ad": ad_info,
+                    "offending_element": DomUtils.get_element_info(element),
+                    "position": side,
+                    "nodes_between": gap,
+                    "estimated_distance_px": distance
+                }
+                if gap == 0:
+                    violations.append({"level": "REJECT", "message": f"Ad is immediately adjacent to interactive element: <{element.name}>", **finding})
+                elif gap <= self.max_adjacent_nodes:
+                    violations.append({"level": "REJECT", "message": f"Ad is within {gap} node(s) of interactive element: <{element.name}>", **finding})
+                else:
+                    warnings.append({"level": "WARN", "message": f"Ad is about {distance}px from interactive element <{element.name}>, less than {self.min_dist}px", **finding})
 
         return {
             "status": "FAIL" if violations else "PASS",
             "violations": violations,
-            "summary": f"Found {len(violations)} violations."
+            "warnings": warnings,
+            "summary": f"Found {len(violations)} violations and {len(warnings)} warnings."
         }
+
+    @staticmethod
+    def _next_after(starts: List[int], ad_end: int) -> Optional[int]:
+        """
+        First interactive element starting after the ad's subtree.
+        """
+        i = bisect_left(starts, ad_end + 1)
+        return starts[i] if i < len(starts) else None
+
+    @staticmethod
+    def _last_before(starts: List[int], ends: List[int], ad_start: int) -> Optional[int]:
+        """
+        Last interactive element that ends before the ad starts. Elements
+        wrapping the ad are skipped; there are at most nesting-depth of them.
+        """
+        i = bisect_left(starts, ad_start) - 1
+        while i >= 0:
+            pos = starts[i]
+            if ends[pos] < ad_start:
+                return pos
+            i -= 1
+        return None
@@ -1,25 +1,28 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from ..publish.queue import PublishQueue
 from ..publish.state_machine import ContentState
+from ..storage.db import default_db_path
 
 router = APIRouter(prefix="/publish", tags=["Publishing"])
 
-# Shared queue instance (In-memory for MVP)
+# Persisted in blogs.db (CONTENT_OS_DB), so every worker process and restart sees the same queue
 queue = PublishQueue({
     "publishing": {
         "governance": {
             "require_human_approval_for": ["naver"]
         }
     }
-})
+}, default_db_path())
 
 class StateUpdate(BaseModel):
     content_id: str
     next_state: ContentState
 
+# Plain def: FastAPI runs these in the threadpool so SQLite calls never block the event loop
 @router.post("/transition")
-async def transition_state(update: StateUpdate):
+def transition_state(update: StateUpdate):
     try:
         queue.update_state(update.content_id, update.next_state)
         return {"status": "success", "new_state": update.next_state}
@@ -27,10 +30,16 @@ async def transition_state(update: StateUpdate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/approve/{content_id}")
-async def approve_item(content_id: str):
+def approve_item(content_id: str):
     queue.approve(content_id)
     return {"status": "approved"}
 
 @router.get("/queue/{platform}")
-async def get_queue(platform: str):
-    return queue.get_ready_items(platform)
+def get_queue(platform: str, limit: Optional[int] = Query(None, ge=1, le=1000)):
+    return queue.get_ready_items(platform, limit)
+
+@router.get("/history/{content_id}")
+def get_history(content_id: str):
+    if queue.get_item(content_id) is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return queue.history(content_id)
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from ..track.event_collector import EventCollector
+from ..track.buffer import EventBuffer, BufferFullError
+from ..track.metrics import MetricsAggregator
+from ..storage.db import default_db_path
 
 router = APIRouter(prefix="/track", tags=["Tracking"])
-collector = EventCollector()
+collector = EventCollector(default_db_path())
+aggregator = MetricsAggregator(default_db_path())
+# Started and stopped by the app lifespan in main.py
+buffer = EventBuffer(collector)
 
 class EventRequest(BaseModel):
     event_type: str
@@ -14,20 +21,41 @@ class EventRequest(BaseModel):
     intent: str
     metadata: Optional[Dict] = None
 
+async def _enqueue(events: List[EventRequest]) -> int:
+    try:
+        return await buffer.put_many([e.model_dump() for e in events])
+    except BufferFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
 @router.post("/event")
 async def track_event(req: EventRequest):
-    collector.collect(
-        req.event_type, 
-        req.channel, 
-        req.content_id, 
-        req.sku, 
-        req.intent, 
-        req.metadata
-    )
-    return {"status": "collected"}
+    accepted = await _enqueue([req])
+    return {"status": "collected" if accepted else "dropped"}
+
+@router.post("/events/batch")
+async def track_events_batch(reqs: List[EventRequest]):
+    accepted = await _enqueue(reqs)
+    return {"status": "collected", "accepted": accepted, "dropped": len(reqs) - accepted}
 
 @router.get("/summary")
-async def get_summary():
-    from ..track.metrics import MetricsAggregator
-    agg = MetricsAggregator()
-    return agg.get_summary_by_content()
+async def get_summary(start: Optional[str] = None, end: Optional[str] = None, channel: Optional[str] = None):
+    """
+    Per-content metrics for events in [start, end) (ISO timestamps, UTC).
+    """
+    # Read-your-writes: make buffered events visible before aggregating
+    await buffer.flush()
+    return await asyncio.to_thread(aggregator.get_summary_by_content, start, end, channel)
+
+@router.get("/events")
+async def list_events(event_type: Optional[str] = None, channel: Optional[str] = None,
+                      content_id: Optional[str] = None, sku: Optional[str] = None,
+                      intent: Optional[str] = None, start: Optional[str] = None,
+                      end: Optional[str] = None, after_id: Optional[int] = None,
+                      limit: int = Query(100, ge=1, le=1000)):
+    """
+    Keyset-paginated raw events; follow `next_after_id` for the next page.
+    """
+    await buffer.flush()
+    filters = {k: v for k, v in {"event_type": event_type, "channel": channel, "content_id": content_id,
+                                 "sku": sku, "intent": intent}.items() if v is not None}
+    return await asyncio.to_thread(collector.get_page, filters, start, end, after_id, limit)
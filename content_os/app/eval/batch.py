@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Tuple, Iterable, Iterator, Optional
+from ..schemas import ComplianceRequest
+from .compliance import ComplianceEvaluator, DEFAULT_CONFIG
+
+# Evaluator owned by each pool worker, created once by _init_worker
+_worker_evaluator: Optional[ComplianceEvaluator] = None
+
+def _init_worker(config: Dict):
+    global _worker_evaluator
+    _worker_evaluator = ComplianceEvaluator(config)
+
+def _evaluate_chunk(chunk: List[Tuple[int, str]]) -> List[Dict]:
+    """
+    Evaluates raw NDJSON lines. Parsing happens here so it is parallelised too.
+    """
+    results = []
+    for line_no, line in chunk:
+        item_id = None
+        try:
+            payload = json.loads(line)
+            item_id = payload.pop("id", None)
+            result = _worker_evaluator.evaluate(ComplianceRequest(**payload))
+            results.append({"line": line_no, "id": item_id, **result.model_dump()})
+        except Exception as e:
+            results.append({"line": line_no, "id": item_id, "error": f"{type(e).__name__}: {e}"})
+    return results
+
+class BatchEvaluator:
+    """
+    Evaluates NDJSON ComplianceRequest lines on a process pool and yields
+    results as chunks complete (not in input order; each result has its line
+    number). The last item yielded is {"stats": {...}}.
+    workers=0 evaluates in the calling process.
+
+    The pool is created on first use, which under uvicorn is a threadpool
+    thread, so workers are started with `start_method` (forkserver, or spawn
+    where it is unavailable) rather than by forking a multithreaded server.
+    """
+    def __init__(self, config: Dict = DEFAULT_CONFIG, workers: Optional[int] = None, chunk_size: int = 64,
+                 start_method: Optional[str] = None):
+        self.config = config
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.start_method = start_method
+        self.max_pending = max(self.workers, 1) * 4
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers and self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(self.start_method),
+                                             initializer=_init_worker, initargs=(self.config,))
+        return self._pool
+
+    def _run_inline(self, chunk: List[Tuple[int, str]]) -> List[Dict]:
+        if _worker_evaluator is None:
+            _init_worker(self.config)
+        return _evaluate_chunk(chunk)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _chunks(self, lines: Iterable[str]) -> Iterator[List[Tuple[int, str]]]:
+        chunk = []
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            chunk.append((line_no, line))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def run(self, lines: Iterable[str]) -> Iterator[Dict]:
+        stats = _BatchStats(self.workers)
+        pool = self._get_pool()
+        if pool is None:
+            for chunk in self._chunks(lines):
+                yield from stats.count(self._run_inline(chunk))
+            yield stats.summary()
+            return
+
+        pending = set()
+        try:
+            for chunk in self._chunks(lines):
+                pending.add(pool.submit(_evaluate_chunk, chunk))
+                if len(pending) >= self.max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from stats.count(future.result())
+            for future in wait(pending).done:
+                yield from stats.count(future.result())
+        finally:
+            # Closed early (client disconnected): drop the chunks not started yet
+            for future in pending:
+                future.cancel()
+        yield stats.summary()
+
+class _BatchStats:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.started = time.perf_counter()
+        self.total = 0
+        self.errors = 0
+        self.by_status: Dict[str, int] = {}
+
+    def count(self, results: List[Dict]) -> List[Dict]:
+        for r in results:
+            self.total += 1
+            if "error" in r:
+                self.errors += 1
+            else:
+                self.by_status[r["status"]] = self.by_status.get(r["status"], 0) + 1
+        return results
+
+    def summary(self) -> Dict:
+        elapsed = time.perf_counter() - self.started
+        return {"stats": {
+            "total": self.total,
+            "errors": self.errors,
+            "by_status": self.by_status,
+            "workers": self.workers,
+            "elapsed_sec": round(elapsed, 3),
+            "docs_per_sec": round(self.total / elapsed, 1) if elapsed > 0 else None
+        }}
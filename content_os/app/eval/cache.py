@@ -0,0 +1,108 @@
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from ..schemas import ComplianceRequest
+
+class ComplianceCache:
+    """
+    LRU cache of ComplianceResult dicts, optionally backed by a SQLite table so
+    entries survive restarts. Keys include the RuleCatalog fingerprint, so a
+    config change never serves results computed under the old rules.
+    """
+    def __init__(self, max_entries: int = 10000, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS compliance_cache (
+                    key TEXT PRIMARY KEY,
+                    fingerprint TEXT,
+                    result TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    @staticmethod
+    def make_key(request: ComplianceRequest, fingerprint: str) -> str:
+        payload = json.dumps(
+            [request.content, request.language, request.category, request.is_sponsored, fingerprint],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute("SELECT result FROM compliance_cache WHERE key = ?", (key,)).fetchone()
+            if row:
+                result = json.loads(row[0])
+                with self._lock:
+                    self.hits += 1
+                    self._remember(key, result)
+                return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict, fingerprint: str = ""):
+        with self._lock:
+            self._remember(key, result)
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO compliance_cache (key, fingerprint, result) VALUES (?, ?, ?)",
+                    (key, fingerprint, json.dumps(result, ensure_ascii=False))
+                )
+
+    def _remember(self, key: str, result: Dict):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def prune(self, fingerprint: str) -> int:
+        """
+        Deletes persisted entries computed under any other rule fingerprint.
+        """
+        if not self.db_path:
+            return 0
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute("DELETE FROM compliance_cache WHERE fingerprint != ?", (fingerprint,)).rowcount
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("DELETE FROM compliance_cache")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": bool(self.db_path)
+            }
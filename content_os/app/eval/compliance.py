@@ -1,7 +1,11 @@
+import sys
+import json
+import argparse
 import yaml
-from typing import Dict
+from typing import Dict, Optional
 from ..schemas import ComplianceRequest, ComplianceResult
 from ..rules.catalog import RuleCatalog
+from .cache import ComplianceCache
 
 # Mocking the YAML load for this example
 DEFAULT_CONFIG = yaml.safe_load("""
@@ -16,14 +20,31 @@ compliance:
 """)
 
 class ComplianceEvaluator:
-    def __init__(self, config: Dict = DEFAULT_CONFIG):
+    def __init__(self, config: Dict = DEFAULT_CONFIG, cache: Optional[ComplianceCache] = None):
         self.catalog = RuleCatalog(config)
+        self.cache = cache
+        if cache is not None:
+            cache.prune(self.catalog.fingerprint)
 
     def evaluate(self, request: ComplianceRequest) -> ComplianceResult:
+        if self.cache is None:
+            return self._evaluate(request)
+
+        key = ComplianceCache.make_key(request, self.catalog.fingerprint)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return ComplianceResult(**cached)
+        result = self._evaluate(request)
+        self.cache.put(key, result.model_dump(), self.catalog.fingerprint)
+        return result
+
+    def _evaluate(self, request: ComplianceRequest) -> ComplianceResult:
         rules = self.catalog.get_rules(request.language)
+        keyword_hits = self.catalog.scan(request.language, request.content)
         context = {
             "is_sponsored": request.is_sponsored,
-            "category": request.category
+            "category": request.category,
+            "keyword_hits": keyword_hits
         }
         
         fails = []
@@ -33,14 +54,18 @@ class ComplianceEvaluator:
         for rule in rules:
             res = rule.evaluate(request.content, context)
             if res:
+                issue = {"code": res["code"], "detail": res["detail"]}
+                if res.get("location"):
+                    issue["location"] = res["location"]
                 if res["status"] == "REJECT":
-                    fails.append({"code": res["code"], "detail": res["detail"]})
+                    fails.append(issue)
                 else:
-                    warns.append({"code": res["code"], "detail": res["detail"]})
+                    warns.append(issue)
 
         # YMYL Logic
-        if request.category in ["건강", "금융"] and "면책" not in request.content:
-            warns.append({"code": "YMYL_MISSING_DISCLAIMER", "detail": "YMYL 카테고리이나 면책 문구가 누락되었습니다."})
+        has_disclaimer = any(word in hits for hits in keyword_hits.values() for word in self.catalog.ymyl_disclaimers)
+        if request.category in ["건강", "금융"] and not has_disclaimer:
+            warns.append({"code": "YMYL_MISSING_DISCLAIMER", "detail": "YMYL 카테고리이나 면책 문구가 누락되었습니다.", "location": "본문 하단"})
             suggestions.append("본문 하단에 '본 내용은 전문가의 의견을 대신할 수 없습니다' 등의 면책 문구를 추가하세요.")
 
         status = "PASS"
@@ -55,3 +80,34 @@ class ComplianceEvaluator:
             warn=warns,
             suggestions=suggestions
         )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check content against the compliance rules")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="Text file with one post")
+    source.add_argument("--batch", help="NDJSON file of ComplianceRequest objects ('-' for stdin)")
+    parser.add_argument("--lang", default="ko")
+    parser.add_argument("--category", default="General")
+    parser.add_argument("--sponsored", action="store_true")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for --batch (0 = in-process)")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            req = ComplianceRequest(content=f.read(), language=args.lang, category=args.category, is_sponsored=args.sponsored)
+        print(json.dumps(ComplianceEvaluator().evaluate(req).model_dump(), indent=2, ensure_ascii=False))
+        return
+
+    from .batch import BatchEvaluator
+    batch = BatchEvaluator(workers=args.workers)
+    stream = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    try:
+        for item in batch.run(stream):
+            print(json.dumps(item, ensure_ascii=False), flush=True)
+    finally:
+        batch.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+if __name__ == "__main__":
+    main()
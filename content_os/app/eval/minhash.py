@@ -0,0 +1,137 @@
+import re
+from typing import List, Set
+import numpy as np
+
+_EMPTY = np.uint32(0xFFFFFFFF)
+_ROLL = np.uint64(1099511628211)  # FNV prime, multiplier for the rolling shingle hash
+
+class MinHasher:
+    """
+    MinHash signatures over character shingles.
+    Character shingles need no tokenizer, so Korean and English are handled the same way.
+    """
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 42):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hashing: h(x) = (a * x + b) >> 32 with odd 64-bit a, no modulo needed
+        self._a = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return re.sub(r'\s+', ' ', text.lower()).strip()
+
+    def shingles(self, text: str) -> Set[str]:
+        text = self._normalize(text)
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text} if text else set()
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """
+        Distinct 64-bit hashes of every k-character shingle, computed on the
+        code point array without building the shingle strings.
+        """
+        text = self._normalize(text)
+        if not text:
+            return np.zeros(0, dtype=np.uint64)
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        k = min(self.shingle_size, len(codes))
+        n = len(codes) - k + 1
+        h = np.zeros(n, dtype=np.uint64)
+        for j in range(k):
+            h = h * _ROLL + codes[j:j + n]
+        return np.unique(h)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.signatures([text])[0]
+
+    def signatures(self, texts: List[str], chunk_shingles: int = 65536) -> np.ndarray:
+        """
+        Signatures for many texts. Shingle hashes of several texts are permuted
+        in one array operation and reduced per text with np.minimum.reduceat.
+        """
+        out = np.full((len(texts), self.num_perm), _EMPTY, dtype=np.uint32)
+        hashes = [self._shingle_hashes(t) for t in texts]
+
+        start = 0
+        while start < len(texts):
+            # Group texts until the chunk holds about chunk_shingles shingles
+            stop, total = start, 0
+            while stop < len(texts) and (stop == start or total + len(hashes[stop]) <= chunk_shingles):
+                total += len(hashes[stop])
+                stop += 1
+            group = [i for i in range(start, stop) if len(hashes[i])]
+            if group:
+                hv = np.concatenate([hashes[i] for i in group])
+                # (num_perm, n_shingles); uint64 arithmetic wraps, which is what the hash family expects
+                permuted = (np.outer(self._a, hv) + self._b[:, None]) >> np.uint64(32)
+                bounds = np.cumsum([0] + [len(hashes[i]) for i in group[:-1]])
+                out[group] = np.minimum.reduceat(permuted, bounds, axis=1).T.astype(np.uint32)
+            start = stop
+        return out
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing over MinHash signatures.
+
+    Each band of `rows` signature values is folded into one uint64 key. Keys are
+    kept as one sorted array per band, so a lookup is a binary search per band
+    and the whole index is a pair of (bands, n) arrays that can be saved as-is.
+    Two paragraphs with Jaccard similarity s become candidates with probability
+    1 - (1 - s^rows)^bands.
+    """
+    def __init__(self, bands: int = 32, rows: int = 4, seed: int = 7):
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.RandomState(seed)
+        # Odd multipliers for the multiply-add fold of each band
+        self._mult = (rng.randint(1, 2 ** 31, size=rows).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+        self.keys = np.zeros((bands, 0), dtype=np.uint64)
+        self.row_ids = np.zeros((bands, 0), dtype=np.int64)
+
+    def threshold(self) -> float:
+        """
+        Jaccard similarity at which the candidate probability is about 50%.
+        """
+        return (1.0 / self.bands) ** (1.0 / self.rows)
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        (n, num_perm) signatures -> (n, bands) band keys.
+        """
+        needed = self.bands * self.rows
+        if signatures.shape[1] < needed:
+            raise ValueError(f"Signatures have {signatures.shape[1]} values, need {needed} for {self.bands}x{self.rows} bands")
+        sig = signatures[:, :needed].astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        with np.errstate(over="ignore"):
+            return (sig * self._mult).sum(axis=2, dtype=np.uint64)
+
+    def build(self, signatures: np.ndarray, row_ids: np.ndarray = None):
+        keys = self.band_keys(signatures).T
+        if row_ids is None:
+            row_ids = np.arange(len(signatures), dtype=np.int64)
+        order = np.argsort(keys, axis=1, kind="stable")
+        self.keys = np.take_along_axis(keys, order, axis=1)
+        self.row_ids = np.asarray(row_ids, dtype=np.int64)[order]
+        return self
+
+    def load(self, keys: np.ndarray, row_ids: np.ndarray):
+        self.keys, self.row_ids = keys, row_ids
+        return self
+
+    def query(self, band_keys: np.ndarray) -> np.ndarray:
+        """
+        Candidate row ids sharing at least one band with the given (bands,) keys.
+        """
+        found = []
+        for b in range(self.bands):
+            lo = np.searchsorted(self.keys[b], band_keys[b], side="left")
+            hi = np.searchsorted(self.keys[b], band_keys[b], side="right")
+            if hi > lo:
+                found.append(self.row_ids[b, lo:hi])
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
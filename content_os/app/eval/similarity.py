@@ -1,12 +1,16 @@
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
 class SimilarityEvaluator:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, index=None):
         self.config = config
+        self.index = index  # Optional storage.paragraph_index.ParagraphIndex
+        self.top_k = config.get('similarity', {}).get('top_k', 5)
+        # "lsh" scores only MinHash/LSH candidates; None scores every row sharing a term
+        self.prefilter = config.get('similarity', {}).get('prefilter', 'lsh')
         self.threshold_warn = config.get('similarity', {}).get('thresholds', {}).get('warn', 0.80)
         self.threshold_reject = config.get('similarity', {}).get('thresholds', {}).get('reject', 0.88)
         self.ignore_sections = config.get('similarity', {}).get('ignore_sections', [])
@@ -51,13 +55,46 @@ class SimilarityEvaluator:
         
         return results
 
-    def evaluate(self, content: str, existing_content_list: List[str]) -> Dict:
+    def calculate_similarity_indexed(self, target_paras: List[str]) -> List[Dict]:
+        """
+        Same output as calculate_similarity, but scores against the persistent
+        paragraph index with a top-k search instead of refitting TF-IDF.
+        """
+        if not target_paras or self.index is None:
+            return []
+
+        prefilter = self.prefilter if self.index.minhasher is not None else None
+        hits_per_para = self.index.search(target_paras, k=self.top_k, prefilter=prefilter)
+
+        results = []
+        for target_p, hits in zip(target_paras, hits_per_para):
+            if not hits:
+                continue
+            row_id, max_sim_score = hits[0]
+            if max_sim_score >= self.threshold_warn:
+                existing = self.index.get_row(row_id)
+                results.append({
+                    "target_paragraph": target_p[:120] + "...",
+                    "existing_paragraph": existing["text"][:120] + "...",
+                    "existing_content_id": existing["content_id"],
+                    "score": max_sim_score,
+                    "status": "REJECT" if max_sim_score >= self.threshold_reject else "WARN"
+                })
+        return results
+
+    def evaluate(self, content: str, existing_content_list: Optional[List[str]] = None) -> Dict:
+        """
+        Compares content against existing_content_list, or against the
+        paragraph index when no list is given.
+        """
         target_paras = self.split_paragraphs(content)
-        existing_paras = []
-        for ec in existing_content_list:
-            existing_paras.extend(self.split_paragraphs(ec))
-            
-        matches = self.calculate_similarity(target_paras, existing_paras)
+        if existing_content_list is None:
+            matches = self.calculate_similarity_indexed(target_paras)
+        else:
+            existing_paras = []
+            for ec in existing_content_list:
+                existing_paras.extend(self.split_paragraphs(ec))
+            matches = self.calculate_similarity(target_paras, existing_paras)
         
         status = "PASS"
         if any(m["status"] == "REJECT" for m in matches):
@@ -1,18 +1,64 @@
-from fastapi import FastAPI
+import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
 from .schemas import ComplianceRequest, ComplianceResult
 from .eval.compliance import ComplianceEvaluator
+from .eval.cache import ComplianceCache
+from .eval.batch import BatchEvaluator
+from .storage.db import close_all as close_databases
 from .api.routes_publish import router as publish_router
-from .api.routes_track import router as track_router
+from .api.routes_track import router as track_router, buffer as track_buffer, collector as track_collector
 
-app = FastAPI(title="Content Compliance Engine")
+evaluator = ComplianceEvaluator(cache=ComplianceCache(max_entries=10000))
+batch_evaluator = BatchEvaluator()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await track_buffer.start()
+    yield
+    await track_buffer.stop()
+    batch_evaluator.close()
+    close_databases()
+
+app = FastAPI(title="Content Compliance Engine", lifespan=lifespan)
 app.include_router(publish_router)
 app.include_router(track_router)
-evaluator = ComplianceEvaluator()
 
+# Plain def: FastAPI runs it in the threadpool so evaluation never blocks the event loop
 @app.post("/check", response_model=ComplianceResult)
-async def check_compliance(request: ComplianceRequest):
+def check_compliance(request: ComplianceRequest):
     return evaluator.evaluate(request)
 
+@app.post("/check/batch")
+async def check_compliance_batch(request: Request):
+    """
+    Body: NDJSON, one ComplianceRequest (plus optional "id") per line.
+    Response: NDJSON results as they complete, then a {"stats": ...} line.
+    """
+    # The body is read up front: StreamingResponse also listens on receive()
+    # for disconnects, so the request stream cannot be consumed while streaming.
+    lines = (await request.body()).decode("utf-8").splitlines()
+
+    # Sync generator: Starlette iterates it in the threadpool. When the client
+    # disconnects it is discarded, and closing run() cancels the queued chunks.
+    def body():
+        results = batch_evaluator.run(lines)
+        try:
+            for item in results:
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+        finally:
+            results.close()
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "compliance_cache": evaluator.cache.stats(),
+        "event_buffer": track_buffer.stats(),
+        "database": track_collector.db.stats()
+    }
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
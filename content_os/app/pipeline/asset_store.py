@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import shutil
+import stat
+import logging
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; reflinks are skipped
+    fcntl = None
+
+from .hashing import file_digest
+
+MANIFEST_FILE = "assets.json"
+PLACEMENTS = ("hardlink", "reflink", "symlink", "copy")
+# Linux FICLONE ioctl: share the source extents copy-on-write (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+def reflink(src: str, dst: str):
+    """
+    Copy-on-write clone of src at dst; raises OSError where unsupported.
+    """
+    if fcntl is None:
+        raise OSError("reflink is not supported on this platform")
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+
+class AssetStore:
+    """
+    Content-addressed blob store for pack images.
+
+    Each distinct file is stored once under objects/<aa>/<digest><ext> and
+    made read-only; packages get it by hardlink, reflink or symlink, and by
+    copy only when none of those work (e.g. across filesystems). Packages
+    list what they use in assets.json, which gc() reads to find blobs that
+    are no longer referenced.
+    """
+    def __init__(self, root: str, placement: str = "auto", algorithm: str = "fast", hash_cache=None):
+        if placement != "auto" and placement not in PLACEMENTS:
+            raise ValueError(f"Unknown placement: {placement}")
+        self.root = root
+        self.algorithm = hash_cache.algorithm if hash_cache is not None else algorithm
+        self.hash_cache = hash_cache
+        # A requested method is tried first; copy always works as the last resort
+        self.placements = list(PLACEMENTS) if placement == "auto" else [placement, "copy"]
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def digest(self, path: str) -> str:
+        if self.hash_cache is not None:
+            return self.hash_cache.digest(path)
+        return file_digest(path, self.algorithm)
+
+    def blob_path(self, digest: str, ext: str = "") -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest + ext.lower())
+
+    def put(self, path: str, digest: Optional[str] = None, move: bool = False) -> str:
+        """
+        Stores a file (once per digest) and returns its blob path. With move=True
+        the source is renamed into the store, e.g. for temporary frames.
+        """
+        digest = digest or self.digest(path)
+        blob = self.blob_path(digest, os.path.splitext(path)[1])
+        if os.path.exists(blob):
+            if move:
+                os.remove(path)
+            return blob
+
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp = f"{blob}.{os.getpid()}.{id(path)}.tmp"
+        if move:
+            shutil.move(path, tmp)
+        else:
+            # Never hardlink sources in: an in-place edit would change the blob
+            try:
+                reflink(path, tmp)
+            except OSError:
+                shutil.copyfile(path, tmp)
+        os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        # Concurrent puts of the same digest race harmlessly: same content
+        os.replace(tmp, blob)
+        return blob
+
+    def place(self, blob: str, dest: str) -> str:
+        """
+        Materialises a blob at dest and returns the method that worked.
+        """
+        if os.path.lexists(dest):
+            os.remove(dest)
+        for method in self.placements:
+            try:
+                if method == "hardlink":
+                    os.link(blob, dest)
+                elif method == "reflink":
+                    reflink(blob, dest)
+                elif method == "symlink":
+                    os.symlink(os.path.abspath(blob), dest)
+                else:
+                    shutil.copyfile(blob, dest)
+                return method
+            except OSError as e:
+                logging.debug(f"{method} of {blob} failed: {e}")
+        raise OSError(f"Could not place {blob} at {dest}")
+
+    def add(self, path: str, dest: str, digest: Optional[str] = None, move: bool = False) -> Dict:
+        """
+        put() + place(); returns the manifest entry for dest.
+        """
+        digest = digest or self.digest(path)
+        blob = self.put(path, digest, move=move)
+        method = self.place(blob, dest)
+        return {"digest": digest, "algorithm": self.algorithm, "size": os.path.getsize(blob), "placement": method}
+
+    def blobs(self) -> Iterator[str]:
+        for prefix in sorted(os.listdir(self.objects_dir)):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if os.path.isdir(prefix_dir):
+                for name in sorted(os.listdir(prefix_dir)):
+                    yield os.path.join(prefix_dir, name)
+
+    def gc(self, referenced: Set[str], min_age_sec: float = 3600, dry_run: bool = False) -> Dict:
+        """
+        Deletes blobs whose digest is not in `referenced`. Blobs younger than
+        min_age_sec are kept, so a pack being built while gc runs (blob stored,
+        manifest not yet written) does not lose its assets.
+        """
+        now = time.time()
+        removed, freed, kept = 0, 0, 0
+        for blob in self.blobs():
+            name = os.path.basename(blob)
+            if name.endswith(".tmp"):
+                digest = None
+            else:
+                digest = os.path.splitext(name)[0]
+            st = os.stat(blob)
+            if digest in referenced or now - st.st_mtime < min_age_sec:
+                kept += 1
+                continue
+            if not dry_run:
+                os.remove(blob)
+            removed += 1
+            freed += st.st_size
+        return {"kept": kept, "removed": removed, "freed_bytes": freed, "dry_run": dry_run}
+
+def write_manifest(package_dir: str, assets: Dict[str, Dict]):
+    path = os.path.join(package_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(assets, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def referenced_digests(packages_roots: Iterable[str]) -> Set[str]:
+    """
+    Digests listed in the assets.json of every package under the given roots.
+    """
+    digests = set()
+    for packages_root in packages_roots:
+        for root, dirs, files in os.walk(packages_root):
+            if MANIFEST_FILE in files:
+                with open(os.path.join(root, MANIFEST_FILE), "r", encoding="utf-8") as f:
+                    digests.update(entry["digest"] for entry in json.load(f).values())
+    return digests
@@ -0,0 +1,116 @@
+import os
+import hashlib
+from typing import Callable, Dict, Optional
+
+try:
+    import xxhash
+except ImportError:  # optional, falls back to blake2b
+    xxhash = None
+
+from ..storage.db import Database, get_database
+from ..storage.migrations import migrate
+
+BUFFER_SIZE = 1 << 20  # 1 MiB
+
+def resolve_algorithm(algorithm: str) -> str:
+    if algorithm == "fast":
+        return "xxh3_128" if xxhash is not None else "blake2b"
+    return algorithm
+
+def _hasher_factory(algorithm: str) -> Callable:
+    algorithm = resolve_algorithm(algorithm)
+    if algorithm.startswith("xxh"):
+        if xxhash is None:
+            raise ImportError(f"{algorithm} requires the xxhash package")
+        return getattr(xxhash, algorithm)
+    if algorithm == "blake2b":
+        # 128-bit digest, same length as MD5; standard library only
+        return lambda: hashlib.blake2b(digest_size=16)
+    return lambda: hashlib.new(algorithm)
+
+def file_digest(path: str, algorithm: str = "fast", buffer_size: int = BUFFER_SIZE) -> str:
+    """
+    Hex digest of a file read through one reusable buffer, so memory use
+    does not depend on file size. algorithm is any hashlib name, an xxhash
+    name, or "fast" (xxh3_128 when xxhash is installed, blake2b otherwise).
+    """
+    hasher = _hasher_factory(algorithm)()
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+# schema_version steps for the "asset_hashes" component
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS asset_hashes (
+            path TEXT NOT NULL,
+            algorithm TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            PRIMARY KEY (path, algorithm)
+        ) WITHOUT ROWID
+        """,
+    ],
+]
+
+class HashCache:
+    """
+    Persistent file digests keyed by (path, size, mtime, inode). A file whose
+    stat matches the stored entry is never read again; any change to its
+    size, mtime or inode (e.g. replaced by a rename) makes it rehash.
+    """
+    def __init__(self, db_path: str, algorithm: str = "fast", db: Optional[Database] = None):
+        self.algorithm = resolve_algorithm(algorithm)
+        if db is None and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db = db or get_database(db_path)
+        self.hits = 0
+        self.misses = 0
+        with self.db.connection() as conn:
+            migrate(conn, "asset_hashes", MIGRATIONS)
+
+    def digest(self, path: str) -> str:
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self.db.connection() as conn:
+            row = conn.execute(
+                "SELECT size, mtime_ns, inode, digest FROM asset_hashes WHERE path = ? AND algorithm = ?",
+                (path, self.algorithm)
+            ).fetchone()
+        if row and row[:3] == (st.st_size, st.st_mtime_ns, st.st_ino):
+            self.hits += 1
+            return row[3]
+
+        self.misses += 1
+        digest = file_digest(path, self.algorithm)
+        with self.db.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO asset_hashes (path, algorithm, size, mtime_ns, inode, digest) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, self.algorithm, st.st_size, st.st_mtime_ns, st.st_ino, digest)
+            )
+        return digest
+
+    def prune(self) -> int:
+        """
+        Drops entries for files that no longer exist.
+        """
+        with self.db.connection() as conn:
+            paths = [row[0] for row in conn.execute("SELECT DISTINCT path FROM asset_hashes")]
+            gone = [(p,) for p in paths if not os.path.exists(p)]
+            conn.executemany("DELETE FROM asset_hashes WHERE path = ?", gone)
+        return len(gone)
+
+    def close(self):
+        self.db.close()
+
+    def stats(self) -> Dict:
+        return {"algorithm": self.algorithm, "hits": self.hits, "misses": self.misses}
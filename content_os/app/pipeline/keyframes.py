@@ -1,32 +1,195 @@
 import subprocess
 import os
+import re
+import json
+import shutil
+import hashlib
 import logging
+from typing import List, Optional, Tuple
 
-def extract_keyframes(video_path: str, output_dir: str, max_frames: int = 6) -> list:
-    """Extracts keyframes from a video using ffmpeg."""
-    if not os.path.exists(video_path):
-        return []
-    
-    os.makedirs(output_dir, exist_ok=True)
-    output_pattern = os.path.join(output_dir, "frame_%03d.jpg")
-    
-    # ffmpeg command to extract keyframes (I-frames)
-    # -vf "select='eq(pict_type,PICT_TYPE_I)'" extracts only I-frames
-    # -vsync vfr ensures we don't get duplicate frames if there are few I-frames
+MODES = ("auto", "scene", "seek", "iframe")
+# Bump when the frames extracted for the same settings change, so cached frames are redone
+CACHE_VERSION = 2
+
+_PTS_TIME_RE = re.compile(r"pts_time:\s*([0-9.]+)")
+
+def probe_duration(video_path: str, timeout: float = 30) -> Optional[float]:
+    """Video duration in seconds via ffprobe, or None if it cannot be read."""
     cmd = [
-        "ffmpeg", "-i", video_path,
-        "-vf", f"select='eq(pict_type,PICT_TYPE_I)',scale=1280:-1",
-        "-vsync", "vfr",
-        "-q:v", "2",
-        "-frames:v", str(max_frames),
-        output_pattern,
-        "-y"
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        video_path
     ]
-    
     try:
-        subprocess.run(cmd, check=True, capture_output=True)
-        frames = [os.path.join(output_dir, f) for f in os.listdir(output_dir) if f.startswith("frame_")]
-        return sorted(frames)
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        logging.warning(f"FFmpeg extraction failed for {video_path}: {e}")
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=timeout).stdout
+        return float(out.strip())
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError, ValueError) as e:
+        logging.warning(f"ffprobe failed for {video_path}: {e}")
+        return None
+
+def _scale(width: int) -> str:
+    # -2 keeps the aspect ratio with an even height, which JPEG encoders prefer
+    return f"scale='min({width},iw)':-2"
+
+def _scene_cmd(video_path: str, pattern: str, max_frames: int, width: int, threads: int,
+               threshold: float, min_gap: float) -> List[str]:
+    """
+    One decode pass: keep the first frame and every scene cut that is at least
+    `min_gap` seconds after the previously kept frame, so picks spread over
+    the whole video instead of clustering in the intro. showinfo logs the
+    time of each kept frame to stderr.
+    """
+    select = f"eq(n\\,0)+gt(scene\\,{threshold})*gte(t-prev_selected_t\\,{min_gap:.3f})"
+    return [
+        "ffmpeg", "-hide_banner", "-nostdin", "-threads", str(threads),
+        "-an", "-sn", "-dn", "-i", video_path,
+        "-vf", f"select='{select}',showinfo,{_scale(width)}",
+        "-vsync", "vfr", "-q:v", "2", "-frames:v", str(max_frames),
+        pattern, "-y"
+    ]
+
+def _seek_cmd(video_path: str, output_dir: str, timestamps: List[float], width: int, threads: int,
+              first: int = 1) -> List[str]:
+    """
+    One process with an input per timestamp; each input seeks (-ss before -i)
+    to the nearest keyframe and decodes a single frame, so cost does not grow
+    with video length. Outputs are numbered from `first`.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-threads", str(threads)]
+    for t in timestamps:
+        cmd += ["-ss", f"{t:.3f}", "-an", "-sn", "-dn", "-i", video_path]
+    for i in range(len(timestamps)):
+        cmd += ["-map", f"{i}:v:0", "-vf", _scale(width), "-frames:v", "1", "-q:v", "2",
+                os.path.join(output_dir, f"frame_{first + i:03d}.jpg")]
+    return cmd + ["-y"]
+
+def _iframe_cmd(video_path: str, pattern: str, max_frames: int, width: int, threads: int) -> List[str]:
+    # -skip_frame nokey makes the decoder skip everything but keyframes
+    return [
+        "ffmpeg", "-hide_banner", "-nostdin", "-threads", str(threads),
+        "-skip_frame", "nokey", "-an", "-sn", "-dn", "-i", video_path,
+        "-vf", f"select='eq(pict_type,PICT_TYPE_I)',{_scale(width)}",
+        "-vsync", "vfr", "-q:v", "2", "-frames:v", str(max_frames),
+        pattern, "-y"
+    ]
+
+def _run(cmd: List[str], output_dir: str, timeout: float, clear: bool = True) -> Tuple[List[str], str]:
+    """
+    Runs ffmpeg and returns the frame files in `output_dir` and its stderr.
+    """
+    if clear:
+        for name in os.listdir(output_dir):
+            if name.startswith("frame_"):
+                os.remove(os.path.join(output_dir, name))
+    result = subprocess.run(cmd, check=True, capture_output=True, timeout=timeout)
+    stderr = result.stderr or b""
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode("utf-8", "replace")
+    frames = sorted(os.path.join(output_dir, f) for f in os.listdir(output_dir) if f.startswith("frame_"))
+    return frames, stderr
+
+def _missing_timestamps(duration: float, max_frames: int, taken: List[float], count: int) -> List[float]:
+    """
+    `count` of the evenly spaced seek timestamps farthest from the frames
+    already taken, in time order.
+    """
+    slots = [duration * (i + 0.5) / max_frames for i in range(max_frames)]
+    taken = list(taken) or [0.0]
+    picked = []
+    for _ in range(min(count, len(slots))):
+        best = max(slots, key=lambda t: min(abs(t - o) for o in taken))
+        slots.remove(best)
+        taken.append(best)
+        picked.append(best)
+    return sorted(picked)
+
+def _cache_key(video_path: str, params: dict, hash_cache=None) -> str:
+    if hash_cache is not None:
+        digest = hash_cache.digest(video_path)
+    else:
+        from .hashing import file_digest
+        digest = file_digest(video_path)
+    return hashlib.sha256(json.dumps([digest, params], sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+def extract_keyframes(video_path: str, output_dir: str, max_frames: int = 6, mode: str = "auto",
+                      width: int = 1280, threads: int = 0, timeout: float = 120,
+                      scene_threshold: float = 0.3, seek_threshold_sec: float = 600,
+                      cache_dir: Optional[str] = None, hash_cache=None) -> list:
+    """Extracts up to `max_frames` representative frames from a video using ffmpeg.
+
+    mode="scene" picks scene cuts spread over the video in a single decode,
+    "seek" grabs frames at evenly spaced timestamps by seeking (fast on long
+    videos), "iframe" is the original first-I-frames behaviour, and "auto"
+    uses seek for videos longer than `seek_threshold_sec` and scene otherwise.
+    Each mode falls back to the next (scene -> seek -> iframe) on failure,
+    timeout or no output. A video with fewer scene cuts than `max_frames`
+    is topped up with seek frames at the timestamps farthest from the cuts. With `cache_dir`, frames are cached per video digest
+    and settings, so the same video is never decoded twice.
+    """
+    if not os.path.exists(video_path):
         return []
+    if mode not in MODES:
+        raise ValueError(f"Unknown keyframe mode: {mode}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    cached_dir = None
+    if cache_dir:
+        params = {"version": CACHE_VERSION, "mode": mode, "max_frames": max_frames, "width": width,
+                  "scene_threshold": scene_threshold, "seek_threshold_sec": seek_threshold_sec}
+        cached_dir = os.path.join(cache_dir, _cache_key(video_path, params, hash_cache))
+        if os.path.isdir(cached_dir):
+            frames = []
+            for name in sorted(os.listdir(cached_dir)):
+                dest = os.path.join(output_dir, name)
+                shutil.copy2(os.path.join(cached_dir, name), dest)
+                frames.append(dest)
+            return frames
+
+    duration = probe_duration(video_path, timeout=min(timeout, 30)) if mode in ("auto", "scene", "seek") else None
+    if mode == "auto":
+        mode = "seek" if duration and duration > seek_threshold_sec else "scene"
+    order = {"scene": ["scene", "seek", "iframe"], "seek": ["seek", "iframe"], "iframe": ["iframe"]}[mode]
+
+    pattern = os.path.join(output_dir, "frame_%03d.jpg")
+    frames = []
+    for attempt in order:
+        if attempt in ("scene", "seek") and not duration:
+            continue
+        if attempt == "scene":
+            cmd = _scene_cmd(video_path, pattern, max_frames, width, threads, scene_threshold,
+                             min_gap=duration / (max_frames + 1))
+        elif attempt == "seek":
+            timestamps = [duration * (i + 0.5) / max_frames for i in range(max_frames)]
+            cmd = _seek_cmd(video_path, output_dir, timestamps, width, threads)
+        else:
+            cmd = _iframe_cmd(video_path, pattern, max_frames, width, threads)
+        try:
+            frames, stderr = _run(cmd, output_dir, timeout)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+            logging.warning(f"FFmpeg {attempt} extraction failed for {video_path}: {e}")
+            continue
+        if frames and attempt == "scene" and len(frames) < max_frames:
+            # Few cuts above the threshold (low-motion video): fill the gaps by seeking
+            taken = [float(t) for t in _PTS_TIME_RE.findall(stderr)]
+            timestamps = _missing_timestamps(duration, max_frames, taken, max_frames - len(frames))
+            try:
+                frames, _ = _run(_seek_cmd(video_path, output_dir, timestamps, width, threads, first=len(frames) + 1),
+                                 output_dir, timeout, clear=False)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+                logging.warning(f"FFmpeg seek top-up failed for {video_path}: {e}")
+        if frames:
+            break
+
+    if frames and cached_dir:
+        tmp = cached_dir + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for f in frames:
+            shutil.copy2(f, tmp)
+        try:
+            os.replace(tmp, cached_dir)
+        except OSError:
+            # Another worker cached the same video first
+            shutil.rmtree(tmp, ignore_errors=True)
+    return frames
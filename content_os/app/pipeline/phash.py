@@ -0,0 +1,261 @@
+import threading
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # optional: perceptual dedupe is skipped without Pillow
+    Image = None
+
+from ..storage.db import Database, get_database
+from ..storage.migrations import migrate
+
+HASH_BITS = 64
+_BIT_WEIGHTS = (1 << np.arange(HASH_BITS - 1, -1, -1, dtype=np.uint64)).astype(np.uint64)
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """
+    Orthonormal DCT-II basis, so a 2-D DCT is two matrix products.
+    """
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+_DCT32 = _dct_matrix(32)
+
+if hasattr(np, "bitwise_count"):
+    def popcount(x: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(x)
+else:
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(x: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _POP8[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1)
+
+def load_gray(path: str, size: Tuple[int, int]) -> np.ndarray:
+    """
+    Grayscale thumbnail as a float32 (height, width) array. JPEGs are
+    decoded at reduced scale (Image.draft), which is most of the speedup.
+    """
+    if Image is None:
+        raise ImportError("Perceptual hashing requires Pillow")
+    with Image.open(path) as img:
+        img.draft("L", (size[0] * 4, size[1] * 4))
+        img = img.convert("L").resize(size, Image.BILINEAR)
+        return np.asarray(img, dtype=np.float32)
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    """
+    (n, 64) booleans -> (n,) uint64, first bit most significant.
+    """
+    return (bits.astype(np.uint64) * _BIT_WEIGHTS).sum(axis=1, dtype=np.uint64)
+
+def dhash(pixels: np.ndarray) -> np.ndarray:
+    """
+    Difference hash of (n, 8, 9) thumbnails: is each pixel brighter than its right neighbour.
+    """
+    pixels = np.asarray(pixels, dtype=np.float32).reshape(-1, 8, 9)
+    return _pack((pixels[:, :, 1:] > pixels[:, :, :-1]).reshape(len(pixels), HASH_BITS))
+
+def phash(pixels: np.ndarray) -> np.ndarray:
+    """
+    DCT hash of (n, 32, 32) thumbnails: the 8x8 lowest frequencies compared
+    with their median (DC term excluded from the median).
+    """
+    pixels = np.asarray(pixels, dtype=np.float32).reshape(-1, 32, 32)
+    coeffs = np.einsum("ij,njk,lk->nil", _DCT32, pixels, _DCT32)[:, :8, :8].reshape(len(pixels), HASH_BITS)
+    median = np.median(coeffs[:, 1:], axis=1, keepdims=True)
+    return _pack(coeffs > median)
+
+def image_phash(path: str) -> int:
+    return int(phash(load_gray(path, (32, 32)))[0])
+
+def image_dhash(path: str) -> int:
+    return int(dhash(load_gray(path, (9, 8)))[0])
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+class MultiIndexHashTable:
+    """
+    Hamming-radius search over 64-bit hashes (multi-index hashing).
+
+    Each hash is cut into `chunks` substrings, each with its own dict. By the
+    pigeonhole principle a hash within distance r of the query matches at
+    least one substring within distance r // chunks, so a lookup probes a
+    few hundred dict keys instead of scanning every stored hash, and the
+    candidates are verified with one vectorised popcount. Removed rows are
+    dropped from the substring dicts and their slots reused by later adds.
+    """
+    def __init__(self, max_distance: int = 8, chunks: int = 4):
+        self.max_distance = max_distance
+        self.chunks = chunks
+        widths = [HASH_BITS // chunks + (1 if i < HASH_BITS % chunks else 0) for i in range(chunks)]
+        self._shifts, self._masks = [], []
+        shift = HASH_BITS
+        for width in widths:
+            shift -= width
+            self._shifts.append(shift)
+            self._masks.append((1 << width) - 1)
+        radius = max_distance // chunks
+        # XOR masks of every substring within `radius` bits, per chunk width
+        self._flips = {
+            width: [sum(1 << b for b in combo) for r in range(radius + 1) for combo in combinations(range(width), r)]
+            for width in set(widths)
+        }
+        self._widths = widths
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(chunks)]
+        self._hashes: List[int] = []
+        self._labels: List = []
+        self._free: List[int] = []
+        self._array: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._hashes) - len(self._free)
+
+    def add(self, value: int, label=None) -> int:
+        if self._free:
+            row = self._free.pop()
+            self._hashes[row] = value
+            self._labels[row] = label
+        else:
+            row = len(self._hashes)
+            self._hashes.append(value)
+            self._labels.append(label)
+        self._array = None
+        for i in range(self.chunks):
+            key = (value >> self._shifts[i]) & self._masks[i]
+            self._tables[i].setdefault(key, []).append(row)
+        return row
+
+    def remove(self, row: int):
+        """
+        Drops a row returned by add(); its slot is reused by the next add.
+        """
+        value = self._hashes[row]
+        for i in range(self.chunks):
+            key = (value >> self._shifts[i]) & self._masks[i]
+            rows = self._tables[i][key]
+            rows.remove(row)
+            if not rows:
+                del self._tables[i][key]
+        self._labels[row] = None
+        self._free.append(row)
+
+    def query(self, value: int, max_distance: Optional[int] = None) -> List[Tuple[int, object]]:
+        """
+        (distance, label) of stored hashes within max_distance, nearest first.
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        candidates = set()
+        for i in range(self.chunks):
+            key = (value >> self._shifts[i]) & self._masks[i]
+            table = self._tables[i]
+            for flip in self._flips[self._widths[i]]:
+                rows = table.get(key ^ flip)
+                if rows:
+                    candidates.update(rows)
+        if not candidates:
+            return []
+        if self._array is None:
+            self._array = np.array(self._hashes, dtype=np.uint64)
+        rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        distances = popcount(self._array[rows] ^ np.uint64(value))
+        keep = np.nonzero(distances <= max_distance)[0]
+        order = keep[np.argsort(distances[keep], kind="stable")]
+        return [(int(distances[j]), self._labels[rows[j]]) for j in order]
+
+# schema_version steps for the "image_phashes" component
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS image_phashes (
+            content_id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            phash INTEGER NOT NULL,
+            PRIMARY KEY (content_id, path)
+        ) WITHOUT ROWID
+        """,
+    ],
+]
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+class PerceptualIndex:
+    """
+    Global record of images used in past packs, persisted in SQLite and
+    held in a MultiIndexHashTable for lookups. Labels are (content_id, path).
+
+    Packs built concurrently check and claim images with reserve(), so two
+    packs of one batch cannot both accept the same image; replace() commits
+    a pack's images and release() drops the claims of a failed build. Only
+    the rows of the content_id concerned are touched.
+    """
+    def __init__(self, db_path: str, max_distance: int = 8, db: Optional[Database] = None):
+        self.db = db or get_database(db_path)
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        with self.db.connection() as conn:
+            migrate(conn, "image_phashes", MIGRATIONS)
+        self._load()
+
+    def _load(self):
+        table = MultiIndexHashTable(self.max_distance)
+        rows: Dict[str, List[int]] = {}
+        with self.db.connection() as conn:
+            for content_id, path, value in conn.execute("SELECT content_id, path, phash FROM image_phashes"):
+                rows.setdefault(content_id, []).append(table.add(value & 0xFFFFFFFFFFFFFFFF, (content_id, path)))
+        self.table = table
+        # content_id -> table rows of its recorded and of its reserved images
+        self._rows = rows
+        self._reserved: Dict[str, List[int]] = {}
+
+    def find(self, value: int, exclude_content_id: Optional[str] = None) -> List[Tuple[int, Tuple[str, str]]]:
+        with self._lock:
+            matches = self.table.query(value)
+        return [(d, label) for d, label in matches if label[0] != exclude_content_id]
+
+    def reserve(self, content_id: str, path: str, value: int) -> List[Tuple[int, Tuple[str, str]]]:
+        """
+        Images of other contents near `value`; if there are none the image is
+        claimed for `content_id` in the same step, until replace() or release().
+        """
+        with self._lock:
+            matches = [(d, label) for d, label in self.table.query(value) if label[0] != content_id]
+            if not matches:
+                self._reserved.setdefault(content_id, []).append(self.table.add(value, (content_id, path)))
+        return matches
+
+    def release(self, content_id: str):
+        """
+        Drops the images reserved by an unfinished build of `content_id`.
+        """
+        with self._lock:
+            for row in self._reserved.pop(content_id, []):
+                self.table.remove(row)
+
+    def replace(self, content_id: str, entries: List[Tuple[str, int]]):
+        """
+        Records the (path, phash) images of a pack, replacing its previous
+        set and its reservations.
+        """
+        with self.db.connection() as conn:
+            conn.execute("DELETE FROM image_phashes WHERE content_id = ?", (content_id,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO image_phashes (content_id, path, phash) VALUES (?, ?, ?)",
+                [(content_id, path, _to_signed(value)) for path, value in entries]
+            )
+        with self._lock:
+            for row in self._rows.pop(content_id, []) + self._reserved.pop(content_id, []):
+                self.table.remove(row)
+            if entries:
+                self._rows[content_id] = [self.table.add(value, (content_id, path)) for path, value in entries]
+
+    def close(self):
+        self.db.close()
@@ -1,10 +1,24 @@
 import os
+import csv
+import logging
+import time
 import shutil
 import hashlib
 import json
-from typing import List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from .keyframes import extract_keyframes
 from .alt_text import generate_alt_text
+from .hashing import HashCache, file_digest
+from .phash import MultiIndexHashTable, PerceptualIndex, image_phash
+from .asset_store import AssetStore, write_manifest
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+STATE_FILE = "pack_state.json"
+# Bump when process() output changes so existing packages are rebuilt
+PACK_VERSION = "4"
 
 class UniquePackGenerator:
     def __init__(self, config: Dict):
@@ -13,53 +27,222 @@ class UniquePackGenerator:
         self.video_root = config.get("content_sources", {}).get("video_assets_dir", "./assets/videos")
         self.output_root = config.get("unique_pack", {}).get("outputs", {}).get("package_dir", "./out/packages")
         self.min_images = config.get("unique_pack", {}).get("required_per_post", {}).get("min_images", 2)
+        self.hash_algorithm = config.get("unique_pack", {}).get("hash_algorithm", "fast")
+        hash_cache_path = config.get("unique_pack", {}).get(
+            "hash_cache", os.path.join(os.path.dirname(os.path.normpath(self.output_root)), "asset_hashes.db")
+        )
+        self.hash_cache = HashCache(hash_cache_path, self.hash_algorithm) if hash_cache_path else None
+
+        # Near-duplicate detection by pHash within a pack and against images of past packs
+        perceptual = config.get("unique_pack", {}).get("perceptual", {})
+        self.perceptual_enabled = perceptual.get("enabled", True)
+        self.max_phash_distance = perceptual.get("max_distance", 8)
+        global_index_path = perceptual.get("global_index", hash_cache_path)
+        self.phash_index = None
+        if self.perceptual_enabled and global_index_path:
+            self.phash_index = PerceptualIndex(global_index_path, self.max_phash_distance)
+
+        # Selected images are stored once by digest and linked into packages
+        store_config = config.get("unique_pack", {}).get("asset_store", {})
+        self.asset_store = AssetStore(
+            store_config.get("root", os.path.join(os.path.dirname(os.path.normpath(self.output_root)), "assets")),
+            placement=store_config.get("placement", "auto"),
+            algorithm=self.hash_algorithm,
+            hash_cache=self.hash_cache
+        )
+
+        # extract_keyframes options; frames are cached per video digest under cache_dir
+        self.keyframe_options = dict(config.get("unique_pack", {}).get("keyframes", {}))
+        self.keyframe_options.setdefault(
+            "cache_dir", os.path.join(os.path.dirname(os.path.normpath(self.output_root)), "keyframe_cache")
+        )
+
+        # Per-stage concurrency limits shared by every worker of process_batch
+        batch_config = config.get("unique_pack", {}).get("batch", {})
+        cpus = os.cpu_count() or 1
+        self.workers = batch_config.get("workers", cpus * 2)
+        self._stages = {
+            "extract": threading.BoundedSemaphore(batch_config.get("max_extract", max(1, cpus // 2))),
+            "io": threading.BoundedSemaphore(batch_config.get("max_io", 8)),
+        }
+
+    @contextmanager
+    def _stage(self, name: str):
+        with self._stages[name]:
+            yield
+
+    def _get_file_hash(self, filepath: str, cached: bool = True) -> str:
+        """
+        Streamed digest; source assets go through the persistent cache so
+        unchanged files are not reread on later runs.
+        """
+        if cached and self.hash_cache is not None:
+            return self.hash_cache.digest(filepath)
+        return file_digest(filepath, self.hash_algorithm)
+
+    def close(self):
+        if self.hash_cache is not None:
+            self.hash_cache.close()
+        if self.phash_index is not None:
+            self.phash_index.close()
+
+    def _near_duplicate(self, path: str, content_id: str, pack: MultiIndexHashTable,
+                        phashes: Dict[str, int]) -> Optional[Dict]:
+        """
+        Describes the image `path` nearly duplicates, in this pack or in
+        another content's pack, or None if it is new (and then remembers it).
+        Images Pillow cannot decode are only deduplicated byte-exactly.
+        """
+        if not self.perceptual_enabled:
+            return None
+        try:
+            value = image_phash(path)
+        except Exception as e:
+            logging.debug(f"pHash skipped for {path}: {e}")
+            return None
+        matches = pack.query(value)
+        if matches:
+            return {"file": os.path.basename(path), "scope": "pack", "matched": matches[0][1], "distance": matches[0][0]}
+        if self.phash_index is not None:
+            # Checked and claimed atomically: packs of one batch are built concurrently
+            matches = self.phash_index.reserve(content_id, os.path.abspath(path), value)
+            if matches:
+                distance, (other_content, other_path) = matches[0]
+                return {"file": os.path.basename(path), "scope": "global", "matched": other_path,
+                        "content_id": other_content, "distance": distance}
+        pack.add(value, os.path.basename(path))
+        phashes[path] = value
+        return None
+
+    def input_fingerprint(self, sku: str) -> str:
+        """
+        Digest of everything process() reads for a SKU: the video and image
+        files (by name, size and mtime) and the settings that affect the result,
+        including the exact and perceptual dedupe rules.
+        """
+        dedupe = {
+            "hash_algorithm": self.hash_algorithm,
+            "perceptual": self.perceptual_enabled,
+            "max_distance": self.max_phash_distance,
+            "global_index": self.phash_index is not None,
+        }
+        parts = [PACK_VERSION, sku, str(self.min_images), json.dumps(self.keyframe_options, sort_keys=True),
+                 json.dumps(dedupe, sort_keys=True)]
+        video_path = os.path.join(self.video_root, sku, "video.mp4")
+        sku_img_dir = os.path.join(self.assets_root, sku)
+        paths = [video_path]
+        if os.path.isdir(sku_img_dir):
+            paths += [os.path.join(sku_img_dir, name) for name in sorted(os.listdir(sku_img_dir))]
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            parts.append(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}")
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _load_state(self, package_dir: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(package_dir, STATE_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
 
-    def _get_file_hash(self, filepath: str) -> str:
-        hasher = hashlib.md5()
-        with open(filepath, 'rb') as f:
-            buf = f.read()
-            hasher.update(buf)
-        return hasher.hexdigest()
+    def _save_state(self, package_dir: str, fingerprint: str, result: Dict):
+        path = os.path.join(package_dir, STATE_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": fingerprint, "result": result}, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
 
-    def process(self, sku: str, content_id: str) -> Dict:
+    def process(self, sku: str, content_id: str, force: bool = False) -> Dict:
+        """
+        Builds the package for one SKU. Unless `force` is set, a package whose
+        inputs are unchanged since the last run is not rebuilt; its previous
+        result is returned with "skipped": True.
+        """
         package_dir = os.path.join(self.output_root, content_id)
+        fingerprint = self.input_fingerprint(sku)
+        if not force:
+            state = self._load_state(package_dir)
+            if state and state.get("fingerprint") == fingerprint:
+                return {**state["result"], "skipped": True}
+
+        try:
+            result = self._build(sku, content_id, package_dir)
+        except BaseException:
+            if self.phash_index is not None:
+                self.phash_index.release(content_id)
+            raise
+        self._save_state(package_dir, fingerprint, result)
+        return result
+
+    def _build(self, sku: str, content_id: str, package_dir: str) -> Dict:
         img_dir = os.path.join(package_dir, "selected_images")
+        if os.path.exists(img_dir):
+            # Leftovers of a previous build with different inputs
+            shutil.rmtree(img_dir)
         os.makedirs(img_dir, exist_ok=True)
 
         selected_files = []
+        assets: Dict[str, Dict] = {}
         hashes = set()
+        pack_phashes = MultiIndexHashTable(self.max_phash_distance)
+        phashes: Dict[str, int] = {}
+        near_duplicates = []
 
         # 1. Check for Video and extract keyframes
         video_path = os.path.join(self.video_root, sku, "video.mp4")
         if os.path.exists(video_path):
             temp_frames_dir = os.path.join(package_dir, "temp_frames")
-            frames = extract_keyframes(video_path, temp_frames_dir)
-            for f in frames:
-                f_hash = self._get_file_hash(f)
-                if f_hash not in hashes:
-                    hashes.add(f_hash)
-                    dest = os.path.join(img_dir, os.path.basename(f))
-                    shutil.move(f, dest)
-                    selected_files.append(dest)
+            with self._stage("extract"):
+                frames = extract_keyframes(video_path, temp_frames_dir, hash_cache=self.hash_cache,
+                                           **self.keyframe_options)
+            with self._stage("io"):
+                for f in frames:
+                    # Freshly extracted frames: nothing to gain from caching
+                    f_hash = self._get_file_hash(f, cached=False)
+                    if f_hash not in hashes:
+                        hashes.add(f_hash)
+                        duplicate = self._near_duplicate(f, content_id, pack_phashes, phashes)
+                        if duplicate:
+                            near_duplicates.append(duplicate)
+                            continue
+                        dest = os.path.join(img_dir, os.path.basename(f))
+                        phashes[dest] = phashes.pop(f, None)
+                        assets[os.path.basename(dest)] = self.asset_store.add(f, dest, digest=f_hash, move=True)
+                        selected_files.append(dest)
             if os.path.exists(temp_frames_dir):
                 shutil.rmtree(temp_frames_dir)
 
         # 2. Check for Static Images
         sku_img_dir = os.path.join(self.assets_root, sku)
         if os.path.exists(sku_img_dir):
-            for f_name in os.listdir(sku_img_dir):
-                f_path = os.path.join(sku_img_dir, f_name)
-                if os.path.isfile(f_path) and f_name.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    f_hash = self._get_file_hash(f_path)
-                    if f_hash not in hashes:
-                        hashes.add(f_hash)
-                        dest = os.path.join(img_dir, f_name)
-                        shutil.copy2(f_path, dest)
-                        selected_files.append(dest)
+            with self._stage("io"):
+                for f_name in sorted(os.listdir(sku_img_dir)):
+                    f_path = os.path.join(sku_img_dir, f_name)
+                    if os.path.isfile(f_path) and f_name.lower().endswith(IMAGE_EXTENSIONS):
+                        f_hash = self._get_file_hash(f_path)
+                        if f_hash not in hashes:
+                            hashes.add(f_hash)
+                            duplicate = self._near_duplicate(f_path, content_id, pack_phashes, phashes)
+                            if duplicate:
+                                near_duplicates.append(duplicate)
+                                continue
+                            dest = os.path.join(img_dir, f_name)
+                            phashes[dest] = phashes.pop(f_path, None)
+                            assets[f_name] = self.asset_store.add(f_path, dest, digest=f_hash)
+                            selected_files.append(dest)
+
+        write_manifest(package_dir, assets)
 
         # 3. Validation
         if len(selected_files) < self.min_images:
-            return {"status": "REJECT", "reason": f"Insufficient unique images. Found {len(selected_files)}, need {self.min_images}."}
+            if self.phash_index is not None:
+                self.phash_index.replace(content_id, [])
+            return {"status": "REJECT", "reason": f"Insufficient unique images. Found {len(selected_files)}, need {self.min_images}.",
+                    "near_duplicates": near_duplicates}
+        if self.phash_index is not None:
+            self.phash_index.replace(content_id, [(os.path.abspath(p), v) for p, v in phashes.items() if v is not None])
 
         # 4. Alt Text Generation
         alt_texts = {os.path.basename(f): generate_alt_text(f, sku) for f in selected_files}
@@ -86,5 +269,66 @@ class UniquePackGenerator:
             "status": "PASS",
             "package_path": package_dir,
             "image_count": len(selected_files),
+            "near_duplicates": near_duplicates,
             "facts_count": 2 # Hardcoded for now as per requirement
         }
+
+    def process_batch(self, items: Iterable[Tuple[str, str]], force: bool = False) -> Iterator[Dict]:
+        """
+        Runs process() for many (sku, content_id) pairs on a bounded thread
+        pool and yields one result per item as it completes (with its sku and
+        content_id), then {"stats": {...}}. Frame extraction and file I/O are
+        additionally capped by the per-stage limits from unique_pack.batch.
+        """
+        stats = {"total": 0, "built": 0, "skipped": 0, "errors": 0, "by_status": {}}
+        started = time.perf_counter()
+
+        def run(sku: str, content_id: str) -> Dict:
+            try:
+                result = self.process(sku, content_id, force=force)
+            except Exception as e:
+                result = {"status": "ERROR", "error": f"{type(e).__name__}: {e}"}
+            return {"sku": sku, "content_id": content_id, **result}
+
+        def count(record: Dict) -> Dict:
+            stats["total"] += 1
+            if record["status"] == "ERROR":
+                stats["errors"] += 1
+            elif record.get("skipped"):
+                stats["skipped"] += 1
+            else:
+                stats["built"] += 1
+            stats["by_status"][record["status"]] = stats["by_status"].get(record["status"], 0) + 1
+            return record
+
+        with ThreadPoolExecutor(max(1, self.workers)) as pool:
+            pending = set()
+            for sku, content_id in items:
+                pending.add(pool.submit(run, sku, content_id))
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield count(future.result())
+            for future in wait(pending).done:
+                yield count(future.result())
+
+        elapsed = time.perf_counter() - started
+        stats["workers"] = self.workers
+        stats["elapsed_sec"] = round(elapsed, 3)
+        stats["skus_per_sec"] = round(stats["total"] / elapsed, 1) if elapsed > 0 else None
+        yield {"stats": stats}
+
+def load_manifest(path: str) -> Iterator[Tuple[str, str]]:
+    """
+    (sku, content_id) pairs from a CSV with sku,content_id columns or from
+    JSONL objects with those keys.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield row["sku"], row["content_id"]
+        else:
+            for row in csv.DictReader(f):
+                yield row["sku"], row["content_id"]
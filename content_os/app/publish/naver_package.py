@@ -3,6 +3,9 @@ import json
 import zipfile
 from typing import Dict
 
+# Already-compressed formats are stored as-is; deflating them saves nothing
+STORED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp4')
+
 class NaverPackageGenerator:
     def __init__(self, output_dir: str):
         self.output_dir = output_dir
@@ -21,12 +24,13 @@ class NaverPackageGenerator:
             
         # 3. Create ZIP
         zip_file = os.path.join(self.output_dir, f"naver_{content_id}.zip")
-        with zipfile.ZipFile(zip_file, 'w') as z:
+        with zipfile.ZipFile(zip_file, 'w', compression=zipfile.ZIP_DEFLATED) as z:
             z.write(os.path.join(package_path, "content.html"), "content.html")
             z.write(os.path.join(package_path, "meta.json"), "meta.json")
-            # Add images if provided
+            # Images are streamed straight from the pack (linked asset store blobs), never staged
             for img in images:
                 if os.path.exists(img):
-                    z.write(img, os.path.join("images", os.path.basename(img)))
+                    compression = zipfile.ZIP_STORED if img.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+                    z.write(img, os.path.join("images", os.path.basename(img)), compress_type=compression)
                     
         return zip_file
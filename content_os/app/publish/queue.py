@@ -1,44 +1,217 @@
-from typing import List, Dict, Optional
+import json
+import time
+from collections.abc import Mapping
+from typing import List, Dict, Iterator, Optional
 from .state_machine import ContentState, StateMachine
+from ..storage.db import Database, get_database
+from ..storage.migrations import migrate
+
+# schema_version steps for the "publish_queue" component
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS publish_items (
+            id TEXT PRIMARY KEY,
+            platform TEXT,
+            state TEXT NOT NULL,
+            approval_required INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+        # get_ready_items is one range scan of this index, oldest first
+        "CREATE INDEX IF NOT EXISTS idx_publish_items_ready ON publish_items (state, platform, approval_required, updated_at, id)",
+        """
+        CREATE TABLE IF NOT EXISTS publish_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_id TEXT NOT NULL,
+            from_state TEXT,
+            to_state TEXT NOT NULL,
+            at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_publish_history_content ON publish_history (content_id, id)",
+    ],
+]
+
+class QueueItems(Mapping):
+    """
+    Read-only content_id -> item view of the queue, for code written
+    against the old in-memory dict.
+    """
+    def __init__(self, queue: "PublishQueue"):
+        self._queue = queue
+
+    def __getitem__(self, content_id: str) -> Dict:
+        item = self._queue.get_item(content_id)
+        if item is None:
+            raise KeyError(content_id)
+        return item
+
+    def __iter__(self) -> Iterator[str]:
+        with self._queue.db.connection() as conn:
+            ids = [row[0] for row in conn.execute("SELECT id FROM publish_items ORDER BY id")]
+        return iter(ids)
+
+    def __len__(self) -> int:
+        return self._queue.count()
 
 class PublishQueue:
-    def __init__(self, config: Dict):
+    """
+    Publishing queue persisted in SQLite, shared by every process using the
+    same database file (restarts and multiple uvicorn workers see one queue).
+
+    Transitions are validated by StateMachine against the stored state and
+    written as a compare-and-set (UPDATE ... WHERE state = <state read>)
+    together with their history row, so two workers cannot both apply a
+    transition from the same state. Ready items come from an index on
+    (state, platform, approval_required, updated_at, id): O(log n) plus the
+    items returned, however large the queue grows.
+    """
+    def __init__(self, config: Dict, db_path: str = "blogs.db", db: Optional[Database] = None):
         self.config = config
-        self.items: Dict[str, Dict] = {} # content_id -> item
-
-    def add_item(self, content_id: str, data: Dict):
-        self.items[content_id] = {
-            "id": content_id,
-            "data": data,
-            "state": ContentState.DRAFT,
-            "history": [ContentState.DRAFT],
-            "human_approval_required": False
-        }
-
-    def update_state(self, content_id: str, next_state: ContentState):
-        item = self.items.get(content_id)
-        if not item:
-            raise ValueError("Item not found")
-            
-        StateMachine.validate_transition(item["state"], next_state)
-        
-        # Governance check
-        if next_state == ContentState.READY:
-            platform = item["data"].get("platform")
-            if platform in self.config.get("publishing", {}).get("governance", {}).get("require_human_approval_for", []):
-                item["human_approval_required"] = True
-        
-        item["state"] = next_state
-        item["history"].append(next_state)
-
-    def get_ready_items(self, platform: str) -> List[Dict]:
-        return [
-            item for item in self.items.values()
-            if item["state"] == ContentState.READY 
-            and item["data"].get("platform") == platform
-            and not item["human_approval_required"]
-        ]
+        self.db_path = db_path
+        self.db = db or get_database(db_path)
+        self.approval_platforms = set(config.get("publishing", {}).get("governance", {}).get("require_human_approval_for", []))
+        self.items = QueueItems(self)
+        with self.db.connection() as conn:
+            migrate(conn, "publish_queue", MIGRATIONS)
+
+    def close(self):
+        self.db.close()
+
+    def add_item(self, content_id: str, data: Dict) -> bool:
+        return self.add_items({content_id: data}) == 1
+
+    def add_items(self, items: Dict[str, Dict]) -> int:
+        """
+        Adds many items as DRAFT in one transaction and returns how many were
+        new. Ids already queued are left untouched, state and history
+        included, so re-running an ingestion job is harmless; an item goes
+        back to DRAFT only through a recorded transition (REJECTED -> DRAFT).
+        """
+        now = time.time()
+        added = []
+        with self.db.connection() as conn:
+            for cid, data in items.items():
+                cursor = conn.execute(
+                    "INSERT INTO publish_items (id, platform, state, approval_required, data, updated_at) "
+                    "VALUES (?, ?, ?, 0, ?, ?) ON CONFLICT (id) DO NOTHING",
+                    (cid, data.get("platform"), ContentState.DRAFT.value, json.dumps(data, ensure_ascii=False), now)
+                )
+                if cursor.rowcount == 1:
+                    added.append((cid, ContentState.DRAFT.value, now))
+            conn.executemany(
+                "INSERT INTO publish_history (content_id, from_state, to_state, at) VALUES (?, NULL, ?, ?)", added
+            )
+        return len(added)
+
+    def update_state(self, content_id: str, next_state: ContentState, max_retries: int = 3):
+        next_state = ContentState(next_state)
+        for _ in range(max_retries):
+            with self.db.connection() as conn:
+                row = conn.execute(
+                    "SELECT state, platform, approval_required FROM publish_items WHERE id = ?", (content_id,)
+                ).fetchone()
+                if not row:
+                    raise ValueError("Item not found")
+                current = ContentState(row[0])
+                StateMachine.validate_transition(current, next_state)
+
+                # Governance check
+                approval = row[2]
+                if next_state == ContentState.READY and row[1] in self.approval_platforms:
+                    approval = 1
+
+                now = time.time()
+                cursor = conn.execute(
+                    "UPDATE publish_items SET state = ?, approval_required = ?, updated_at = ? WHERE id = ? AND state = ?",
+                    (next_state.value, approval, now, content_id, current.value)
+                )
+                if cursor.rowcount == 1:
+                    conn.execute(
+                        "INSERT INTO publish_history (content_id, from_state, to_state, at) VALUES (?, ?, ?, ?)",
+                        (content_id, current.value, next_state.value, now)
+                    )
+                    return
+            # Another worker moved the item between our read and write: re-validate against its new state
+        raise ValueError(f"Concurrent update of {content_id}, retry the transition")
+
+    def get_ready_items(self, platform: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Approved READY items for a platform, longest-waiting first.
+        """
+        sql = ("SELECT id, platform, state, approval_required, data FROM publish_items "
+               "WHERE state = ? AND platform = ? AND approval_required = 0 ORDER BY updated_at, id")
+        params = [ContentState.READY.value, platform]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.db.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return self._items(rows)
 
     def approve(self, content_id: str):
-        if content_id in self.items:
-            self.items[content_id]["human_approval_required"] = False
+        with self.db.connection() as conn:
+            conn.execute("UPDATE publish_items SET approval_required = 0 WHERE id = ?", (content_id,))
+
+    def get_item(self, content_id: str) -> Optional[Dict]:
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, platform, state, approval_required, data FROM publish_items WHERE id = ?", (content_id,)
+            ).fetchall()
+        items = self._items(rows)
+        return items[0] if items else None
+
+    def history(self, content_id: str) -> List[Dict]:
+        """
+        Every transition of an item since it was added, oldest first.
+        """
+        with self.db.connection() as conn:
+            rows = conn.execute(
+                "SELECT from_state, to_state, at FROM publish_history WHERE content_id = ? ORDER BY id", (content_id,)
+            ).fetchall()
+        return [{"from": f, "to": t, "at": at} for f, t, at in rows]
+
+    def count(self, state: Optional[ContentState] = None, platform: Optional[str] = None) -> int:
+        sql = "SELECT COUNT(*) FROM publish_items"
+        clauses, params = [], []
+        if state is not None:
+            clauses.append("state = ?")
+            params.append(ContentState(state).value)
+        if platform is not None:
+            clauses.append("platform = ?")
+            params.append(platform)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self.db.connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def _items(self, rows: List[tuple]) -> List[Dict]:
+        """
+        Item dicts in the in-memory queue's shape, with their state history
+        loaded in one query.
+        """
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        history: Dict[str, List[ContentState]] = {cid: [] for cid in ids}
+        with self.db.connection() as conn:
+            # Chunked below SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                for cid, state in conn.execute(
+                    f"SELECT content_id, to_state FROM publish_history WHERE content_id IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                    chunk
+                ):
+                    history[cid].append(ContentState(state))
+        return [
+            {
+                "id": cid,
+                "data": json.loads(data),
+                "state": ContentState(state),
+                "history": history[cid],
+                "human_approval_required": bool(approval)
+            }
+            for cid, platform, state, approval, data in rows
+        ]
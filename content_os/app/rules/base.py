@@ -1,7 +1,24 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict
+from .matcher import KeywordMatcher
 
 class BaseRule(ABC):
+    # Literal keywords the rule looks for. RuleCatalog compiles the keywords of
+    # every rule of a language into one matcher and passes the hits in context.
+    keywords: List[str] = []
+    ignore_case: bool = False
+
+    def find_keywords(self, content: str, context: Dict) -> Dict[str, List[int]]:
+        """
+        Keyword -> start offsets, taken from the catalog scan when available.
+        """
+        shared = context.get("keyword_hits", {})
+        if self.ignore_case in shared:
+            return shared[self.ignore_case]
+        if getattr(self, "_matcher", None) is None:
+            self._matcher = KeywordMatcher(self.keywords, self.ignore_case)
+        return self._matcher.scan(content)
+
     @abstractmethod
     def evaluate(self, content: str, context: Dict) -> Dict:
         pass
@@ -1,8 +1,14 @@
+import json
+import hashlib
 from typing import List, Dict
 from .ko_rules import KoBannedClaimsRule, KoDisclosureRule
 from .en_rules import EnBannedClaimsRule, EnDisclosureRule
+from .matcher import KeywordMatcher
 
 class RuleCatalog:
+    # Bump when rule logic changes without a config change, to invalidate cached results
+    RULES_VERSION = "1"
+
     def __init__(self, config: Dict):
         self.config = config
         self.ko_rules = [
@@ -13,8 +19,47 @@ class RuleCatalog:
             EnBannedClaimsRule(config['compliance']['banned_claims']['en']),
             EnDisclosureRule()
         ]
+        self.ymyl_disclaimers = config['compliance'].get('ymyl_disclaimers', ["면책"])
+        self.matchers = {
+            "ko": self._compile(self.ko_rules),
+            "en": self._compile(self.en_rules)
+        }
+        self.fingerprint = self._fingerprint()
+
+    def _fingerprint(self) -> str:
+        """
+        Stable hash of the loaded config and rule set.
+        """
+        payload = json.dumps({
+            "version": self.RULES_VERSION,
+            "config": self.config,
+            "rules": [type(r).__name__ for r in self.ko_rules + self.en_rules]
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _compile(self, rules: List) -> Dict[bool, KeywordMatcher]:
+        """
+        One automaton per case mode used by the rules (normally just one),
+        with the YMYL disclaimer keywords added to each.
+        """
+        groups: Dict[bool, List[str]] = {}
+        for rule in rules:
+            groups.setdefault(rule.ignore_case, []).extend(rule.keywords)
+        if not groups:
+            groups[False] = []
+        return {
+            ignore_case: KeywordMatcher(words + self.ymyl_disclaimers, ignore_case)
+            for ignore_case, words in groups.items()
+        }
 
     def get_rules(self, lang: str):
         if lang == "ko":
             return self.ko_rules
         return self.en_rules
+
+    def scan(self, lang: str, content: str) -> Dict[bool, Dict[str, List[int]]]:
+        """
+        Scans content once per case mode and returns keyword hits for the rules' context.
+        """
+        matchers = self.matchers["ko" if lang == "ko" else "en"]
+        return {ignore_case: m.scan(content) for ignore_case, m in matchers.items()}
@@ -1,26 +1,40 @@
 from .base import BaseRule
+from .matcher import describe_location
 from typing import List, Dict
 
 class EnBannedClaimsRule(BaseRule):
+    ignore_case = True
+
     def __init__(self, banned_words: List[str]):
         self.banned_words = banned_words
+        self.keywords = banned_words
 
     def evaluate(self, content: str, context: Dict) -> Dict:
-        found = [word for word in self.banned_words if word.lower() in content.lower()]
+        hits = self.find_keywords(content, context)
+        found = [word for word in self.banned_words if word in hits]
         if found:
             return {
                 "status": "REJECT",
                 "code": "EN_BANNED_CLAIM",
-                "detail": f"Banned claims detected: {', '.join(found)}"
+                "detail": f"Banned claims detected: {', '.join(found)}",
+                "location": describe_location(content, [p for word in found for p in hits[word]])
             }
         return None
 
 class EnDisclosureRule(BaseRule):
+    keywords = ["sponsored", "affiliate"]
+    ignore_case = True
+    window = 200
+
     def evaluate(self, content: str, context: Dict) -> Dict:
-        if context.get("is_sponsored") and not any(word in content.lower()[:200] for word in ["sponsored", "affiliate"]):
+        if not context.get("is_sponsored"):
+            return None
+        hits = self.find_keywords(content, context)
+        if not any(p + len(word) <= self.window for word in self.keywords for p in hits.get(word, [])):
             return {
                 "status": "REJECT",
                 "code": "EN_MISSING_DISCLOSURE",
-                "detail": "Missing disclosure (sponsored/affiliate) in the intro."
+                "detail": "Missing disclosure (sponsored/affiliate) in the intro.",
+                "location": "intro"
             }
         return None
@@ -1,26 +1,37 @@
 from .base import BaseRule
+from .matcher import describe_location
 from typing import List, Dict
 
 class KoBannedClaimsRule(BaseRule):
     def __init__(self, banned_words: List[str]):
         self.banned_words = banned_words
+        self.keywords = banned_words
 
     def evaluate(self, content: str, context: Dict) -> Dict:
-        found = [word for word in self.banned_words if word in content]
+        hits = self.find_keywords(content, context)
+        found = [word for word in self.banned_words if word in hits]
         if found:
             return {
                 "status": "REJECT",
                 "code": "KO_BANNED_CLAIM",
-                "detail": f"금지된 표현 발견: {', '.join(found)}"
+                "detail": f"금지된 표현 발견: {', '.join(found)}",
+                "location": describe_location(content, [p for word in found for p in hits[word]])
             }
         return None
 
 class KoDisclosureRule(BaseRule):
+    keywords = ["광고", "협찬", "제휴"]
+    window = 100
+
     def evaluate(self, content: str, context: Dict) -> Dict:
-        if context.get("is_sponsored") and not any(word in content[:100] for word in ["광고", "협찬", "제휴"]):
+        if not context.get("is_sponsored"):
+            return None
+        hits = self.find_keywords(content, context)
+        if not any(p + len(word) <= self.window for word in self.keywords for p in hits.get(word, [])):
             return {
                 "status": "REJECT",
                 "code": "KO_MISSING_DISCLOSURE",
-                "detail": "본문 상단에 광고/협찬/제휴 표기가 누락되었습니다."
+                "detail": "본문 상단에 광고/협찬/제휴 표기가 누락되었습니다.",
+                "location": "본문 상단"
             }
         return None
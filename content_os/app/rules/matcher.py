@@ -0,0 +1,92 @@
+import re
+from bisect import bisect_right
+from collections import deque
+from typing import List, Dict, Tuple, Iterable
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword list.
+    A text is scanned once regardless of how many keywords are compiled in.
+    """
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]  # node -> keyword ids ending here
+
+        seen = set()
+        for word in keywords:
+            if not word or word in seen:
+                continue
+            seen.add(word)
+            self._insert(word.lower() if ignore_case else word, len(self.keywords))
+            self.keywords.append(word)
+        self._build_links()
+
+    def _insert(self, word: str, keyword_id: int):
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(keyword_id)
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                if node:
+                    f = self._fail[node]
+                    while f and ch not in self._goto[f]:
+                        f = self._fail[f]
+                    self._fail[child] = self._goto[f].get(ch, 0)
+                # Inherit matches of the longest proper suffix
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Returns (start offset, keyword) for every occurrence, overlaps included.
+        """
+        if self.ignore_case:
+            text = text.lower()
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self.keywords
+        matches = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for kid in out[node]:
+                    word = keywords[kid]
+                    matches.append((i - len(word) + 1, word))
+        return matches
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """
+        Keyword -> sorted start offsets, for keywords that occur at least once.
+        """
+        hits: Dict[str, List[int]] = {}
+        for start, word in self.find_all(text):
+            hits.setdefault(word, []).append(start)
+        for positions in hits.values():
+            positions.sort()
+        return hits
+
+def paragraph_numbers(content: str, positions: Iterable[int]) -> List[int]:
+    """
+    1-based paragraph numbers (blank-line separated) of the given offsets.
+    """
+    starts = [0] + [m.end() for m in re.finditer(r'\n\s*\n', content)]
+    return sorted({bisect_right(starts, p) for p in positions})
+
+def describe_location(content: str, positions: Iterable[int]) -> str:
+    return ", ".join(f"{n}문단" for n in paragraph_numbers(content, positions))
@@ -1,41 +1,155 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Dict
+import os
+import json
+from typing import List, Dict, Optional
 import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from .neighbors import NeighborIndex, post_text
+
+def save_clusters(result: Dict, path: str):
+    """
+    Writes an assign_clusters() result atomically, for the link recommender
+    and sitemap to read without reclustering.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def load_clusters(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 class TopicClusterer:
-    def __init__(self, min_cluster_size: int = 4):
+    def __init__(self, min_cluster_size: int = 4, neighbors: int = 10, max_cells: int = 1 << 24,
+                 n_clusters: Optional[int] = None, svd_components: int = 100, random_state: int = 0,
+                 max_clusters: int = 256):
         self.min_cluster_size = min_cluster_size
+        self.n_clusters = n_clusters
+        self.max_clusters = max_clusters
+        self.svd_components = svd_components
+        self.random_state = random_state
+        self.neighbors = neighbors
+        self.max_cells = max_cells
+        self.index = None
+        self.posts: List[Dict] = []
+
+    def _attach_neighbors(self, rows):
+        for i in rows:
+            self.posts[i]['cluster_neighbors'] = [
+                {
+                    "id": self.posts[j].get("id"),
+                    "slug": self.posts[j].get("slug"),
+                    "title": self.posts[j].get("title"),
+                    "score": score
+                }
+                for j, score in self.index.neighbors(i, fill=True)
+            ]
 
     def cluster_posts(self, posts: List[Dict]) -> List[Dict]:
         """
         Groups posts based on content similarity (title + summary + keywords).
+        Each post gets its top `neighbors` most similar posts, computed in
+        sparse row blocks (see NeighborIndex) rather than a dense N x N matrix.
         """
         if not posts:
             return []
 
-        texts = [f"{p['title']} {p.get('summary', '')} {' '.join(p.get('keywords', []))}" for p in posts]
-        
-        vectorizer = TfidfVectorizer()
-        tfidf_matrix = vectorizer.fit_transform(texts)
-        
-        similarity_matrix = cosine_similarity(tfidf_matrix)
-        
-        # Simple clustering: for each post, find its most similar neighbors
-        for i, post in enumerate(posts):
-            # Get indices of posts sorted by similarity (descending)
-            similar_indices = np.argsort(similarity_matrix[i])[::-1]
-            # Exclude self (index i)
-            similar_indices = [idx for idx in similar_indices if idx != i]
-            
-            post['cluster_neighbors'] = [
-                {
-                    "id": posts[idx].get("id"),
-                    "slug": posts[idx].get("slug"),
-                    "title": posts[idx].get("title"),
-                    "score": float(similarity_matrix[i][idx])
-                }
-                for idx in similar_indices[:10] # Keep top 10 potential neighbors
-            ]
-            
+        self.posts = list(posts)
+        self.index = NeighborIndex(self.neighbors, self.max_cells).fit([post_text(p) for p in posts])
+        self._attach_neighbors(range(len(posts)))
         return posts
+
+    def add_posts(self, posts: List[Dict]) -> List[Dict]:
+        """
+        Incremental mode: adds new posts to the last cluster_posts() result
+        without recomputing the archive. Returns the new posts plus the
+        existing posts whose neighbour lists changed.
+        """
+        if self.index is None:
+            return self.cluster_posts(posts)
+        start = len(self.posts)
+        self.posts.extend(posts)
+        changed = self.index.add([post_text(p) for p in posts])
+        rows = sorted(set(changed.tolist()) | set(range(start, len(self.posts))))
+        self._attach_neighbors(rows)
+        return [self.posts[i] for i in rows]
+
+    def assign_clusters(self, posts: List[Dict]) -> Dict:
+        """
+        Topic clusters: TF-IDF reduced with truncated SVD, then mini-batch
+        k-means. Every step costs O(n * n_clusters); the default of
+        sqrt(n / 2) clusters is capped at max_clusters, so large archives
+        scale linearly with the number of posts. Clusters smaller than
+        min_cluster_size are dissolved into the nearest remaining cluster.
+        Each cluster's pillar is the post closest to its centroid. Posts get
+        "cluster_id" and "is_pillar"; the returned dict can be persisted with
+        save_clusters(). Cluster ids are ordered by size, largest first.
+        """
+        if not posts:
+            return {"clusters": [], "assignments": {}}
+
+        tfidf = TfidfVectorizer(dtype=np.float32, sublinear_tf=True)
+        matrix = tfidf.fit_transform([post_text(p) for p in posts])
+        n = len(posts)
+        components = min(self.svd_components, matrix.shape[1] - 1, n - 1)
+        if components >= 2:
+            features = TruncatedSVD(components, random_state=self.random_state).fit_transform(matrix)
+        else:
+            features = matrix.toarray()
+        features = normalize(features)
+
+        # Default: about sqrt(n / 2) clusters up to max_clusters, never more than min_cluster_size allows
+        n_clusters = self.n_clusters or min(int(np.sqrt(n / 2)), self.max_clusters)
+        n_clusters = max(1, min(n_clusters, n // max(1, self.min_cluster_size)))
+        kmeans = MiniBatchKMeans(n_clusters, batch_size=1024, n_init=3, random_state=self.random_state)
+        labels = kmeans.fit_predict(features)
+
+        sizes = np.bincount(labels, minlength=n_clusters)
+        survivors = np.nonzero(sizes >= self.min_cluster_size)[0]
+        if len(survivors) == 0:
+            survivors = np.array([int(np.argmax(sizes))])
+        centroids = normalize(kmeans.cluster_centers_[survivors])
+        dissolved = ~np.isin(labels, survivors)
+        if dissolved.any():
+            labels[dissolved] = survivors[np.argmax(features[dissolved] @ centroids.T, axis=1)]
+
+        terms = tfidf.get_feature_names_out()
+        clusters = []
+        for label in survivors:
+            members = np.nonzero(labels == label)[0]
+            centroid = normalize(features[members].mean(axis=0, keepdims=True))[0]
+            closeness = features[members] @ centroid
+            # Highest closeness, lowest index on ties
+            pillar = int(members[np.lexsort((members, -closeness))[0]])
+            weights = np.asarray(matrix[members].mean(axis=0)).ravel()
+            clusters.append({
+                "members": members,
+                "pillar": pillar,
+                "terms": [str(terms[t]) for t in np.argsort(-weights, kind="stable")[:3]]
+            })
+        clusters.sort(key=lambda c: (-len(c["members"]), c["pillar"]))
+
+        assignments = {}
+        result = []
+        for cluster_id, cluster in enumerate(clusters):
+            for i in cluster["members"]:
+                posts[i]["cluster_id"] = cluster_id
+                posts[i]["is_pillar"] = bool(i == cluster["pillar"])
+                assignments[str(posts[i].get("id"))] = cluster_id
+            pillar = posts[cluster["pillar"]]
+            result.append({
+                "cluster_id": cluster_id,
+                "size": len(cluster["members"]),
+                "pillar_id": pillar.get("id"),
+                "pillar_slug": pillar.get("slug"),
+                "pillar_title": pillar.get("title"),
+                "terms": cluster["terms"],
+                "members": [posts[i].get("id") for i in cluster["members"]]
+            })
+        return {"clusters": result, "assignments": assignments}
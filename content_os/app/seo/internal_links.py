@@ -1,10 +1,20 @@
-from typing import List, Dict
-import random
+from typing import List, Dict, Iterable, Optional
+import zlib
+import numpy as np
+from .cluster import load_clusters
+from .link_planner import LinkPlanner, Link
 
 class InternalLinkRecommender:
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, clusters: Optional[Dict] = None):
         self.config = config
         self.max_links = config.get("internal_links", {}).get("max_links_per_post", 5)
+
+        # Topic clusters persisted by TopicClusterer.assign_clusters / save_clusters
+        clusters_path = config.get("internal_links", {}).get("clusters_path")
+        if clusters is None and clusters_path:
+            clusters = load_clusters(clusters_path)
+        self.clusters = {c["cluster_id"]: c for c in (clusters or {}).get("clusters", [])}
+        self.post_clusters = (clusters or {}).get("assignments", {})
         
         # Action-based anchor templates
         self.anchor_templates = [
@@ -15,22 +25,43 @@ class InternalLinkRecommender:
             "전문가가 제안하는 {title} 활용법"
         ]
 
-    def _generate_anchor(self, target_title: str) -> str:
-        template = random.choice(self.anchor_templates)
+    def _generate_anchor(self, target_title: str, key: str = "") -> str:
+        # Stable per (source, target) pair: same anchor on every run, varied across links
+        template = self.anchor_templates[zlib.crc32(f"{key}|{target_title}".encode("utf-8")) % len(self.anchor_templates)]
         return template.format(title=target_title)
 
+    def _pillar_link(self, post: Dict, neighbors: List[Dict]) -> Optional[Dict]:
+        """
+        The pillar post of this post's topic cluster, unless it is the post itself.
+        """
+        cluster = self.clusters.get(self.post_clusters.get(str(post.get("id"))))
+        if not cluster or cluster["pillar_id"] == post.get("id"):
+            return None
+        for link in neighbors:
+            if link["slug"] == cluster["pillar_slug"]:
+                return link
+        return {"id": cluster["pillar_id"], "slug": cluster["pillar_slug"], "title": cluster["pillar_title"], "score": 0.0}
+
     def recommend_links(self, post: Dict) -> Dict:
         """
-        Selects top-K links and generates anchors/snippets.
+        Selects top-K links and generates anchors/snippets. With topic
+        clusters loaded, the cluster's pillar post is always the first link.
         """
         neighbors = post.get('cluster_neighbors', [])
-        selected_links = neighbors[:self.max_links]
-        
+        pillar = self._pillar_link(post, neighbors)
+        if pillar:
+            neighbors = [pillar] + [link for link in neighbors if link['slug'] != pillar['slug']]
+        return self.render_links(post, neighbors[:self.max_links])
+
+    def render_links(self, post: Dict, selected_links: List[Dict]) -> Dict:
+        """
+        Anchors, URLs and the markdown snippet for links already chosen for a post.
+        """
         recommendations = []
         markdown_snippets = []
-        
+
         for link in selected_links:
-            anchor = self._generate_anchor(link['title'])
+            anchor = self._generate_anchor(link['title'], str(post.get("slug", post.get("id"))))
             url = f"/{link['slug']}"
             
             recommendations.append({
@@ -48,3 +79,32 @@ class InternalLinkRecommender:
             "recommendations": recommendations,
             "markdown_snippet": "\n".join(markdown_snippets)
         }
+
+    def plan_site(self, posts: List[Dict], ids: np.ndarray, scores: np.ndarray,
+                  previous: Optional[Iterable[Link]] = None, changed: Optional[Iterable[int]] = None) -> Dict:
+        """
+        Site-wide links with LinkPlanner instead of per-post top-k. ids/scores
+        are the neighbour arrays of a NeighborIndex built over `posts` (same
+        row order). Returns {"results": [recommend_links-style dicts],
+        "links": [(source, target, score)], "orphans": [...], "stats": {...}}.
+        """
+        row_of = {post.get("id"): row for row, post in enumerate(posts)}
+        pillars = None
+        if self.clusters:
+            pillars = [
+                row_of.get(self.clusters[self.post_clusters[str(post.get("id"))]]["pillar_id"], -1)
+                if str(post.get("id")) in self.post_clusters else -1
+                for post in posts
+            ]
+        plan = LinkPlanner(self.config).plan(ids, scores, pillars, previous=previous, changed=changed)
+
+        outgoing: List[List[Dict]] = [[] for _ in posts]
+        for source, target, score in plan["links"]:
+            outgoing[source].append({
+                "id": posts[target].get("id"),
+                "slug": posts[target].get("slug"),
+                "title": posts[target].get("title"),
+                "score": score
+            })
+        plan["results"] = [self.render_links(post, links) for post, links in zip(posts, outgoing)]
+        return plan
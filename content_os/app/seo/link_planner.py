@@ -0,0 +1,163 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+Link = Tuple[int, int, float]
+
+class LinkPlanner:
+    """
+    Site-wide internal link plan over the neighbour graph.
+
+    Per-post top-k piles links onto a few popular posts and leaves others
+    with none. The planner instead picks links for the whole site at once:
+      0. posts link to their cluster's pillar, most similar members first,
+         up to `max_pillar_inbound` links per pillar (defaults to
+         `max_inbound`; raise it to let hub pages collect more),
+      1. posts with fewer than `min_inbound` inbound links get their best
+         available sources first, hardest-to-place posts first,
+      2. the remaining capacity is filled greedily by similarity, with at
+         most `max_links` outbound and `max_inbound` inbound links per post.
+    Similarity is symmetric, so an edge from either post's neighbour list is
+    a candidate in both directions. Ties are broken by row, so plans are
+    deterministic. plan(previous=..., changed=...) keeps every previous link
+    that does not touch a changed post and re-plans only around those.
+    """
+    def __init__(self, config: Dict):
+        link_config = config.get("internal_links", {})
+        self.max_links = link_config.get("max_links_per_post", 5)
+        self.max_inbound = link_config.get("max_inbound_per_post", 20)
+        self.max_pillar_inbound = link_config.get("max_pillar_inbound", self.max_inbound)
+        self.min_inbound = link_config.get("min_inbound_per_post", 1)
+        self.min_score = link_config.get("min_link_score", 0.0)
+
+    def candidate_edges(self, ids: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (source, target, score) arrays of every neighbour pair in both
+        directions, best first.
+        """
+        n, k = ids.shape
+        src = np.repeat(np.arange(n, dtype=np.int64), k)
+        dst = ids.ravel().astype(np.int64)
+        score = scores.ravel().astype(np.float64)
+        valid = (dst >= 0) & (dst != src) & (score > self.min_score)
+        src, dst, score = src[valid], dst[valid], score[valid]
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        score = np.concatenate([score, score])
+        key = src * n + dst
+        by_key = np.argsort(key, kind="stable")
+        first = by_key[np.concatenate([[True], key[by_key][1:] != key[by_key][:-1]])] if len(key) else by_key
+        src, dst, score, key = src[first], dst[first], score[first], key[first]
+        order = np.lexsort((key, -score))
+        return src[order], dst[order], score[order]
+
+    def plan(self, ids: np.ndarray, scores: np.ndarray, pillars: Optional[Sequence[int]] = None,
+             previous: Optional[Iterable[Link]] = None, changed: Optional[Iterable[int]] = None) -> Dict:
+        """
+        Plans links for rows of a NeighborIndex (ids/scores arrays). pillars[i]
+        is the pillar row of post i's cluster (-1 for none). Returns
+        {"links": [(source, target, score)], "orphans": [rows], "stats": {...}}.
+        """
+        n = len(ids)
+        src, dst, score = self.candidate_edges(ids, scores)
+        # Plain lists: the loops below do millions of scalar reads
+        outbound = [0] * n
+        inbound = [0] * n
+        chosen: Dict[Tuple[int, int], float] = {}
+        max_links, max_inbound, min_inbound = self.max_links, self.max_inbound, self.min_inbound
+
+        def add(s: int, t: int, value: float):
+            chosen[(s, t)] = value
+            outbound[s] += 1
+            inbound[t] += 1
+
+        affected = None
+        if previous is not None:
+            changed = set(changed or ())
+            affected = set(changed)
+            for s, t, value in previous:
+                if s >= n or t >= n:
+                    continue
+                if s in changed or t in changed:
+                    # Freed capacity on the other end is re-planned too
+                    affected.update((s, t))
+                else:
+                    add(s, t, value)
+            touched = np.zeros(n, dtype=bool)
+            touched[list(affected)] = True
+            mask = touched[src] | touched[dst]
+            src, dst, score = src[mask], dst[mask], score[mask]
+
+        src_l, dst_l, score_l = src.tolist(), dst.tolist(), score.tolist()
+        rows = range(n) if affected is None else sorted(affected)
+
+        # 0. Links up to the cluster pillar, closest members first, under the pillar cap
+        pillar_links = 0
+        if pillars is not None:
+            similarity = dict(zip(zip(src_l, dst_l), score_l))
+            wanted = [(similarity.get((s, int(pillars[s])), 0.0), s, int(pillars[s])) for s in rows
+                      if 0 <= int(pillars[s]) < n and int(pillars[s]) != s]
+            wanted.sort(key=lambda link: (-link[0], link[1]))
+            for value, s, t in wanted:
+                if (s, t) not in chosen and outbound[s] < max_links and inbound[t] < self.max_pillar_inbound:
+                    add(s, t, value)
+                    pillar_links += 1
+
+        # 1. Orphans first: posts with the fewest candidate sources are placed first
+        if min_inbound > 0:
+            by_target = np.lexsort((src, -score, dst))
+            bounds = np.searchsorted(dst[by_target], np.arange(n + 1)).tolist()
+            needy = [t for t in rows if inbound[t] < min_inbound]
+            needy.sort(key=lambda t: (bounds[t + 1] - bounds[t], t))
+            for t in needy:
+                for j in by_target[bounds[t]:bounds[t + 1]].tolist():
+                    if inbound[t] >= min_inbound:
+                        break
+                    s = src_l[j]
+                    if outbound[s] < max_links and (s, t) not in chosen:
+                        add(s, t, score_l[j])
+
+        # 2. Best remaining edges under both caps
+        for s, t, value in zip(src_l, dst_l, score_l):
+            if outbound[s] < max_links and inbound[t] < max_inbound and (s, t) not in chosen:
+                chosen[(s, t)] = value
+                outbound[s] += 1
+                inbound[t] += 1
+
+        links = sorted(((s, t, value) for (s, t), value in chosen.items()), key=lambda link: (link[0], -link[2], link[1]))
+        orphans = [t for t in range(n) if inbound[t] < min_inbound]
+        return {
+            "links": links,
+            "orphans": orphans,
+            "stats": {
+                "posts": n,
+                "links": len(links),
+                "pillar_links": pillar_links,
+                "orphans": len(orphans),
+                "max_inbound": max(inbound) if n else 0,
+                "replanned_posts": n if affected is None else len(affected)
+            }
+        }
+
+def save_plan(links: List[Link], post_ids: Sequence, path: str):
+    """
+    Persists a plan by post id, so a later run can re-plan incrementally
+    even if row order changed.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = [[post_ids[s], post_ids[t], round(value, 6)] for s, t, value in links]
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def load_plan(path: str, post_ids: Sequence) -> Optional[List[Link]]:
+    """
+    Links of a saved plan as rows of `post_ids`; links to posts that no longer exist are dropped.
+    """
+    if not os.path.exists(path):
+        return None
+    row_of = {post_id: row for row, post_id in enumerate(post_ids)}
+    with open(path, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    return [(row_of[s], row_of[t], value) for s, t, value in saved if s in row_of and t in row_of]
@@ -1,9 +1,113 @@
 import re
-from typing import Dict, Any, List
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+# Korean particles (josa), longest first so "에서는" wins over "는"
+JOSA = sorted([
+    "이", "가", "은", "는", "을", "를", "의", "에", "와", "과", "도", "만", "로", "랑",
+    "으로", "에서", "에게", "한테", "께서", "부터", "까지", "보다", "처럼", "만큼", "이나", "이랑",
+    "하고", "에는", "에도", "에서는", "에서도", "으로는", "로는", "으로도", "로도", "이라는", "라는",
+    "이다", "입니다", "이에요", "예요"
+], key=len, reverse=True)
+MIN_STEM_LENGTH = 2
+
+_TOKEN_RE = re.compile(r"\w+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+@lru_cache(maxsize=65536)
+def split_josa(token: str) -> Optional[Tuple[str, str]]:
+    """
+    (stem, particle) for the longest particle a Hangul word ends with, or
+    None. Stems shorter than two syllables are never split ("하나" is not
+    "하" + "나"). Whether the split is right depends on the document; see
+    tokenize().
+    """
+    if not _HANGUL_RE.match(token[-1:]):
+        return None
+    for josa in JOSA:
+        if token.endswith(josa) and len(token) - len(josa) >= MIN_STEM_LENGTH:
+            return token[:-len(josa)], josa
+    return None
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word stems with josa stripped.
+
+    Multi-syllable particles ("에서", "으로") are always stripped. A
+    one-syllable particle (이/가/도/로/만/의...) is also the last syllable of
+    many nouns (고양이, 어린이, 고속도로), so it is only stripped with
+    support from the same document: the stem also occurs as a word, or two
+    different words share the stem (아이폰이, 아이폰은). A word that itself
+    occurs with a particle attached (고양이 next to 고양이가) is a bare noun
+    and is kept whole.
+    """
+    words = _TOKEN_RE.findall(text.lower())
+    vocabulary = set(words)
+    splits = {word: split_josa(word) for word in vocabulary}
+    # Words seen with a one-syllable particle attached, and the words sharing each stem
+    attached = set()
+    sharing: Dict[str, int] = {}
+    for word, split in splits.items():
+        if split and len(split[1]) == 1 and split[0] in vocabulary:
+            attached.add(split[0])
+        if split:
+            sharing[split[0]] = sharing.get(split[0], 0) + 1
+
+    stems = {}
+    for word, split in splits.items():
+        if split is None:
+            stems[word] = word
+        elif len(split[1]) > 1:
+            stems[word] = split[0]
+        elif word not in attached and (split[0] in vocabulary or sharing[split[0]] > 1):
+            stems[word] = split[0]
+        else:
+            stems[word] = word
+    return [stems[word] for word in words]
 
 class NaverValidator:
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
+        stuffing = self.config.get("naver", {}).get("stuffing", {})
+        # Repetition is judged per 1,000 non-space characters, so long posts are not penalised for length
+        self.max_density = stuffing.get("max_density_per_1k", 10.0)
+        self.min_count = stuffing.get("min_count", 5)
+        self.ngram = stuffing.get("ngram", 3)
+        self.max_ngram_density = stuffing.get("max_ngram_density_per_1k", 3.0)
+        self.ngram_min_count = stuffing.get("ngram_min_count", 4)
+
+    def detect_stuffing(self, text: str) -> Dict[str, Any]:
+        """
+        Terms and word n-grams repeated more often than natural text allows.
+        Words are counted after josa stripping, with collections.Counter. A
+        term is stuffed when it appears at least `min_count` times and more
+        than `max_density_per_1k` times per 1,000 characters. N-grams (phrases
+        of `ngram` stems) use their own, lower limits; n-grams of a single
+        repeated word are left to the term check.
+        """
+        tokens = tokenize(text)
+        chars = max(1, len("".join(text.split())))
+        per_1k = 1000.0 / chars
+
+        counts = Counter(token for token in tokens if len(token) > 1 and not token.isdigit())
+        terms = [(term, count) for term, count in counts.most_common()
+                 if count >= self.min_count and count * per_1k > self.max_density]
+
+        phrases = []
+        if self.ngram > 1 and len(tokens) >= self.ngram:
+            grams = Counter(zip(*(tokens[i:] for i in range(self.ngram))))
+            phrases = [(" ".join(gram), count) for gram, count in grams.most_common()
+                       if count >= self.ngram_min_count and count * per_1k > self.max_ngram_density
+                       and len(set(gram)) > 1]
+
+        return {
+            "terms": [{"term": term, "count": count, "per_1k_chars": round(count * per_1k, 2)} for term, count in terms],
+            "phrases": [{"phrase": phrase, "count": count, "per_1k_chars": round(count * per_1k, 2)} for phrase, count in phrases],
+            "words": len(tokens),
+            "chars": chars
+        }
 
     def validate_naver_blog_content(self, content_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -12,26 +116,23 @@ class NaverValidator:
         text = content_data.get("body", "")
         links = content_data.get("links", [])
         images = content_data.get("images", [])
-        
+
         # 1. Check for keyword stuffing (mechanical repetition)
-        words = re.findall(r'\w+', text)
-        word_counts = {}
-        for word in words:
-            word_counts[word] = word_counts.get(word, 0) + 1
-        
-        stuffing_detected = [w for w, c in word_counts.items() if c > 15 and len(w) > 1] # Simple threshold
-        
-        # 2. Check commercial balance (Link density)
-        link_ratio = len(links) / (len(words) / 100) if words else 0
+        stuffing = self.detect_stuffing(text)
+
+        # 2. Check commercial balance (Link density); posts under 100 words are judged as 100 words
+        link_ratio = len(links) / (max(stuffing["words"], 100) / 100) if stuffing["words"] else 0
         is_too_commercial = link_ratio > 5 # More than 5 links per 100 words
-        
+
         # 3. Unique Experience Check (Images/Tables)
         has_unique_images = len([img for img in images if img.get("is_unique")]) >= 3
         has_comparison = content_data.get("has_comparison_table", False)
-        
+
         violations = []
-        if stuffing_detected:
-            violations.append(f"Keyword stuffing detected: {', '.join(stuffing_detected[:3])}")
+        if stuffing["terms"]:
+            violations.append(f"Keyword stuffing detected: {', '.join(t['term'] for t in stuffing['terms'][:3])}")
+        if stuffing["phrases"]:
+            violations.append(f"Repeated phrases detected: {', '.join(p['phrase'] for p in stuffing['phrases'][:3])}")
         if is_too_commercial:
             violations.append(f"Too many links relative to text (Ratio: {link_ratio:.2f})")
         if not has_unique_images:
@@ -45,7 +146,26 @@ class NaverValidator:
             "score": 100 - (len(violations) * 20),
             "details": {
                 "link_ratio": link_ratio,
-                "unique_images_count": len(images)
+                "unique_images_count": len(images),
+                "stuffing": stuffing
+            }
+        }
+
+    def validate_batch(self, posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        validate_naver_blog_content over many posts, with throughput.
+        """
+        started = time.perf_counter()
+        results = [self.validate_naver_blog_content(post) for post in posts]
+        elapsed = time.perf_counter() - started
+        return {
+            "results": results,
+            "summary": {
+                "posts": len(results),
+                "invalid": sum(not r["valid"] for r in results),
+                "stuffing": sum(bool(r["details"]["stuffing"]["terms"] or r["details"]["stuffing"]["phrases"]) for r in results),
+                "elapsed_sec": round(elapsed, 3),
+                "posts_per_sec": round(len(results) / elapsed, 1) if elapsed > 0 else None
             }
         }
 
@@ -0,0 +1,204 @@
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+def post_text(post: Dict) -> str:
+    """
+    Text a post is compared by: title + summary + keywords.
+    """
+    return f"{post['title']} {post.get('summary', '')} {' '.join(post.get('keywords', []))}"
+
+def _select_top_k(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray,
+                  n_rows: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row top-k of COO triples as (n_rows, k) id/score arrays padded with
+    -1 / 0. Ties are broken by column, so the result is deterministic.
+    """
+    ids = np.full((n_rows, k), -1, dtype=np.int64)
+    scores = np.zeros((n_rows, k), dtype=np.float32)
+    if len(vals) == 0:
+        return ids, scores
+    order = np.lexsort((cols, -vals, rows))
+    rows, cols, vals = rows[order], cols[order], vals[order]
+    starts = np.searchsorted(rows, np.arange(n_rows))
+    rank = np.arange(len(rows)) - starts[rows]
+    keep = rank < k
+    ids[rows[keep], rank[keep]] = cols[keep]
+    scores[rows[keep], rank[keep]] = vals[keep]
+    return ids, scores
+
+def _dense_top_k(sims: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise top-k of a dense block with argpartition (no full sort), then
+    the k winners ordered by score and id.
+    """
+    kk = min(k, sims.shape[1])
+    part = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+    part_scores = np.take_along_axis(sims, part, axis=1)
+    rows = np.repeat(np.arange(len(sims)), kk)
+    keep = part_scores.ravel() > 0
+    return _select_top_k(rows[keep], part.ravel()[keep].astype(np.int64), part_scores.ravel()[keep], len(sims), k)
+
+def top_k(queries: sparse.csr_matrix, corpus: sparse.csr_matrix, k: int, max_cells: int = 1 << 24,
+          self_offset: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k most similar corpus rows for every query row, for L2-normalised sparse
+    rows (dot product = cosine). Queries are processed in row blocks of at
+    most `max_cells` similarities, so memory stays bounded instead of N x N.
+    Blocks whose terms are rare are multiplied sparse x sparse and only the
+    non-zero products ranked; blocks sharing common terms (a nearly dense
+    product) are scored densely over just the terms they use and reduced with
+    argpartition. With `self_offset`, query i is corpus row self_offset + i
+    and is excluded.
+    """
+    queries, corpus = queries.tocsr(), corpus.tocsr()
+    n, m = queries.shape[0], corpus.shape[0]
+    ids = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if n == 0 or m == 0:
+        return ids, scores
+    corpus_t = corpus.T.tocsr()
+    corpus_csc = corpus.tocsc()
+    # Postings per term: an upper bound on the products a query term generates
+    df = np.diff(corpus_csc.indptr)
+    block_size = max(1, min(n, max_cells // m))
+    for start in range(0, n, block_size):
+        stop = min(n, start + block_size)
+        block = queries[start:stop]
+        if df[block.indices].sum() < 0.1 * block.shape[0] * m:
+            product = (block @ corpus_t).tocoo()
+            rows, cols, vals = product.row.astype(np.int64), product.col.astype(np.int64), product.data
+            keep = vals > 0
+            if self_offset is not None:
+                keep &= cols != rows + start + self_offset
+            block_ids, block_scores = _select_top_k(rows[keep], cols[keep], vals[keep], stop - start, k)
+        else:
+            terms = np.unique(block.indices)
+            sims = (corpus_csc[:, terms] @ block[:, terms].T.toarray()).T
+            if self_offset is not None:
+                own = np.arange(start, stop) + self_offset
+                sims[np.arange(stop - start), own] = 0
+            block_ids, block_scores = _dense_top_k(sims, k)
+        ids[start:stop] = block_ids
+        scores[start:stop] = block_scores
+    return ids, scores
+
+class NeighborIndex:
+    """
+    Top-k TF-IDF neighbours of every post without a dense similarity matrix.
+
+    fit() builds the vocabulary and neighbour lists from the whole archive.
+    add() appends new posts with the fitted vocabulary: it ranks the new posts
+    against everything and updates only the existing posts the new ones beat.
+    Terms unseen at fit time are ignored until the next fit().
+    """
+    def __init__(self, k: int = 10, max_cells: int = 1 << 24, vectorizer_params: Optional[Dict] = None):
+        self.k = k
+        self.max_cells = max_cells
+        self.vectorizer_params = vectorizer_params or {}
+        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self.ids = np.zeros((0, k), dtype=np.int64)
+        self.scores = np.zeros((0, k), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def fit(self, texts: Sequence[str]) -> "NeighborIndex":
+        self.vectorizer = TfidfVectorizer(dtype=np.float32, **self.vectorizer_params)
+        self.matrix = self.vectorizer.fit_transform(texts).tocsr()
+        self.ids, self.scores = top_k(self.matrix, self.matrix, self.k, self.max_cells, self_offset=0)
+        return self
+
+    def add(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Appends posts and returns the rows of existing posts whose neighbour
+        lists changed.
+        """
+        if self.vectorizer is None:
+            self.fit(texts)
+            return np.zeros(0, dtype=np.int64)
+        start = len(self)
+        new = self.vectorizer.transform(texts).tocsr()
+        self.matrix = sparse.vstack([self.matrix, new], format="csr")
+        new_ids, new_scores = top_k(new, self.matrix, self.k, self.max_cells, self_offset=start)
+
+        # Existing rows: merge their current list with their scores against the new posts
+        changed = []
+        old_ids, old_scores = self.ids, self.scores
+        block_size = max(1, self.max_cells // max(1, len(texts)))
+        for block_start in range(0, start, block_size):
+            block = (self.matrix[block_start:min(start, block_start + block_size)] @ new.T).tocoo()
+            touched = np.unique(block.row[block.data > 0])
+            # Only rows where a new post outscores the current k-th neighbour change
+            kth = old_scores[block_start + touched, -1]
+            best = np.zeros(len(touched), dtype=np.float32)
+            mask = block.data > 0
+            np.maximum.at(best, np.searchsorted(touched, block.row[mask]), block.data[mask])
+            touched = touched[best > kth]
+            if len(touched) == 0:
+                continue
+            keep = np.isin(block.row, touched) & (block.data > 0)
+            local = np.searchsorted(touched, block.row[keep])
+            current = old_ids[block_start + touched]
+            valid = current >= 0
+            rows = np.concatenate([np.nonzero(valid)[0], local])
+            cols = np.concatenate([current[valid], block.col[keep].astype(np.int64) + start])
+            vals = np.concatenate([old_scores[block_start + touched][valid], block.data[keep]])
+            merged_ids, merged_scores = _select_top_k(rows, cols, vals, len(touched), self.k)
+            old_ids[block_start + touched] = merged_ids
+            old_scores[block_start + touched] = merged_scores
+            changed.append(block_start + touched)
+
+        self.ids = np.vstack([old_ids, new_ids])
+        self.scores = np.vstack([old_scores, new_scores])
+        return np.concatenate(changed) if changed else np.zeros(0, dtype=np.int64)
+
+    def neighbors(self, row: int, fill: bool = False) -> List[Tuple[int, float]]:
+        """
+        (row, score) neighbours, best first. fill=True pads with unrelated
+        posts at score 0 up to k, like a full argsort would.
+        """
+        result = [(int(j), float(s)) for j, s in zip(self.ids[row], self.scores[row]) if j >= 0]
+        if fill and len(result) < self.k:
+            taken = {j for j, _ in result} | {row}
+            for j in range(len(self)):
+                if len(result) >= self.k:
+                    break
+                if j not in taken:
+                    result.append((j, 0.0))
+        return result
+
+    def save(self, path: str):
+        """
+        Persists the vocabulary, vectors and neighbour lists to one .npz file (no pickle).
+        """
+        vocabulary = self.vectorizer.vocabulary_
+        terms = sorted(vocabulary, key=vocabulary.get)
+        np.savez_compressed(
+            path,
+            terms=np.array(terms, dtype=object).astype(str),
+            idf=self.vectorizer.idf_,
+            data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            ids=self.ids, scores=self.scores,
+            params=np.array(json.dumps({"k": self.k, "max_cells": self.max_cells,
+                                        "vectorizer_params": self.vectorizer_params}))
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "NeighborIndex":
+        with np.load(path, allow_pickle=False) as data:
+            params = json.loads(str(data["params"]))
+            index = cls(**params)
+            index.vectorizer = TfidfVectorizer(
+                dtype=np.float32, vocabulary={term: i for i, term in enumerate(data["terms"].tolist())},
+                **index.vectorizer_params
+            )
+            index.vectorizer.idf_ = data["idf"]
+            index.matrix = sparse.csr_matrix((data["data"], data["indices"], data["indptr"]),
+                                             shape=tuple(data["shape"]))
+            index.ids, index.scores = data["ids"], data["scores"]
+        return index
@@ -0,0 +1,386 @@
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from ..ads.dom_utils import HtmlDocument
+from ..ads.linter import AdsLinter
+from ..schema.validate import SchemaValidator
+from .naver_validator import NaverValidator
+from .validator import SEOValidator
+
+HTML_EXTENSIONS = (".html", ".htm")
+WARC_EXTENSIONS = (".warc", ".warc.gz")
+# Bumped whenever page checks change, so a saved state is not reused across versions
+AUDIT_VERSION = "1"
+
+# Auditor owned by each pool worker, created once by _init_worker
+_worker_auditor: Optional["PageAuditor"] = None
+
+def _init_worker(config: Dict):
+    global _worker_auditor
+    _worker_auditor = PageAuditor(config)
+
+def _audit(page: Tuple[str, str, bytes]) -> Dict:
+    url, digest, raw = page
+    return _worker_auditor.audit(url, raw.decode("utf-8", errors="replace"), digest)
+
+def page_digest(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def _url_key(url: str) -> str:
+    """
+    Host-independent form of a URL used to match pages and canonicals:
+    path without trailing slash, plus query; the fragment is dropped.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return path + ("?" + parts.query if parts.query else "")
+
+def _text_key(text: str) -> str:
+    normalized = re.sub(r"\s+", " ", text).strip().lower()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+def iter_directory(path: str, base_url: str = "") -> Iterator[Tuple[str, bytes]]:
+    """
+    (url, raw bytes) for every HTML file of an export tree, sorted by path.
+    foo/index.html is served as /foo/, anything else as its relative path.
+    """
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        files.extend(os.path.join(root, name) for name in sorted(names) if name.lower().endswith(HTML_EXTENSIONS))
+    for file_path in files:
+        rel = os.path.relpath(file_path, path).replace(os.sep, "/")
+        if rel == "index.html" or rel.endswith("/index.html"):
+            rel = rel[:-len("index.html")]
+        with open(file_path, "rb") as f:
+            yield base_url.rstrip("/") + "/" + rel, f.read()
+
+def _dechunk(body: bytes) -> bytes:
+    out = []
+    pos = 0
+    while pos < len(body):
+        end = body.find(b"\r\n", pos)
+        if end < 0:
+            break
+        size = int(body[pos:end].split(b";")[0] or b"0", 16)
+        if size == 0:
+            break
+        out.append(body[end + 2:end + 2 + size])
+        pos = end + 2 + size + 2
+    return b"".join(out)
+
+def iter_warc(path: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    (target URI, HTML body) of every successful text/html response record
+    in a WARC file, read record by record (.warc.gz member-per-record files
+    are read through gzip transparently).
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            if not line.startswith(b"WARC/"):
+                raise ValueError(f"Malformed WARC record header in {path}: {line[:40]!r}")
+            headers = {}
+            for line in iter(f.readline, b""):
+                if not line.strip():
+                    break
+                name, _, value = line.decode("utf-8", errors="replace").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            block = f.read(int(headers.get("content-length", 0)))
+            uri = headers.get("warc-target-uri", "").strip("<>")
+            if headers.get("warc-type") != "response" or not uri:
+                continue
+            head, _, body = block.partition(b"\r\n\r\n")
+            lines = head.decode("iso-8859-1").split("\r\n")
+            status = lines[0].split()
+            if len(status) < 2 or status[1] != "200":
+                continue
+            http = {name.strip().lower(): value.strip() for name, _, value in (h.partition(":") for h in lines[1:])}
+            if "html" not in http.get("content-type", "text/html"):
+                continue
+            if "chunked" in http.get("transfer-encoding", "").lower():
+                body = _dechunk(body)
+            yield uri, body
+
+def iter_pages(path: str, base_url: str = "") -> Iterator[Tuple[str, bytes]]:
+    if os.path.isfile(path):
+        if path.lower().endswith(WARC_EXTENSIONS):
+            yield from iter_warc(path)
+        else:
+            with open(path, "rb") as f:
+                yield base_url.rstrip("/") + "/" + os.path.basename(path), f.read()
+    else:
+        yield from iter_directory(path, base_url)
+
+class PageAuditor:
+    """
+    Every per-page check on one parse: technical tags (SEOValidator),
+    JSON-LD syntax and Product fields (SchemaValidator), ad placement
+    (AdsLinter) and Naver content rules (NaverValidator). Returns a compact
+    record: the fields the site-level checks need plus a flat issue list.
+    """
+    def __init__(self, config: Dict):
+        self.config = config
+        audit_config = config.get("site_audit", {})
+        self.naver = audit_config.get("naver", True)
+        self.seo = SEOValidator(config)
+        self.ads = AdsLinter(config)
+        self.schema = SchemaValidator(config)
+        self.naver_validator = NaverValidator(config)
+
+    def audit(self, url: str, html: str, digest: str = None) -> Dict:
+        doc = HtmlDocument(html)
+        issues = []
+
+        def issue(check: str, level: str, message: str):
+            issues.append({"check": check, "level": level, "message": message})
+
+        # 1. Technical tags
+        for name in self.seo.validate_technical_seo(doc)["missing"]:
+            issue("technical", "error", f"Missing {name}")
+        canonicals = list(dict.fromkeys(el.get("href", "").strip() for el in doc.select(('link[rel~="canonical"]',))))
+        if len(canonicals) > 1:
+            issue("technical", "error", f"Conflicting canonical tags: {', '.join(canonicals[:3])}")
+        title_el = doc.soup.title
+        title = title_el.get_text(strip=True) if title_el else ""
+        if not title:
+            issue("technical", "error", "Missing title")
+        description_el = doc.select(('meta[name="description"]',))
+        description = description_el[0].get("content", "").strip() if description_el else ""
+
+        # 2. Structured data
+        for script in doc.select(('script[type="application/ld+json"]',)):
+            try:
+                data = json.loads(script.string or "")
+            except ValueError as e:
+                issue("json_ld", "error", f"Invalid JSON-LD: {e}")
+                continue
+            items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                types = item.get("@type") if isinstance(item.get("@type"), list) else [item.get("@type")]
+                if "Product" in types:
+                    for error in self.schema.validate_product(item)["errors"]:
+                        issue("json_ld", "error", f"Product: {error}")
+
+        # 3. Ad placement
+        ads_report = self.ads.lint(doc)
+        for finding in ads_report["violations"]:
+            issue("ads", "error", finding["message"])
+        for finding in ads_report["warnings"]:
+            issue("ads", "warning", finding["message"])
+
+        # 4. Naver content rules. Rendered HTML cannot tell stock photos from
+        # own shots, so every <img> counts as unique here.
+        if self.naver:
+            naver_report = self.naver_validator.validate_naver_blog_content({
+                "body": doc.soup.get_text(" ", strip=True),
+                "links": [el.get("href") for el in doc.select(("a[href]",))],
+                "images": [{"url": el.get("src"), "is_unique": True} for el in doc.select(("img",))],
+                "has_comparison_table": doc.exists(("table",))
+            })
+            for message in naver_report["violations"]:
+                issue("naver", "warning", message)
+
+        return {
+            "url": url,
+            "hash": digest,
+            "title": title,
+            "description": description,
+            "canonicals": canonicals,
+            "issues": issues
+        }
+
+class SiteAuditor:
+    """
+    Crawl-free audit of a rendered export (a directory of HTML files or a
+    WARC file).
+
+    Pages are streamed `batch_size` at a time through a process pool, each
+    worker running PageAuditor on one parse per page. Records are kept in a
+    JSON state file keyed by URL together with the page's content hash, so a
+    later run only re-audits pages whose bytes changed and drops pages that
+    disappeared. Site-level issues (duplicate titles and descriptions among
+    indexable pages, canonical targets that are missing or canonicalise
+    again) are recomputed from the records with hash indexes, O(pages).
+    workers=0 runs inline.
+    """
+    def __init__(self, config: Dict, workers: Optional[int] = None, batch_size: int = 200,
+                 state_path: Optional[str] = None):
+        self.config = config
+        audit_config = config.get("site_audit", {})
+        self.base_url = audit_config.get("base_url", "")
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.state_path = state_path
+        # Checks depend on the config, so a config change invalidates the saved records
+        self.fingerprint = page_digest(json.dumps([AUDIT_VERSION, config], sort_keys=True, default=str).encode("utf-8"))
+
+    def _load_state(self) -> Dict[str, Dict]:
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("fingerprint") == self.fingerprint:
+                return state["pages"]
+        return {}
+
+    def _save_state(self, pages: Dict[str, Dict]):
+        if not self.state_path:
+            return
+        if os.path.dirname(self.state_path):
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint, "pages": pages}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.state_path)
+
+    def run(self, path: str, progress=None) -> Dict:
+        started = time.perf_counter()
+        previous = self._load_state()
+        pages: Dict[str, Dict] = {}
+        counts = {"audited": 0, "reused": 0}
+
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.config,)) if self.workers else None
+        if pool is None:
+            _init_worker(self.config)
+
+        def flush(batch: List[Tuple[str, str, bytes]]):
+            if pool:
+                chunksize = max(1, len(batch) // (self.workers * 4))
+                records = pool.map(_audit, batch, chunksize=chunksize)
+            else:
+                records = map(_audit, batch)
+            for record in records:
+                pages[record["url"]] = record
+            counts["audited"] += len(batch)
+            if progress:
+                progress({**counts, "pages": len(pages)})
+
+        try:
+            # Only changed pages are held in memory, one batch at a time
+            batch = []
+            for url, raw in iter_pages(path, self.base_url):
+                digest = page_digest(raw)
+                known = previous.get(url)
+                if known is not None and known["hash"] == digest:
+                    pages[url] = known
+                    counts["reused"] += 1
+                    continue
+                batch.append((url, digest, raw))
+                if len(batch) >= self.batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        self._save_state(pages)
+        removed = len(set(previous) - set(pages))
+        elapsed = time.perf_counter() - started
+        report = self.report(pages)
+        report["summary"].update({
+            **counts,
+            "removed": removed,
+            "elapsed_sec": round(elapsed, 3),
+            "pages_per_sec": round(len(pages) / elapsed, 1) if elapsed > 0 else None
+        })
+        return report
+
+    def site_issues(self, pages: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+        """
+        Duplicate titles/descriptions among indexable pages (no canonical, or
+        a self-canonical) and canonical conflicts, via dict indexes.
+        """
+        by_key = {_url_key(url): record for url, record in pages.items()}
+        base_host = urlsplit(self.base_url).netloc.lower()
+        titles: Dict[str, List[str]] = {}
+        descriptions: Dict[str, List[str]] = {}
+        conflicts = []
+
+        for url, record in pages.items():
+            key = _url_key(url)
+            canonical = record["canonicals"][0] if record["canonicals"] else None
+            # Relative canonicals resolve against the page, like a crawler would
+            resolved = urljoin(url, canonical) if canonical else url
+            target_key = _url_key(resolved)
+            if target_key == key:
+                if record["title"]:
+                    titles.setdefault(_text_key(record["title"]), []).append(url)
+                if record["description"]:
+                    descriptions.setdefault(_text_key(record["description"]), []).append(url)
+                continue
+            # Cross-domain only when both sides name a host and they differ;
+            # a directory export without base_url has no host to compare against
+            canonical_host = urlsplit(resolved).netloc.lower()
+            site_hosts = {urlsplit(url).netloc.lower(), base_host} - {""}
+            if canonical_host and site_hosts and canonical_host not in site_hosts:
+                continue
+            target = by_key.get(target_key)
+            if target is None:
+                conflicts.append({"page": url, "canonical": canonical, "reason": "canonical target not in export"})
+                continue
+            target_canonical = target["canonicals"][0] if target["canonicals"] else None
+            if target_canonical and _url_key(urljoin(target["url"], target_canonical)) != target_key:
+                conflicts.append({"page": url, "canonical": canonical,
+                                  "reason": f"canonical target canonicalises to {target_canonical}"})
+
+        def duplicates(index: Dict[str, List[str]], field: str) -> List[Dict]:
+            return [{field: pages[urls[0]][field], "pages": sorted(urls)}
+                    for urls in index.values() if len(urls) > 1]
+
+        return {
+            "duplicate_titles": duplicates(titles, "title"),
+            "duplicate_descriptions": duplicates(descriptions, "description"),
+            "canonical_conflicts": conflicts
+        }
+
+    def report(self, pages: Dict[str, Dict]) -> Dict:
+        """
+        Compact report: counts, site-level issues and only the pages that have issues.
+        """
+        by_check: Dict[str, int] = {}
+        with_errors = with_warnings = 0
+        failing = {}
+        for url in sorted(pages):
+            issues = pages[url]["issues"]
+            if not issues:
+                continue
+            failing[url] = [f"[{i['level']}] {i['check']}: {i['message']}" for i in issues]
+            levels = {i["level"] for i in issues}
+            with_errors += "error" in levels
+            with_warnings += "error" not in levels
+            for i in issues:
+                by_check[i["check"]] = by_check.get(i["check"], 0) + 1
+        site = self.site_issues(pages)
+        return {
+            "summary": {
+                "pages": len(pages),
+                "pages_with_errors": with_errors,
+                "pages_with_warnings_only": with_warnings,
+                "issues_by_check": by_check,
+                "site_issues": {name: len(items) for name, items in site.items()}
+            },
+            "site": site,
+            "pages": failing
+        }
+
+def save_report(report: Dict, path: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
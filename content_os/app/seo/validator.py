@@ -1,20 +1,25 @@
-from typing import Dict, Any, List
-import re
+from typing import Dict, Any, List, Union
+from ..ads.dom_utils import HtmlDocument
+
+# Technical SEO checks as CSS selectors over the parsed <head>
+TECHNICAL_CHECKS = {
+    "canonical": ('link[rel~="canonical"]',),
+    "og_tags": ('meta[property^="og:"]',),
+    "meta_description": ('meta[name="description"]',),
+    "json_ld": ('script[type="application/ld+json"]',)
+}
 
 class SEOValidator:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
 
-    def validate_technical_seo(self, html: str) -> Dict[str, Any]:
+    def validate_technical_seo(self, html: Union[str, HtmlDocument]) -> Dict[str, Any]:
         """
         Checks for essential technical SEO tags in the rendered HTML.
+        Accepts an HtmlDocument so a page parsed for other checks is not reparsed.
         """
-        checks = {
-            "canonical": bool(re.search(r'<link rel="canonical"', html)),
-            "og_tags": bool(re.search(r'property="og:', html)),
-            "meta_description": bool(re.search(r'<meta name="description"', html)),
-            "json_ld": bool(re.search(r'type="application/ld\+json"', html))
-        }
+        doc = HtmlDocument.of(html)
+        checks = {name: doc.exists(selectors) for name, selectors in TECHNICAL_CHECKS.items()}
         
         missing = [k for k, v in checks.items() if not v]
         
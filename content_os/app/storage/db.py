@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+def default_db_path() -> str:
+    """
+    Database used by the API's shared instances: $CONTENT_OS_DB or blogs.db.
+    Read when the instances are created, so tests can point it elsewhere.
+    """
+    return os.environ.get("CONTENT_OS_DB", "blogs.db")
+
+# Applied to every pooled connection
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",       # readers do not block the writer
+    "synchronous": "NORMAL",     # durable at checkpoints; safe with WAL
+    "mmap_size": 268435456,      # 256 MiB memory-mapped reads
+    "cache_size": -16000,        # 16 MB page cache per connection
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+class Database:
+    """
+    Thread-safe pool of SQLite connections to one database file.
+
+    Connections are opened lazily up to `max_connections`, configured once
+    with DEFAULT_PRAGMAS and reused, so each operation skips the open/PRAGMA
+    cost and hits the per-connection prepared statement cache
+    (`cached_statements`). An in-memory database is a single shared
+    connection, since every sqlite3.connect(":memory:") is a separate database.
+    """
+    def __init__(self, path: str, max_connections: int = 8, timeout: float = 30.0,
+                 pragmas: Optional[Dict] = None, cached_statements: int = 256):
+        self.path = path
+        self.memory = path == ":memory:"
+        self.max_connections = 1 if self.memory else max_connections
+        self.timeout = timeout
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.cached_statements = cached_statements
+        self.inode = None
+
+        self._idle: List[sqlite3.Connection] = []
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.opened = 0
+        self.checkouts = 0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        if not self.memory and self.inode is None:
+            self.inode = _inode(self.path)
+        self.opened += 1
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for one transaction: commits on success,
+        rolls back on error, and returns the connection to the pool.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No free connection to {self.path} within {self.timeout}s")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+                generation = self._generation
+                self.checkouts += 1
+            if conn is None:
+                conn = self._open()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.row_factory = None
+                with self._lock:
+                    if generation == self._generation:
+                        self._idle.append(conn)
+                        conn = None
+                if conn is not None:
+                    conn.close()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """
+        Closes idle connections; checked-out ones close when returned.
+        The pool stays usable and reconnects on demand.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "idle": len(self._idle),
+                "max_connections": self.max_connections,
+                "opened": self.opened,
+                "checkouts": self.checkouts
+            }
+
+_registry: Dict[str, Database] = {}
+_registry_lock = threading.Lock()
+
+def get_database(path: str, **kwargs) -> Database:
+    """
+    Shared Database for a file path, so every component using the same file
+    draws from one pool. If the file was deleted or replaced since the pool
+    was opened, the stale pool is closed and a fresh one returned.
+    """
+    if path == ":memory:":
+        return Database(path, **kwargs)
+    key = os.path.abspath(path)
+    with _registry_lock:
+        db = _registry.get(key)
+        if db is not None and db.inode is not None and _inode(path) != db.inode:
+            db.close()
+            if not os.path.exists(path):
+                # Left behind by connections to the deleted file; a new
+                # database at this path must not replay them
+                for suffix in ("-wal", "-shm"):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+            db = None
+        if db is None:
+            db = _registry[key] = Database(path, **kwargs)
+        return db
+
+def close_all():
+    with _registry_lock:
+        for db in _registry.values():
+            db.close()
+        _registry.clear()
+
+def _inode(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino)
@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from bs4 import BeautifulSoup
+from .models import ContentEntry
+from .repo import ContentRepo, content_hash
+from ..eval.similarity import SimilarityEvaluator
+
+MARKDOWN_EXTENSIONS = (".md", ".markdown", ".txt")
+HTML_EXTENSIONS = (".html", ".htm")
+WXR_EXTENSIONS = (".xml", ".wxr")
+# WordPress post statuses ingested by default (ingest.wxr_statuses)
+WXR_STATUSES = ("publish",)
+
+_WXR_NS = {
+    "content": "http://purl.org/rss/1.0/modules/content/",
+    "wp": "http://wordpress.org/export/1.2/",
+}
+
+# Evaluator owned by each pool worker, created once by _init_worker
+_worker_evaluator: Optional[SimilarityEvaluator] = None
+
+def _init_worker(config: Dict):
+    global _worker_evaluator
+    _worker_evaluator = SimilarityEvaluator(config)
+
+def html_to_text(html: str) -> str:
+    """
+    Visible text with block elements separated by blank lines, so
+    split_paragraphs sees the same paragraph breaks as in Markdown.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style"]):
+        tag.decompose()
+    for tag in soup.find_all(["p", "div", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "table"]):
+        tag.insert_after("\n\n")
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    return soup.get_text()
+
+def _prepare(doc: Tuple[str, str, str, Dict]) -> Tuple[str, str, List[str], str, Dict]:
+    """
+    (source, format, raw, metadata) -> (source, text, paragraphs, content hash, metadata).
+    Runs in a pool worker.
+    """
+    source, fmt, raw, metadata = doc
+    text = html_to_text(raw) if fmt == "html" else raw
+    return source, text, _worker_evaluator.split_paragraphs(text), content_hash(text), metadata
+
+def iter_documents(path: str, wxr_statuses: Sequence[str] = WXR_STATUSES) -> Iterator[Tuple[str, str, str, Dict]]:
+    """
+    Yields (source, format, raw text, metadata) in a stable order: files of a
+    directory tree sorted by path, or the posts of a WordPress WXR export.
+    """
+    if os.path.isfile(path):
+        files = [path]
+    else:
+        files = []
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(os.path.join(root, name) for name in sorted(names))
+
+    for file_path in files:
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in WXR_EXTENSIONS:
+            yield from iter_wxr(file_path, wxr_statuses)
+            continue
+        if ext in MARKDOWN_EXTENSIONS:
+            fmt = "markdown"
+        elif ext in HTML_EXTENSIONS:
+            fmt = "html"
+        else:
+            continue
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            yield file_path, fmt, f.read(), {"source": file_path}
+
+def iter_wxr(file_path: str, statuses: Sequence[str] = WXR_STATUSES) -> Iterator[Tuple[str, str, str, Dict]]:
+    """
+    Streams published posts from a WordPress export without loading the whole
+    file. Posts whose wp:status is not in `statuses` (drafts, private, trash)
+    are skipped; items without a wp:status count as published.
+    """
+    for _, item in ET.iterparse(file_path, events=("end",)):
+        if item.tag != "item":
+            continue
+        post_type = item.findtext("wp:post_type", default="post", namespaces=_WXR_NS)
+        body = item.findtext("content:encoded", default="", namespaces=_WXR_NS)
+        status = item.findtext("wp:status", default="", namespaces=_WXR_NS)
+        if post_type == "post" and (not status or status in statuses) and body.strip():
+            post_id = item.findtext("wp:post_id", default="", namespaces=_WXR_NS)
+            yield f"{file_path}#{post_id}", "html", body, {
+                "source": file_path,
+                "wp_post_id": post_id,
+                "title": item.findtext("title", default=""),
+                "link": item.findtext("link", default=""),
+                "status": status
+            }
+        item.clear()
+
+def _chunks(items: Iterator, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class BulkIngester:
+    """
+    Backfills ContentRepo from Markdown/HTML files or WXR exports.
+
+    Documents are converted and split into paragraphs on a process pool,
+    deduplicated by content hash (against the database and within the run),
+    and written `batch_size` posts per transaction. After each batch the
+    counters are saved to `checkpoint_path` and the consumed sources
+    (id, size, mtime) are appended to `<checkpoint_path>.sources`, so an
+    interrupted run over the same source skips exactly those and picks up
+    files added, renamed or edited since, wherever they sort. Runs
+    without a checkpoint are safe too, since stored hashes are skipped.
+    workers=0 runs inline.
+    """
+    def __init__(self, repo: ContentRepo, config: Dict, workers: Optional[int] = None,
+                 batch_size: int = 500, checkpoint_path: Optional[str] = None):
+        self.repo = repo
+        self.config = config
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.wxr_statuses = tuple(config.get("ingest", {}).get("wxr_statuses", WXR_STATUSES))
+
+    @property
+    def _sources_path(self) -> Optional[str]:
+        # Append-only log of consumed source keys, one per line, next to the checkpoint
+        return self.checkpoint_path + ".sources" if self.checkpoint_path else None
+
+    def _load_checkpoint(self, path: str) -> Tuple[Dict, Set[str]]:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("path") == os.path.abspath(path):
+                consumed = set()
+                if os.path.exists(self._sources_path):
+                    with open(self._sources_path, "r", encoding="utf-8") as f:
+                        consumed = {line.rstrip("\n") for line in f}
+                return state, consumed
+        if self._sources_path and os.path.exists(self._sources_path):
+            os.remove(self._sources_path)
+        return {"path": os.path.abspath(path), "consumed": 0, "ingested": 0, "duplicates": 0, "empty": 0}, set()
+
+    def _save_checkpoint(self, state: Dict, keys: List[str]):
+        if not self.checkpoint_path:
+            return
+        with open(self._sources_path, "a", encoding="utf-8") as f:
+            f.writelines(key + "\n" for key in keys)
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    @staticmethod
+    def _source_key(doc: Tuple[str, str, str, Dict], stats: Dict[str, Tuple[int, int]]) -> str:
+        """
+        Identity of a document for resuming: its source id plus the size and
+        mtime of the file it came from, so a file that is added, renamed or
+        edited since the checkpoint is read again wherever it sorts.
+        """
+        path = doc[3].get("source", doc[0])
+        if path not in stats:
+            try:
+                st = os.stat(path)
+                stats[path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                stats[path] = (0, 0)
+        size, mtime_ns = stats[path]
+        return f"{doc[0]}\t{size}\t{mtime_ns}"
+
+    def run(self, path: str, progress=None) -> Dict:
+        state, consumed = self._load_checkpoint(path)
+        stats: Dict[str, Tuple[int, int]] = {}
+        # (key, doc) pairs of sources not consumed by an earlier run
+        keyed = ((self._source_key(doc, stats), doc) for doc in iter_documents(path, self.wxr_statuses))
+        docs = ((key, doc) for key, doc in keyed if key not in consumed)
+        started = time.perf_counter()
+        processed = 0
+
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.config,)) if self.workers else None
+        if pool is None:
+            _init_worker(self.config)
+        # The index is compacted once below, not every time its tail fills up
+        deferred = self.repo.index.deferred_compaction() if self.repo.index is not None else nullcontext()
+        try:
+            with deferred:
+                # One batch in flight at a time keeps memory bounded; Executor.map
+                # would otherwise read the whole source up front
+                for chunk in _chunks(docs, self.batch_size):
+                    keys = [key for key, _ in chunk]
+                    chunk = [doc for _, doc in chunk]
+                    if pool:
+                        chunksize = max(1, len(chunk) // (self.workers * 4))
+                        prepared = list(pool.map(_prepare, chunk, chunksize=chunksize))
+                    else:
+                        prepared = [_prepare(doc) for doc in chunk]
+                    processed += self._write(prepared, state, keys)
+                    if progress:
+                        progress(self._report(state, processed, started))
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        if self.repo.index is not None:
+            self.repo.index.compact()
+        return self._report(state, processed, started)
+
+    def _write(self, batch: List[Tuple], state: Dict, keys: List[str]) -> int:
+        known = self.repo.known_hashes({item[3] for item in batch})
+        entries = []
+        for source, text, paragraphs, digest, metadata in batch:
+            if not paragraphs:
+                state["empty"] += 1
+            elif digest in known:
+                state["duplicates"] += 1
+            else:
+                known.add(digest)
+                entries.append(ContentEntry(content=text, paragraphs=paragraphs, metadata=metadata))
+        self.repo.add_many(entries)
+        state["ingested"] += len(entries)
+        state["consumed"] += len(batch)
+        self._save_checkpoint(state, keys)
+        return len(batch)
+
+    def _report(self, state: Dict, processed: int, started: float) -> Dict:
+        elapsed = time.perf_counter() - started
+        return {
+            **state,
+            "processed_this_run": processed,
+            "elapsed_sec": round(elapsed, 3),
+            "docs_per_sec": round(processed / elapsed, 1) if elapsed > 0 else None
+        }
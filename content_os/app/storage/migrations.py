@@ -0,0 +1,61 @@
+import sqlite3
+from typing import Callable, List, Union
+
+def schema_version(conn: sqlite3.Connection, component: str) -> int:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            component TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+    row = conn.execute("SELECT version FROM schema_version WHERE component = ?", (component,)).fetchone()
+    return row[0] if row else 0
+
+Statement = Union[str, Callable[[sqlite3.Connection], None]]
+
+def migrate(conn: sqlite3.Connection, component: str, steps: List[List[Statement]]) -> int:
+    """
+    Applies the steps of `component` that have not run yet. Step i (1-based)
+    is a list of SQL statements or callables taking the connection (for data
+    backfills); the version recorded afterwards is the number of steps
+    applied.
+
+    sqlite3 runs DDL outside any implicit transaction, so the steps run under
+    BEGIN IMMEDIATE: the version is re-read once the write lock is held (two
+    processes starting together apply each step once), and a step's DDL,
+    backfill and version row commit or roll back together. If the caller
+    already has a transaction open, the steps join it instead.
+    """
+    try:
+        row = conn.execute("SELECT version FROM schema_version WHERE component = ?", (component,)).fetchone()
+        if row and row[0] >= len(steps):
+            return row[0]
+    except sqlite3.OperationalError:
+        pass  # no schema_version table yet
+
+    own = not conn.in_transaction
+    if own:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = schema_version(conn, component)
+        for version, statements in enumerate(steps, start=1):
+            if version <= current:
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (component, version) VALUES (?, ?) "
+                "ON CONFLICT (component) DO UPDATE SET version = excluded.version",
+                (component, version)
+            )
+            current = version
+        if own:
+            conn.commit()
+    except BaseException:
+        if own:
+            conn.rollback()
+        raise
+    return current
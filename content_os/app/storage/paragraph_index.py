@@ -0,0 +1,343 @@
+import os
+import json
+from contextlib import contextmanager
+from typing import List, Dict, Iterable, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from ..eval.minhash import MinHasher, LSHIndex
+
+class ParagraphIndex:
+    """
+    Persistent TF-IDF paragraph index stored next to the SQLite database.
+
+    Layout of the index directory:
+      meta.json                 - row counts and index parameters
+      counts.{data,indices,indptr} - append-only CSR log of raw term counts
+      rows.jsonl / rows.offsets - paragraph text and owning content_id per row
+      minhash.u32               - append-only MinHash signatures per row
+      base/*.npy                - compacted postings (feature -> rows) with IDF
+                                  weighted, L2 normalised values, plus the
+                                  sorted LSH band keys
+
+    Terms are hashed instead of kept in a growing vocabulary so rows can be
+    appended without refitting. Rows appended after the last compaction form a
+    small "tail" that is scored directly; `compact()` folds it into the
+    postings and refreshes the IDF snapshot. It runs on its own once the tail
+    reaches `compact_threshold` rows and `compact_ratio` of the compacted
+    rows, so the base grows geometrically and the rebuild cost per appended
+    row stays constant however large the index gets.
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(self, index_dir: str, n_features: int = 2 ** 20, compact_threshold: int = 2048,
+                 num_perm: int = 128, bands: int = 32, rows: int = 4, compact_ratio: float = 0.25):
+        self.index_dir = index_dir
+        self.compact_threshold = compact_threshold
+        self.compact_ratio = compact_ratio
+        os.makedirs(os.path.join(index_dir, "base"), exist_ok=True)
+
+        meta_path = os.path.join(index_dir, self.META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {
+                "n_features": n_features, "n_rows": 0, "nnz": 0, "text_bytes": 0, "base_rows": 0,
+                "minhash": {"num_perm": num_perm, "shingle_size": 5, "bands": bands, "rows": rows}
+            }
+            self._write_meta()
+        self._truncate_to_meta()
+
+        mh = self.meta.get("minhash")
+        self.minhasher = MinHasher(mh["num_perm"], mh["shingle_size"]) if mh else None
+
+        self.vectorizer = HashingVectorizer(
+            n_features=self.meta["n_features"],
+            alternate_sign=False,
+            norm=None
+        )
+        self._load()
+
+    @staticmethod
+    def path_for(db_path: str) -> str:
+        """
+        Default index location for a database file (blogs.db -> blogs.paraidx).
+        """
+        return os.path.splitext(db_path)[0] + ".paraidx"
+
+    def __len__(self) -> int:
+        return self.meta["n_rows"]
+
+    # -- persistence -----------------------------------------------------
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.index_dir, *parts)
+
+    def _write_meta(self):
+        tmp = self._path(self.META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._path(self.META_FILE))
+
+    def _truncate_to_meta(self):
+        # meta.json is written last, so anything past it is a torn append
+        expected = {
+            "counts.data": self.meta["nnz"] * 4,
+            "counts.indices": self.meta["nnz"] * 4,
+            "counts.indptr": (self.meta["n_rows"] + 1) * 8 if self.meta["n_rows"] else 0,
+            "rows.offsets": self.meta["n_rows"] * 8,
+            "rows.jsonl": self.meta["text_bytes"],
+        }
+        if self.meta.get("minhash"):
+            expected["minhash.u32"] = self.meta["n_rows"] * self.meta["minhash"]["num_perm"] * 4
+        for name, size in expected.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def _memmap(self, name: str, dtype, length: int):
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode="r", shape=(length,))
+
+    def _load(self):
+        n_rows, nnz = self.meta["n_rows"], self.meta["nnz"]
+        self._data = self._memmap("counts.data", np.float32, nnz)
+        self._indices = self._memmap("counts.indices", np.int32, nnz)
+        if n_rows:
+            self._indptr = self._memmap("counts.indptr", np.int64, n_rows + 1)
+        else:
+            self._indptr = np.zeros(1, dtype=np.int64)
+        self._offsets = self._memmap("rows.offsets", np.int64, n_rows)
+
+        self._lsh = None
+        if self.minhasher is not None:
+            num_perm = self.minhasher.num_perm
+            self._signatures = self._memmap("minhash.u32", np.uint32, n_rows * num_perm).reshape(n_rows, num_perm)
+
+        if self.meta["base_rows"]:
+            self._idf = np.load(self._path("base", "idf.npy"), mmap_mode="r")
+            self._postings = sparse.csr_matrix((
+                np.load(self._path("base", "postings_data.npy"), mmap_mode="r"),
+                np.load(self._path("base", "postings_indices.npy"), mmap_mode="r"),
+                np.load(self._path("base", "postings_indptr.npy"), mmap_mode="r"),
+            ), shape=(self.meta["n_features"], self.meta["base_rows"]))
+        else:
+            self._idf = np.ones(self.meta["n_features"], dtype=np.float32)
+            self._postings = None
+
+    # -- writes ----------------------------------------------------------
+
+    def add(self, content_id: Optional[int], paragraphs: List[str]) -> int:
+        """
+        Appends the paragraphs of one post. Returns the number of rows added.
+        """
+        return self.add_many([(content_id, paragraphs)])
+
+    def add_many(self, items: Iterable[Tuple[Optional[int], List[str]]]) -> int:
+        rows = [(cid, p) for cid, paras in items for p in paras]
+        if not rows:
+            return 0
+
+        counts = self.vectorizer.transform([p for _, p in rows]).tocsr()
+        counts.sort_indices()
+        n_rows, nnz = self.meta["n_rows"], self.meta["nnz"]
+
+        with open(self._path("counts.data"), "ab") as f:
+            f.write(counts.data.astype(np.float32).tobytes())
+        with open(self._path("counts.indices"), "ab") as f:
+            f.write(counts.indices.astype(np.int32).tobytes())
+        with open(self._path("counts.indptr"), "ab") as f:
+            indptr = counts.indptr.astype(np.int64) + nnz
+            # The leading 0 is only written for the very first batch
+            f.write((indptr if n_rows == 0 else indptr[1:]).tobytes())
+
+        pos = self.meta["text_bytes"]
+        offsets = []
+        with open(self._path("rows.jsonl"), "ab") as f:
+            for cid, text in rows:
+                line = (json.dumps({"content_id": cid, "text": text}, ensure_ascii=False) + "\n").encode("utf-8")
+                offsets.append(pos)
+                f.write(line)
+                pos += len(line)
+        with open(self._path("rows.offsets"), "ab") as f:
+            f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+        if self.minhasher is not None:
+            with open(self._path("minhash.u32"), "ab") as f:
+                f.write(self.minhasher.signatures([p for _, p in rows]).tobytes())
+
+        self.meta["n_rows"] = n_rows + len(rows)
+        self.meta["nnz"] = nnz + counts.nnz
+        self.meta["text_bytes"] = pos
+        self._write_meta()
+
+        self._load()
+        tail = self.meta["n_rows"] - self.meta["base_rows"]
+        if tail >= max(self.compact_threshold, self.meta["base_rows"] * self.compact_ratio):
+            self.compact()
+        return len(rows)
+
+    @contextmanager
+    def deferred_compaction(self):
+        """
+        Turns auto-compaction off for a bulk load; the caller compacts once at the end.
+        """
+        threshold = self.compact_threshold
+        self.compact_threshold = float("inf")
+        try:
+            yield self
+        finally:
+            self.compact_threshold = threshold
+
+    def compact(self):
+        """
+        Rebuilds the IDF snapshot and the postings over every row.
+        """
+        n_rows = self.meta["n_rows"]
+        if n_rows == 0:
+            return
+        counts = self._counts(0, n_rows)
+        df = np.bincount(counts.indices, minlength=self.meta["n_features"])
+        # Same smoothing as sklearn's TfidfVectorizer(smooth_idf=True)
+        idf = (np.log((1 + n_rows) / (1 + df)) + 1).astype(np.float32)
+
+        weighted = normalize(counts.multiply(idf).tocsr().astype(np.float32))
+        postings = weighted.T.tocsr()
+
+        base = self._path("base")
+        np.save(os.path.join(base, "idf.npy"), idf)
+        np.save(os.path.join(base, "postings_data.npy"), postings.data.astype(np.float32))
+        np.save(os.path.join(base, "postings_indices.npy"), postings.indices.astype(np.int32))
+        np.save(os.path.join(base, "postings_indptr.npy"), postings.indptr.astype(np.int64))
+        if self.minhasher is not None:
+            lsh = self._new_lsh().build(np.asarray(self._signatures[:n_rows]))
+            np.save(os.path.join(base, "lsh_keys.npy"), lsh.keys)
+            np.save(os.path.join(base, "lsh_rows.npy"), lsh.row_ids)
+
+        self.meta["base_rows"] = n_rows
+        self._write_meta()
+        self._load()
+
+    # -- reads -----------------------------------------------------------
+
+    def _counts(self, start: int, stop: int) -> sparse.csr_matrix:
+        lo, hi = int(self._indptr[start]), int(self._indptr[stop])
+        return sparse.csr_matrix((
+            np.asarray(self._data[lo:hi]),
+            np.asarray(self._indices[lo:hi]),
+            np.asarray(self._indptr[start:stop + 1]) - lo
+        ), shape=(stop - start, self.meta["n_features"]))
+
+    def weigh(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """
+        Applies the current IDF snapshot and L2 normalisation to raw counts.
+        """
+        return normalize(counts.multiply(self._idf).tocsr().astype(np.float32))
+
+    def vectorize(self, paragraphs: List[str]) -> sparse.csr_matrix:
+        return self.weigh(self.vectorizer.transform(paragraphs).tocsr())
+
+    def row_vectors(self, row_ids: List[int]) -> sparse.csr_matrix:
+        """
+        Weighted vectors for an arbitrary set of rows (used for exact re-scoring).
+        """
+        starts = np.asarray(self._indptr)[np.asarray(row_ids, dtype=np.int64)]
+        ends = np.asarray(self._indptr)[np.asarray(row_ids, dtype=np.int64) + 1]
+        indptr = np.concatenate(([0], np.cumsum(ends - starts)))
+        data = [np.asarray(self._data[s:e]) for s, e in zip(starts, ends)]
+        indices = [np.asarray(self._indices[s:e]) for s, e in zip(starts, ends)]
+        counts = sparse.csr_matrix((
+            np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            indptr
+        ), shape=(len(row_ids), self.meta["n_features"]))
+        return self.weigh(counts)
+
+    def _new_lsh(self) -> LSHIndex:
+        mh = self.meta["minhash"]
+        return LSHIndex(mh["bands"], mh["rows"])
+
+    def lsh_candidates(self, paragraphs: List[str]) -> List[np.ndarray]:
+        """
+        Row ids whose MinHash signatures share an LSH band with each paragraph.
+        """
+        if self.minhasher is None:
+            raise ValueError("This index was built without MinHash signatures; rebuild it to use LSH")
+        base_rows, n_rows = self.meta["base_rows"], self.meta["n_rows"]
+        if self._lsh is None:
+            self._lsh = self._new_lsh()
+            if base_rows:
+                self._lsh.load(
+                    np.load(self._path("base", "lsh_keys.npy"), mmap_mode="r"),
+                    np.load(self._path("base", "lsh_rows.npy"), mmap_mode="r")
+                )
+        tail_keys = self._lsh.band_keys(np.asarray(self._signatures[base_rows:n_rows]))
+
+        query_keys = self._lsh.band_keys(self.minhasher.signatures(paragraphs))
+        candidates = []
+        for keys in query_keys:
+            found = self._lsh.query(keys) if base_rows else np.zeros(0, dtype=np.int64)
+            tail_hits = np.nonzero((tail_keys == keys).any(axis=1))[0] + base_rows
+            candidates.append(np.union1d(found, tail_hits))
+        return candidates
+
+    def get_row(self, row_id: int) -> Dict:
+        with open(self._path("rows.jsonl"), "rb") as f:
+            f.seek(int(self._offsets[row_id]))
+            return json.loads(f.readline().decode("utf-8"))
+
+    def search(self, paragraphs: List[str], k: int = 5, prefilter: Optional[str] = None) -> List[List[Tuple[int, float]]]:
+        """
+        Returns the top-k (row_id, cosine score) pairs for every paragraph.
+        Only rows sharing at least one term with a paragraph are touched.
+        With prefilter="lsh", only MinHash/LSH candidates are scored exactly.
+        """
+        if not paragraphs or not len(self):
+            return [[] for _ in paragraphs]
+
+        if prefilter == "lsh":
+            return self.search_candidates(paragraphs, self.lsh_candidates(paragraphs), k)
+
+        queries = self.vectorize(paragraphs)
+        blocks = []
+        if self._postings is not None:
+            blocks.append(queries @ self._postings)
+        base_rows = self.meta["base_rows"]
+        if self.meta["n_rows"] > base_rows:
+            tail = self.weigh(self._counts(base_rows, self.meta["n_rows"]))
+            blocks.append(queries @ tail.T)
+        scores = sparse.hstack(blocks).tocsr() if len(blocks) > 1 else blocks[0].tocsr()
+
+        results = []
+        for i in range(scores.shape[0]):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            row_ids, vals = scores.indices[start:end], scores.data[start:end]
+            if len(vals) > k:
+                top = np.argpartition(-vals, k - 1)[:k]
+                row_ids, vals = row_ids[top], vals[top]
+            order = np.argsort(-vals, kind="stable")
+            results.append([(int(row_ids[j]), float(vals[j])) for j in order])
+        return results
+
+    def search_candidates(self, paragraphs: List[str], candidates: List[np.ndarray], k: int = 5) -> List[List[Tuple[int, float]]]:
+        """
+        Exact cosine top-k for each paragraph, restricted to its candidate rows.
+        """
+        union = np.unique(np.concatenate(candidates)) if candidates else np.zeros(0, dtype=np.int64)
+        if not len(union):
+            return [[] for _ in candidates]
+        scores = (self.vectorize(paragraphs) @ self.row_vectors(union).T).toarray()
+
+        results = []
+        for i, cand in enumerate(candidates):
+            cols = np.searchsorted(union, cand)
+            vals = scores[i, cols]
+            keep = vals > 0
+            cand, vals = cand[keep], vals[keep]
+            order = np.argsort(-vals, kind="stable")[:k]
+            results.append([(int(cand[j]), float(vals[j])) for j in order])
+        return results
@@ -1,51 +1,263 @@
-import sqlite3
+import os
+import re
+import shutil
+import hashlib
 import json
-from typing import List, Optional
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from .models import ContentEntry
+from .paragraph_index import ParagraphIndex
+from .db import Database, get_database
+from .migrations import migrate
+
+# Columns iter_paragraphs / iter_entries may project
+PARAGRAPH_COLUMNS = ("content_id", "ordinal", "text", "hash", "chars", "words")
+ENTRY_COLUMNS = ("id", "content", "metadata", "created_at")
+
+def paragraph_hash(text: str) -> str:
+    """
+    Whitespace- and case-insensitive fingerprint of a paragraph, for exact duplicate lookups.
+    """
+    normalized = re.sub(r'\s+', ' ', text).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+def paragraph_rows(content_id: int, paragraphs: List[str]) -> List[Tuple]:
+    return [
+        (content_id, ordinal, text, paragraph_hash(text), len(text), len(text.split()))
+        for ordinal, text in enumerate(paragraphs)
+    ]
+
+def content_hash(text: str) -> str:
+    """
+    Fingerprint of a whole post, used to skip re-ingesting the same body.
+    """
+    normalized = re.sub(r'\s+', ' ', text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def _backfill_content_hashes(conn: sqlite3.Connection):
+    cursor = conn.execute("SELECT id, content FROM contents WHERE content_hash IS NULL")
+    while True:
+        rows = cursor.fetchmany(500)
+        if not rows:
+            break
+        conn.executemany("UPDATE contents SET content_hash = ? WHERE id = ?",
+                         [(content_hash(text or ""), content_id) for content_id, text in rows])
+
+def _backfill_paragraphs(conn: sqlite3.Connection):
+    """
+    Copies the per-row JSON paragraph blobs into the paragraphs table. The
+    blobs are left in place, so readers of the old column still see them.
+    """
+    cursor = conn.execute("SELECT id, paragraphs FROM contents WHERE paragraphs IS NOT NULL ORDER BY id")
+    while True:
+        rows = cursor.fetchmany(500)
+        if not rows:
+            break
+        batch = []
+        for content_id, blob in rows:
+            batch.extend(paragraph_rows(content_id, json.loads(blob)))
+        conn.executemany("INSERT OR IGNORE INTO paragraphs VALUES (?, ?, ?, ?, ?, ?)", batch)
+
+# schema_version steps for the "contents" component
+MIGRATIONS = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS contents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content TEXT,
+            paragraphs TEXT,
+            metadata TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ],
+    [
+        # contents.paragraphs keeps its existing blobs for old readers; rows added after this step leave it NULL
+        """
+        CREATE TABLE IF NOT EXISTS paragraphs (
+            content_id INTEGER NOT NULL,
+            ordinal INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            chars INTEGER NOT NULL,
+            words INTEGER NOT NULL,
+            PRIMARY KEY (content_id, ordinal)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_paragraphs_hash ON paragraphs (hash)",
+        _backfill_paragraphs,
+    ],
+    [
+        "ALTER TABLE contents ADD COLUMN content_hash TEXT",
+        _backfill_content_hashes,
+        "CREATE INDEX IF NOT EXISTS idx_contents_hash ON contents (content_hash)",
+    ],
+]
 
 class ContentRepo:
-    def __init__(self, db_path: str = "blogs.db"):
+    def __init__(self, db_path: str = "blogs.db", index_dir: Optional[str] = None, use_index: bool = True,
+                 db: Optional[Database] = None):
         self.db_path = db_path
+        self.db = db or get_database(db_path)
         self._init_db()
+        self.index = None
+        if use_index:
+            self.index = ParagraphIndex(index_dir or ParagraphIndex.path_for(db_path))
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS contents (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    content TEXT,
-                    paragraphs TEXT,
-                    metadata TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+        with self.db.connection() as conn:
+            migrate(conn, "contents", MIGRATIONS)
+
+    def close(self):
+        self.db.close()
 
     def add_content(self, entry: ContentEntry):
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "INSERT INTO contents (content, paragraphs, metadata) VALUES (?, ?, ?)",
-                (entry.content, json.dumps(entry.paragraphs), json.dumps(entry.metadata))
-            )
-            return cursor.lastrowid
+        return self.add_many([entry])[0]
+
+    def add_many(self, entries: Iterable[ContentEntry]) -> List[int]:
+        """
+        Inserts entries and their paragraphs in one transaction and appends
+        them to the paragraph index. Returns the new content ids.
+        """
+        added = []
+        with self.db.connection() as conn:
+            for entry in entries:
+                cursor = conn.execute(
+                    "INSERT INTO contents (content, metadata, content_hash) VALUES (?, ?, ?)",
+                    (entry.content, json.dumps(entry.metadata), content_hash(entry.content))
+                )
+                conn.executemany(
+                    "INSERT INTO paragraphs VALUES (?, ?, ?, ?, ?, ?)",
+                    paragraph_rows(cursor.lastrowid, entry.paragraphs)
+                )
+                added.append((cursor.lastrowid, entry.paragraphs))
+        if self.index is not None:
+            self.index.add_many(added)
+        return [content_id for content_id, _ in added]
+
+    def rebuild_index(self) -> int:
+        """
+        Re-creates the paragraph index from the paragraphs table.
+        Used once for databases created before the index existed.
+        """
+        index_dir = self.index.index_dir if self.index else ParagraphIndex.path_for(self.db_path)
+        if os.path.exists(index_dir):
+            shutil.rmtree(index_dir)
+        self.index = ParagraphIndex(index_dir)
+        batch, content_id, paragraphs = [], None, []
+        for cid, text in self.iter_paragraphs(("content_id", "text")):
+            if cid != content_id:
+                if content_id is not None:
+                    batch.append((content_id, paragraphs))
+                content_id, paragraphs = cid, []
+                if len(batch) >= 500:
+                    self.index.add_many(batch)
+                    batch = []
+            paragraphs.append(text)
+        if content_id is not None:
+            batch.append((content_id, paragraphs))
+        self.index.add_many(batch)
+        self.index.compact()
+        return len(self.index)
+
+    def known_hashes(self, hashes: Iterable[str]) -> set:
+        """
+        The subset of the given content hashes already stored.
+        """
+        hashes = list(hashes)
+        found = set()
+        with self.db.connection() as conn:
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                found.update(row[0] for row in conn.execute(
+                    f"SELECT content_hash FROM contents WHERE content_hash IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+        return found
+
+    def count(self) -> int:
+        with self.db.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0]
+
+    def iter_paragraphs(self, columns: Sequence[str] = ("content_id", "ordinal", "text"),
+                        content_ids: Optional[Iterable[int]] = None,
+                        batch_size: int = 2000) -> Iterator[Tuple]:
+        """
+        Streams paragraph rows as plain tuples of `columns` (see
+        PARAGRAPH_COLUMNS), ordered by (content_id, ordinal). Rows are read in
+        keyset batches, so memory stays flat and no post bodies are loaded.
+        """
+        unknown = set(columns) - set(PARAGRAPH_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown paragraph column(s): {', '.join(sorted(unknown))}")
+        if content_ids is not None:
+            for content_id in content_ids:
+                with self.db.connection() as conn:
+                    rows = conn.execute(
+                        f"SELECT {', '.join(columns)} FROM paragraphs WHERE content_id = ? ORDER BY ordinal",
+                        (content_id,)
+                    ).fetchall()
+                yield from rows
+            return
+
+        # Key columns are always selected (first) so the next batch can resume after them
+        select = ", ".join(("content_id", "ordinal") + tuple(columns))
+        query = f"SELECT {select} FROM paragraphs WHERE (content_id, ordinal) > (?, ?) ORDER BY content_id, ordinal LIMIT ?"
+        last = (-1, -1)
+        while True:
+            with self.db.connection() as conn:
+                rows = conn.execute(query, last + (batch_size,)).fetchall()
+            for row in rows:
+                yield row[2:]
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][:2]
+
+    def iter_entries(self, columns: Sequence[str] = ("id", "metadata", "created_at"),
+                     with_paragraphs: bool = False, batch_size: int = 500) -> Iterator[Dict]:
+        """
+        Streams posts as dicts of `columns` (see ENTRY_COLUMNS) without pydantic
+        validation. The body is only read when "content" is requested;
+        with_paragraphs adds a "paragraphs" list.
+        """
+        unknown = set(columns) - set(ENTRY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown entry column(s): {', '.join(sorted(unknown))}")
+        select = ", ".join(("id",) + tuple(c for c in columns if c != "id"))
+        query = f"SELECT {select} FROM contents WHERE id > ? ORDER BY id LIMIT ?"
+        last_id = 0
+        while True:
+            with self.db.connection() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = [dict(r) for r in conn.execute(query, (last_id, batch_size))]
+            if with_paragraphs and rows:
+                paragraphs: Dict[int, List[str]] = {r["id"]: [] for r in rows}
+                with self.db.connection() as conn:
+                    for content_id, text in conn.execute(
+                        "SELECT content_id, text FROM paragraphs WHERE content_id BETWEEN ? AND ? ORDER BY content_id, ordinal",
+                        (rows[0]["id"], rows[-1]["id"])
+                    ):
+                        paragraphs[content_id].append(text)
+            for row in rows:
+                if "metadata" in row:
+                    row["metadata"] = json.loads(row["metadata"]) if row["metadata"] else None
+                if with_paragraphs:
+                    row["paragraphs"] = paragraphs[row["id"]]
+                if "id" not in columns:
+                    last_id = row.pop("id")
+                else:
+                    last_id = row["id"]
+                yield row
+            if len(rows) < batch_size:
+                return
+
+    def get_paragraphs(self, content_id: int) -> List[str]:
+        return [text for (text,) in self.iter_paragraphs(("text",), content_ids=[content_id])]
 
     def get_all_paragraphs(self) -> List[str]:
-        all_paras = []
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT paragraphs FROM contents")
-            for row in cursor:
-                all_paras.extend(json.loads(row[0]))
-        return all_paras
+        return [text for (text,) in self.iter_paragraphs(("text",))]
 
     def get_all_entries(self) -> List[ContentEntry]:
-        entries = []
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT id, content, paragraphs, metadata, created_at FROM contents")
-            for row in cursor:
-                entries.append(ContentEntry(
-                    id=row[0],
-                    content=row[1],
-                    paragraphs=json.loads(row[2]),
-                    metadata=json.loads(row[3]),
-                    created_at=row[4]
-                ))
-        return entries
+        return [
+            ContentEntry(**row)
+            for row in self.iter_entries(ENTRY_COLUMNS, with_paragraphs=True)
+        ]
@@ -40,5 +40,51 @@ class TestAdsLinter(unittest.TestCase):
         self.assertTrue(len(report["violations"]) > 0)
         self.assertIn("immediately adjacent", report["violations"][0]["message"])
 
+    def test_near_but_not_adjacent_is_a_warning(self):
+        html = """
+        <div>
+            <div class="ad-unit">Ad Content</div>
+            <p>Short line</p>
+            <button class="cta-button">Buy Now</button>
+        </div>
+        """
+        report = self.linter.lint(html)
+        self.assertEqual(report["status"], "PASS")
+        self.assertEqual(len(report["warnings"]), 1)
+        warning = report["warnings"][0]
+        self.assertEqual((warning["position"], warning["nodes_between"]), ("after", 1))
+        self.assertLess(warning["estimated_distance_px"], 120)
+
+        # Enough content in between clears the warning too
+        far = html.replace("<p>Short line</p>", "<p>Long paragraph text.</p>" * 5)
+        self.assertEqual(self.linter.lint(far)["warnings"], [])
+
+        # A configured node window turns the near case into a REJECT
+        strict = AdsLinter({"ads_ux": {"rules": {"forbid_near_elements": ["button"], "max_adjacent_nodes": 1}}})
+        self.assertEqual(strict.lint(html)["status"], "FAIL")
+
+    def test_adjacency_across_containers(self):
+        html = """
+        <section>
+            <div class="card"><h3>Product</h3><a class="cta-button" href="#">Buy</a></div>
+            <div class="wrap"><ins class="adsbygoogle"></ins></div>
+            <div class="card"><h3>Next product</h3></div>
+        </section>
+        """
+        report = self.linter.lint(html)
+        self.assertEqual(report["status"], "FAIL")
+        self.assertEqual(report["violations"][0]["position"], "before")
+
+    def test_flat_product_list(self):
+        cards = "".join(
+            f'<div class="card"><p>Product {i}</p><button>Buy</button></div>'
+            + ('<div class="ad-unit">Ad</div><p>Spacer paragraph</p>' if i % 10 == 0 else "")
+            for i in range(2000)
+        )
+        report = self.linter.lint(f"<main>{cards}</main>")
+        # Every ad directly follows a card's button; the next card's text separates it after
+        self.assertEqual(len(report["violations"]), 200)
+        self.assertTrue(all(v["position"] == "before" for v in report["violations"]))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os
+import json
+import shutil
+import zipfile
+from unittest import mock
+from app.pipeline import asset_store
+from app.pipeline.asset_store import AssetStore, referenced_digests, write_manifest
+from app.pipeline.unique_pack import UniquePackGenerator
+from app.publish.naver_package import NaverPackageGenerator
+
+class TestAssetStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_asset_store_root"
+        os.makedirs(os.path.join(self.test_dir, "src"), exist_ok=True)
+        self.src = os.path.join(self.test_dir, "src", "photo.jpg")
+        with open(self.src, "wb") as f:
+            f.write(b"jpeg bytes" * 1000)
+        self.store = AssetStore(os.path.join(self.test_dir, "assets"), algorithm="md5")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_identical_files_share_one_blob(self):
+        a = os.path.join(self.test_dir, "a.jpg")
+        b = os.path.join(self.test_dir, "b.jpg")
+        entry_a = self.store.add(self.src, a)
+        entry_b = self.store.add(self.src, b)
+        self.assertEqual(entry_a["digest"], entry_b["digest"])
+        self.assertEqual(len(list(self.store.blobs())), 1)
+        self.assertEqual(entry_a["placement"], "hardlink")
+        self.assertEqual(os.stat(a).st_ino, os.stat(b).st_ino)
+        # The source itself is never linked into the store
+        self.assertNotEqual(os.stat(a).st_ino, os.stat(self.src).st_ino)
+
+    def test_falls_back_to_copy(self):
+        store = AssetStore(os.path.join(self.test_dir, "assets"), placement="hardlink", algorithm="md5")
+        dest = os.path.join(self.test_dir, "copied.jpg")
+        with mock.patch.object(asset_store.os, "link", side_effect=OSError("cross-device link")):
+            entry = store.add(self.src, dest)
+        self.assertEqual(entry["placement"], "copy")
+        with open(dest, "rb") as f, open(self.src, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_gc_drops_unreferenced_blobs(self):
+        pack = os.path.join(self.test_dir, "packages", "POST001")
+        os.makedirs(pack)
+        entry = self.store.add(self.src, os.path.join(pack, "photo.jpg"))
+        write_manifest(pack, {"photo.jpg": entry})
+
+        other = os.path.join(self.test_dir, "src", "other.jpg")
+        with open(other, "wb") as f:
+            f.write(b"unused")
+        self.store.put(other)
+
+        referenced = referenced_digests([os.path.join(self.test_dir, "packages")])
+        self.assertEqual(referenced, {entry["digest"]})
+        # Fresh blobs are protected by the age threshold
+        self.assertEqual(self.store.gc(referenced)["removed"], 0)
+        result = self.store.gc(referenced, min_age_sec=0)
+        self.assertEqual((result["removed"], result["kept"]), (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(pack, "photo.jpg")))
+
+class TestPackAssets(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_pack_assets_root"
+        self.config = {
+            "content_sources": {"image_assets_dir": os.path.join(self.test_dir, "images")},
+            "unique_pack": {
+                "required_per_post": {"min_images": 2},
+                "outputs": {"package_dir": os.path.join(self.test_dir, "out", "packages")},
+                "perceptual": {"enabled": False}
+            }
+        }
+        sku_dir = os.path.join(self.test_dir, "images", "SKU001")
+        os.makedirs(sku_dir)
+        for i in range(2):
+            with open(os.path.join(sku_dir, f"img{i}.jpg"), "wb") as f:
+                f.write(f"image {i}".encode("utf-8") * 100)
+        self.generator = UniquePackGenerator(self.config)
+
+    def tearDown(self):
+        self.generator.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_packs_reference_assets_by_digest(self):
+        self.generator.process("SKU001", "POST001")
+        self.generator.process("SKU001", "POST002")
+        packages = os.path.join(self.test_dir, "out", "packages")
+        with open(os.path.join(packages, "POST001", "assets.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest), ["img0.jpg", "img1.jpg"])
+        # Two packs, two distinct images: two blobs
+        self.assertEqual(len(list(self.generator.asset_store.blobs())), 2)
+        self.assertEqual(
+            os.stat(os.path.join(packages, "POST001", "selected_images", "img0.jpg")).st_ino,
+            os.stat(os.path.join(packages, "POST002", "selected_images", "img0.jpg")).st_ino
+        )
+
+        images = [os.path.join(packages, "POST001", "selected_images", name) for name in sorted(manifest)]
+        zip_path = NaverPackageGenerator(os.path.join(self.test_dir, "naver")).create_package(
+            "POST001", "Title", "<p>Body</p>", images, {}
+        )
+        with zipfile.ZipFile(zip_path) as z:
+            self.assertEqual(z.getinfo("images/img0.jpg").compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(z.getinfo("content.html").compress_type, zipfile.ZIP_DEFLATED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import io
+import json
+import os
+from contextlib import redirect_stdout
+import shutil
+from concurrent.futures import Future
+from fastapi.testclient import TestClient
+
+# The API's shared collector and publish queue open this instead of ./blogs.db
+TEST_DB = "test_batch_compliance.db"
+os.environ["CONTENT_OS_DB"] = TEST_DB
+from app import main as app_main
+from app.storage.db import close_all
+from app.eval.batch import BatchEvaluator
+from app.eval.compliance import main as compliance_cli
+
+LINES = [
+    json.dumps({"id": "a", "content": "이 제품은 정말 좋네요.", "language": "ko"}, ensure_ascii=False),
+    json.dumps({"id": "b", "content": "이 약은 무조건 완치 보장합니다.", "language": "ko"}, ensure_ascii=False),
+    "",
+    "{not json",
+    json.dumps({"id": "c", "content": "This is a 100% cure.", "language": "en"})
+]
+
+def tearDownModule():
+    close_all()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
+    if os.path.exists("test_batch_compliance.events"):
+        shutil.rmtree("test_batch_compliance.events")
+
+class TestBatchCompliance(unittest.TestCase):
+    def _check(self, items):
+        *results, stats = items
+        by_id = {r["id"]: r for r in results if "error" not in r}
+        self.assertEqual(by_id["a"]["status"], "PASS")
+        self.assertEqual(by_id["b"]["status"], "REJECT")
+        self.assertEqual(by_id["c"]["status"], "REJECT")
+        self.assertEqual([r["line"] for r in results if "error" in r], [4])
+        self.assertEqual(stats["stats"]["total"], 4)
+        self.assertEqual(stats["stats"]["errors"], 1)
+
+    def test_inline(self):
+        self._check(list(BatchEvaluator(workers=0).run(LINES)))
+
+    def test_process_pool(self):
+        batch = BatchEvaluator(workers=2, chunk_size=1)
+        try:
+            self._check(list(batch.run(LINES)))
+        finally:
+            batch.close()
+
+    def test_closing_early_cancels_pending_chunks(self):
+        class StalledPool:
+            """Completes the first chunk; the rest never start."""
+            def __init__(self):
+                self.futures = []
+
+            def submit(self, fn, chunk):
+                future = Future()
+                if not self.futures:
+                    future.set_result([{"line": chunk[0][0], "id": None, "status": "PASS"}])
+                self.futures.append(future)
+                return future
+
+        batch = BatchEvaluator(workers=1, chunk_size=1)
+        batch._pool = pool = StalledPool()
+        results = batch.run(LINES[:2] * 20)
+        next(results)
+        # What StreamingResponse does when the client disconnects
+        results.close()
+        self.assertEqual(len(pool.futures), batch.max_pending)
+        self.assertTrue(all(f.cancelled() for f in pool.futures[1:]))
+
+    def test_streaming_endpoint(self):
+        original = app_main.batch_evaluator
+        app_main.batch_evaluator = BatchEvaluator(workers=0, chunk_size=2)
+        try:
+            with TestClient(app_main.app) as client:
+                res = client.post("/check/batch", content="\n".join(LINES).encode("utf-8"))
+            self.assertEqual(res.headers["content-type"], "application/x-ndjson")
+            self._check([json.loads(line) for line in res.text.splitlines()])
+        finally:
+            app_main.batch_evaluator = original
+
+    def test_cli_batch(self):
+        path = "test_batch_input.ndjson"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(LINES))
+        try:
+            out = io.StringIO()
+            with redirect_stdout(out):
+                compliance_cli(["--batch", path, "--workers", "0"])
+            self._check([json.loads(line) for line in out.getvalue().splitlines()])
+        finally:
+            os.remove(path)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,6 +17,11 @@ class TestCompliance(unittest.TestCase):
         self.assertEqual(res.status, "REJECT")
         self.assertTrue(any(f['code'] == "KO_BANNED_CLAIM" for f in res.fail))
 
+    def test_banned_word_location(self):
+        req = ComplianceRequest(content="솔직한 후기입니다.\n\n이 크림은 무조건 효과가 있습니다.", language="ko")
+        res = self.evaluator.evaluate(req)
+        self.assertEqual(res.fail[0]["location"], "2문단")
+
     def test_en_clean_content(self):
         req = ComplianceRequest(content="This product is great for daily use.", language="en")
         res = self.evaluator.evaluate(req)
@@ -37,5 +42,10 @@ class TestCompliance(unittest.TestCase):
         res = self.evaluator.evaluate(req)
         self.assertEqual(res.status, "WARN")
 
+    def test_ymyl_with_disclaimer(self):
+        req = ComplianceRequest(content="건강 정보입니다.\n\n면책: 전문가 상담을 권장합니다.", language="ko", category="건강")
+        res = self.evaluator.evaluate(req)
+        self.assertEqual(res.status, "PASS")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import copy
+from app.eval.cache import ComplianceCache
+from app.eval.compliance import ComplianceEvaluator, DEFAULT_CONFIG
+from app.schemas import ComplianceRequest
+
+class TestComplianceCache(unittest.TestCase):
+    def setUp(self):
+        self.db_path = "test_compliance_cache.db"
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_hit_and_miss_counters(self):
+        evaluator = ComplianceEvaluator(cache=ComplianceCache(max_entries=2))
+        req = ComplianceRequest(content="이 약은 무조건 완치 보장합니다.", language="ko")
+        first = evaluator.evaluate(req)
+        second = evaluator.evaluate(req)
+        self.assertEqual(first, second)
+        self.assertEqual(evaluator.cache.stats()["hits"], 1)
+        self.assertEqual(evaluator.cache.stats()["misses"], 1)
+
+        # Any field in the key changes the entry
+        evaluator.evaluate(ComplianceRequest(content=req.content, language="ko", is_sponsored=True))
+        self.assertEqual(evaluator.cache.stats()["misses"], 2)
+
+    def test_lru_eviction(self):
+        cache = ComplianceCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, {"status": "PASS"})
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), {"status": "PASS"})
+
+    def test_config_change_invalidates_persisted_entries(self):
+        req = ComplianceRequest(content="이 제품은 최고입니다.", language="ko")
+        evaluator = ComplianceEvaluator(cache=ComplianceCache(db_path=self.db_path))
+        self.assertEqual(evaluator.evaluate(req).status, "PASS")
+
+        # Same rules after a restart: served from SQLite
+        restarted = ComplianceEvaluator(cache=ComplianceCache(db_path=self.db_path))
+        restarted.evaluate(req)
+        self.assertEqual(restarted.cache.stats()["hits"], 1)
+
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config["compliance"]["banned_claims"]["ko"].append("최고")
+        changed = ComplianceEvaluator(config, cache=ComplianceCache(db_path=self.db_path))
+        self.assertEqual(changed.evaluate(req).status, "REJECT")
+        self.assertEqual(changed.cache.stats()["hits"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
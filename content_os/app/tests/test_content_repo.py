@@ -0,0 +1,64 @@
+import unittest
+import os
+import json
+import sqlite3
+from app.storage.repo import ContentRepo, paragraph_hash
+from app.storage.models import ContentEntry
+
+class TestContentRepo(unittest.TestCase):
+    def setUp(self):
+        self.db_path = "test_content_repo.db"
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def _repo(self):
+        repo = ContentRepo(self.db_path, use_index=False)
+        self.addCleanup(repo.close)
+        return repo
+
+    def test_paragraph_rows_and_projections(self):
+        repo = self._repo()
+        first = repo.add_content(ContentEntry(content="A\n\nB", paragraphs=["Alpha one", "Beta two words"], metadata={"k": 1}))
+        repo.add_many([ContentEntry(content="C", paragraphs=["Gamma"]) for _ in range(3)])
+
+        self.assertEqual(repo.get_all_paragraphs(), ["Alpha one", "Beta two words", "Gamma", "Gamma", "Gamma"])
+        self.assertEqual(repo.get_paragraphs(first), ["Alpha one", "Beta two words"])
+        rows = list(repo.iter_paragraphs(("content_id", "words", "hash"), batch_size=2))
+        self.assertEqual(rows[1], (first, 3, paragraph_hash("beta  TWO words")))
+        self.assertEqual(len(rows), 5)
+        with self.assertRaises(ValueError):
+            list(repo.iter_paragraphs(("text; DROP TABLE paragraphs",)))
+
+        light = list(repo.iter_entries(("id", "metadata")))
+        self.assertEqual(light[0], {"id": first, "metadata": {"k": 1}})
+        self.assertNotIn("content", light[0])
+        entries = repo.get_all_entries()
+        self.assertEqual(entries[0].paragraphs, ["Alpha one", "Beta two words"])
+        self.assertEqual(entries[0].content, "A\n\nB")
+
+    def test_legacy_json_paragraphs_backfilled(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE contents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, content TEXT, paragraphs TEXT,
+                metadata TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.execute("INSERT INTO contents (content, paragraphs, metadata) VALUES (?, ?, ?)",
+                     ("x", json.dumps(["첫 문단", "둘째 문단"]), json.dumps({})))
+        conn.commit()
+        conn.close()
+
+        repo = self._repo()
+        self.assertEqual(repo.get_all_paragraphs(), ["첫 문단", "둘째 문단"])
+        self.assertEqual(repo.count(), 1)
+        # The legacy column is left intact for old readers
+        with repo.db.connection() as conn:
+            blob = conn.execute("SELECT paragraphs FROM contents WHERE id = 1").fetchone()[0]
+        self.assertEqual(json.loads(blob), ["첫 문단", "둘째 문단"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import os
+import threading
+from app.storage.db import Database, get_database
+from app.storage.migrations import migrate, schema_version
+
+class TestDatabasePool(unittest.TestCase):
+    def setUp(self):
+        self.db_path = "test_db_pool.db"
+
+    def tearDown(self):
+        get_database(self.db_path).close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def test_connections_are_reused_with_pragmas(self):
+        db = get_database(self.db_path)
+        for _ in range(20):
+            with db.connection() as conn:
+                self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertEqual(db.stats()["opened"], 1)
+        self.assertIs(get_database(self.db_path), db)
+
+    def test_rollback_and_threads(self):
+        db = get_database(self.db_path, max_connections=4)
+        with db.connection() as conn:
+            conn.execute("CREATE TABLE t (n INTEGER)")
+        with self.assertRaises(RuntimeError):
+            with db.connection() as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                raise RuntimeError("boom")
+
+        def work():
+            for i in range(50):
+                with db.connection() as conn:
+                    conn.execute("INSERT INTO t VALUES (?)", (i,))
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with db.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 400)
+        self.assertLessEqual(db.stats()["opened"], 4)
+
+    def test_replaced_file_gets_fresh_pool(self):
+        db = get_database(self.db_path)
+        with db.connection() as conn:
+            conn.execute("CREATE TABLE old (n INTEGER)")
+        db.close()
+        os.remove(self.db_path)
+        fresh = get_database(self.db_path)
+        self.assertIsNot(fresh, db)
+        with fresh.connection() as conn:
+            tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master")]
+        self.assertEqual(tables, [])
+
+    def test_migrations_run_once(self):
+        db = Database(":memory:")
+        steps = [["CREATE TABLE a (n INTEGER)"], ["CREATE TABLE b (n INTEGER)"]]
+        with db.connection() as conn:
+            self.assertEqual(migrate(conn, "demo", steps[:1]), 1)
+            self.assertEqual(migrate(conn, "demo", steps), 2)
+            self.assertEqual(migrate(conn, "demo", steps), 2)
+            self.assertEqual(schema_version(conn, "demo"), 2)
+
+    def test_failed_step_rolls_back_its_ddl(self):
+        def backfill(conn):
+            raise RuntimeError("backfill failed")
+
+        steps = [["CREATE TABLE t (a INTEGER)"], ["ALTER TABLE t ADD COLUMN b TEXT", backfill]]
+        db = get_database(self.db_path)
+        with db.connection() as conn:
+            with self.assertRaises(RuntimeError):
+                migrate(conn, "demo", steps)
+        with db.connection() as conn:
+            self.assertEqual(schema_version(conn, "demo"), 0)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 't'").fetchone()[0], 0)
+            # The retry does not trip over a half-applied column
+            steps[1][1] = lambda conn: conn.execute("UPDATE t SET b = 'x'")
+            self.assertEqual(migrate(conn, "demo", steps), 2)
+            self.assertEqual([r[1] for r in conn.execute("PRAGMA table_info(t)")], ["a", "b"])
+
+    def test_concurrent_startups_apply_each_step_once(self):
+        steps = [["CREATE TABLE t (a INTEGER)"], ["ALTER TABLE t ADD COLUMN b TEXT"]]
+        with get_database(self.db_path).connection() as conn:
+            migrate(conn, "demo", steps[:1])
+        # Separate pools stand in for separate worker processes
+        pools = [Database(self.db_path) for _ in range(4)]
+        barrier = threading.Barrier(len(pools))
+        errors = []
+
+        def start(db):
+            barrier.wait()
+            try:
+                with db.connection() as conn:
+                    migrate(conn, "demo", steps)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=start, args=(db,)) for db in pools]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for db in pools:
+            db.close()
+        self.assertEqual(errors, [])
+
+if __name__ == "__main__":
+    unittest.main()
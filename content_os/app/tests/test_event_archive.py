@@ -0,0 +1,80 @@
+import unittest
+import os
+import shutil
+from datetime import datetime
+from app.track.event_collector import EventCollector
+from app.track.metrics import MetricsAggregator
+from app.track.archive import pq
+
+def make_event(event_type: str, timestamp: str, content_id: str = "p1"):
+    return {"event_type": event_type, "channel": "naver", "content_id": content_id,
+            "sku": "s1", "intent": "info", "metadata": {"ref": "test"}, "timestamp": timestamp}
+
+@unittest.skipIf(pq is None, "pyarrow not installed")
+class TestEventArchive(unittest.TestCase):
+    def setUp(self):
+        self.db_path = "test_event_archive.db"
+        self.collector = EventCollector(self.db_path)
+        self.collector.collect_many([
+            make_event("page_view", "2024-01-01 10:00:00"),
+            make_event("cta_click", "2024-01-01 11:00:00"),
+            make_event("page_view", "2024-01-02 09:00:00", content_id="p2"),
+            make_event("page_view", "2024-03-01 09:00:00"),
+        ])
+        self.now = datetime(2024, 3, 2)
+
+    def tearDown(self):
+        self.collector.close()
+        for path in (self.db_path, self.db_path + "-wal", self.db_path + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(self.collector.archive.archive_dir, ignore_errors=True)
+
+    def _hot_count(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_archive_moves_old_days(self):
+        stats = self.collector.archive_older_than(30, now=self.now)
+        self.assertEqual(stats["days"], ["2024-01-01", "2024-01-02"])
+        self.assertEqual(stats["archived"], 3)
+        self.assertEqual(stats["deleted"], 3)
+        self.assertEqual(self._hot_count(), 1)
+        self.assertEqual(self.collector.archive.days(), ["2024-01-01", "2024-01-02"])
+
+    def test_queries_span_hot_and_cold(self):
+        self.collector.archive_older_than(30, now=self.now)
+        events = self.collector.get_events({"content_id": "p1"})
+        self.assertEqual([e["timestamp"][:10] for e in events], ["2024-01-01", "2024-01-01", "2024-03-01"])
+        self.assertEqual(events[0]["metadata"], '{"ref": "test"}')
+        summary = {s["content_id"]: s for s in MetricsAggregator(self.db_path).get_summary_by_content()}
+        self.assertEqual(summary["p1"]["views"], 2)
+        self.assertEqual(summary["p1"]["clicks"], 1)
+        # Rebuilt rollups still count archived events
+        self.collector.rebuild_rollups()
+        summary = {s["content_id"]: s for s in MetricsAggregator(self.db_path).get_summary_by_content()}
+        self.assertEqual(summary["p2"]["views"], 1)
+
+    def test_rearchive_is_idempotent(self):
+        rows = self.collector.get_events({"content_id": "p2"})
+        self.assertEqual(self.collector.archive.write_day("2024-01-02", rows), 1)
+        # Crash between write and delete: the retention job runs again
+        stats = self.collector.archive_older_than(30, now=self.now)
+        self.assertEqual(stats["archived"], 2)
+        self.assertEqual(len(self.collector.get_events()), 4)
+
+    def test_rebuild_in_crash_window_counts_once(self):
+        rows = self.collector.get_events({"content_id": "p2"})
+        self.collector.archive.write_day("2024-01-02", rows)
+        # The day is archived but its rows are still hot
+        self.collector.rebuild_rollups()
+        summary = {s["content_id"]: s for s in MetricsAggregator(self.db_path).get_summary_by_content()}
+        self.assertEqual(summary["p2"]["views"], 1)
+        self.assertEqual(summary["p1"]["views"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import os
+import asyncio
+from app.track.event_collector import EventCollector
+from app.track.buffer import EventBuffer, BufferFullError
+
+def make_event(i: int):
+    return {"event_type": "page_view", "channel": "naver", "content_id": f"p{i % 3}", "sku": "s1", "intent": "info"}
+
+class SlowCollector(EventCollector):
+    def collect_many(self, events):
+        import time
+        time.sleep(0.2)
+        return super().collect_many(events)
+
+class TestEventBuffer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.db_path = "test_event_buffer.db"
+        self.collector = EventCollector(self.db_path)
+
+    def tearDown(self):
+        self.collector.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    async def test_batches_and_flush_on_stop(self):
+        buffer = EventBuffer(self.collector, max_batch=50, flush_interval_ms=10000)
+        await buffer.start()
+        accepted = await buffer.put_many([make_event(i) for i in range(120)])
+        self.assertEqual(accepted, 120)
+        await buffer.stop()
+        self.assertEqual(len(self.collector.get_events()), 120)
+        self.assertEqual(buffer.stats()["written"], 120)
+
+    async def test_flush_makes_events_visible(self):
+        buffer = EventBuffer(self.collector, flush_interval_ms=10000)
+        await buffer.start()
+        await buffer.put(make_event(1))
+        self.assertEqual(len(self.collector.get_events()), 0)
+        await buffer.flush()
+        self.assertEqual(len(self.collector.get_events()), 1)
+        await buffer.stop()
+
+    async def test_drop_policy(self):
+        buffer = EventBuffer(self.collector, max_queue=5, max_batch=100, flush_interval_ms=10000, overflow="drop")
+        await buffer.start()
+        accepted = await buffer.put_many([make_event(i) for i in range(8)])
+        self.assertEqual(accepted, 5)
+        self.assertEqual(buffer.stats()["dropped"], 3)
+        await buffer.stop()
+
+    async def test_block_policy_times_out(self):
+        buffer = EventBuffer(SlowCollector(self.db_path), max_queue=2, max_batch=100,
+                             flush_interval_ms=10000, put_timeout=0.05)
+        await buffer.start()
+        await buffer.put_many([make_event(1), make_event(2)])
+        with self.assertRaises(BufferFullError):
+            await buffer.put(make_event(3))
+        await buffer.stop()
+
+    async def test_block_policy_rejects_whole_batch(self):
+        buffer = EventBuffer(self.collector, max_queue=3, max_batch=100,
+                             flush_interval_ms=10000, put_timeout=0.05)
+        await buffer.start()
+        await buffer.put_many([make_event(1), make_event(2)])
+        # Two more do not fit: nothing of the batch is queued
+        with self.assertRaises(BufferFullError):
+            await buffer.put_many([make_event(3), make_event(4)])
+        self.assertEqual(buffer.stats()["pending"], 2)
+        with self.assertRaises(BufferFullError):
+            await buffer.put_many([make_event(i) for i in range(4)])
+        # Room made by a flush is used by a waiting batch
+        waiting = asyncio.create_task(buffer.put_many([make_event(5), make_event(6)]))
+        await asyncio.sleep(0)
+        await buffer.flush()
+        self.assertEqual(await waiting, 2)
+        await buffer.stop()
+        self.assertEqual(len(self.collector.get_events()), 4)
+
+    async def test_unstarted_buffer_writes_through(self):
+        buffer = EventBuffer(self.collector)
+        await buffer.put(make_event(1))
+        self.assertEqual(len(self.collector.get_events()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
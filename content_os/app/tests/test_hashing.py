@@ -0,0 +1,47 @@
+import unittest
+import os
+import shutil
+import hashlib
+from app.pipeline.hashing import HashCache, file_digest
+
+class TestHashing(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_hashing_root"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.path = os.path.join(self.test_dir, "big.jpg")
+        self.data = os.urandom(3 * (1 << 20) + 123)
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+        self.cache = HashCache(os.path.join(self.test_dir, "hashes.db"), algorithm="md5")
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_streamed_digest_matches_full_read(self):
+        self.assertEqual(file_digest(self.path, "md5", buffer_size=4096), hashlib.md5(self.data).hexdigest())
+        self.assertEqual(len(file_digest(self.path)), 32)
+
+    def test_cache_skips_unchanged_files(self):
+        first = self.cache.digest(self.path)
+        self.assertEqual(self.cache.digest(self.path), first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        # A reopened cache still knows the file
+        reopened = HashCache(os.path.join(self.test_dir, "hashes.db"), algorithm="md5")
+        reopened.digest(self.path)
+        self.assertEqual(reopened.hits, 1)
+
+        # Replacing the file (new inode/size) forces a rehash
+        tmp = self.path + ".new"
+        with open(tmp, "wb") as f:
+            f.write(b"replaced")
+        os.replace(tmp, self.path)
+        self.assertEqual(self.cache.digest(self.path), hashlib.md5(b"replaced").hexdigest())
+        self.assertEqual(self.cache.misses, 2)
+
+        os.remove(self.path)
+        self.assertEqual(self.cache.prune(), 1)
+
+if __name__ == "__main__":
+    unittest.main()
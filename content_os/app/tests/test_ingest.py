@@ -0,0 +1,107 @@
+import unittest
+import os
+import json
+import shutil
+from unittest import mock
+from app.storage.repo import ContentRepo
+from app.storage.ingest import BulkIngester, iter_documents, html_to_text
+
+WXR = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:wp="http://wordpress.org/export/1.2/">
+<channel>
+<item><title>Post A</title><wp:post_id>11</wp:post_id><wp:post_type>post</wp:post_type>
+<content:encoded><![CDATA[<p>워드프레스 첫 문단입니다.</p><p>두 번째 문단입니다.</p>]]></content:encoded></item>
+<item><title>Draft</title><wp:post_id>13</wp:post_id><wp:post_type>post</wp:post_type><wp:status>draft</wp:status>
+<content:encoded><![CDATA[<p>아직 공개되지 않은 초안입니다.</p>]]></content:encoded></item>
+<item><title>Attachment</title><wp:post_id>12</wp:post_id><wp:post_type>attachment</wp:post_type>
+<content:encoded><![CDATA[<p>ignored</p>]]></content:encoded></item>
+</channel>
+</rss>
+"""
+
+class TestBulkIngest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_ingest_root"
+        self.src = os.path.join(self.test_dir, "src")
+        os.makedirs(self.src, exist_ok=True)
+        self.db_path = os.path.join(self.test_dir, "blogs.db")
+        self.checkpoint = os.path.join(self.test_dir, "blogs.ingest.json")
+        for i in range(5):
+            with open(os.path.join(self.src, f"post{i}.md"), "w", encoding="utf-8") as f:
+                f.write(f"# 제목 {i}\n\n본문 문단 {i} 입니다.\n\n가격: 10000원")
+        # Same body as post0 with different whitespace
+        with open(os.path.join(self.src, "post0_copy.md"), "w", encoding="utf-8") as f:
+            f.write("# 제목 0\n\n본문  문단 0 입니다.\n\n가격: 10000원")
+        with open(os.path.join(self.src, "page.html"), "w", encoding="utf-8") as f:
+            f.write("<html><body><h2>HTML 제목</h2><p>HTML 첫 문단</p><p>HTML 둘째 문단</p></body></html>")
+        with open(os.path.join(self.src, "export.xml"), "w", encoding="utf-8") as f:
+            f.write(WXR)
+        self.config = {"similarity": {"ignore_sections": ["가격"]}}
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _ingester(self, repo, batch_size=3):
+        return BulkIngester(repo, self.config, workers=0, batch_size=batch_size, checkpoint_path=self.checkpoint)
+
+    def test_formats(self):
+        docs = list(iter_documents(self.src))
+        self.assertEqual(len(docs), 8)
+        wxr = [d for d in docs if "#" in d[0]]
+        self.assertEqual(len(wxr), 1)
+        self.assertEqual(wxr[0][3]["title"], "Post A")
+        # Drafts are left out unless their status is allowed
+        drafts = [d for d in iter_documents(self.src, ("publish", "draft")) if "#" in d[0]]
+        self.assertEqual([d[3]["title"] for d in drafts], ["Post A", "Draft"])
+        self.assertIn("\n\n", html_to_text("<p>a</p><p>b</p>"))
+
+    def test_index_is_compacted_once(self):
+        repo = ContentRepo(self.db_path)
+        self.addCleanup(repo.close)
+        repo.index.compact_threshold = 1
+        with mock.patch.object(repo.index, "compact", wraps=repo.index.compact) as compact:
+            self._ingester(repo, batch_size=1).run(self.src)
+        self.assertEqual(compact.call_count, 1)
+        self.assertEqual(repo.index.compact_threshold, 1)
+
+    def test_ingest_dedupes_and_resumes(self):
+        repo = ContentRepo(self.db_path)
+        self.addCleanup(repo.close)
+        report = self._ingester(repo).run(self.src)
+        self.assertEqual(report["consumed"], 8)
+        self.assertEqual(report["duplicates"], 1)
+        self.assertEqual(repo.count(), 7)
+        self.assertIn("HTML 첫 문단", repo.get_all_paragraphs())
+        self.assertNotIn("가격: 10000원", repo.get_all_paragraphs())
+        self.assertEqual(len(repo.index), len(repo.get_all_paragraphs()))
+
+        # A finished run resumes past everything; a new file is picked up
+        with open(os.path.join(self.src, "zz_new.md"), "w", encoding="utf-8") as f:
+            f.write("새로 추가된 글입니다.")
+        report = self._ingester(repo).run(self.src)
+        self.assertEqual(report["processed_this_run"], 1)
+        self.assertEqual(repo.count(), 8)
+
+        # A file sorting before consumed ones is picked up too, and nothing else is re-read
+        with open(os.path.join(self.src, "aa_new.md"), "w", encoding="utf-8") as f:
+            f.write("앞쪽에 추가된 글입니다.")
+        report = self._ingester(repo).run(self.src)
+        self.assertEqual(report["processed_this_run"], 1)
+        self.assertEqual(repo.count(), 9)
+
+        # Without the checkpoint everything is seen again but deduplicated
+        os.remove(self.checkpoint)
+        report = self._ingester(repo).run(self.src)
+        self.assertEqual(report["processed_this_run"], 10)
+        self.assertEqual(report["ingested"], 0)
+        self.assertEqual(repo.count(), 9)
+
+    def test_pool_workers(self):
+        repo = ContentRepo(self.db_path, use_index=False)
+        self.addCleanup(repo.close)
+        report = BulkIngester(repo, self.config, workers=2, batch_size=4).run(self.src)
+        self.assertEqual(report["ingested"], 7)
+
+if __name__ == "__main__":
+    unittest.main()
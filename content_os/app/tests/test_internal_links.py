@@ -1,5 +1,7 @@
 import unittest
-from app.seo.cluster import TopicClusterer
+import os
+import random
+from app.seo.cluster import TopicClusterer, save_clusters, load_clusters
 from app.seo.internal_links import InternalLinkRecommender
 
 class TestInternalLinks(unittest.TestCase):
@@ -32,5 +34,51 @@ class TestInternalLinks(unittest.TestCase):
         for r in rec['recommendations']:
             self.assertTrue(any(phrase in r['anchor'] for phrase in ["보기", "확인하기", "가이드", "활용법", "좋은"]))
 
+    def test_topic_clusters_and_pillars(self):
+        rng = random.Random(0)
+        topics = {
+            "phone": ["아이폰", "갤럭시", "스마트폰", "카메라", "배터리", "충전"],
+            "laptop": ["맥북", "노트북", "키보드", "디스플레이", "램", "SSD"],
+            "audio": ["에어팟", "이어폰", "헤드폰", "노이즈", "음질", "블루투스"]
+        }
+        posts = []
+        for topic, words in topics.items():
+            for i in range(10):
+                posts.append({"id": len(posts) + 1, "slug": f"{topic}-{i}",
+                              "title": " ".join(rng.sample(words, 3)), "keywords": rng.sample(words, 2)})
+        # A lone off-topic post must not form its own cluster
+        posts.append({"id": 99, "slug": "misc", "title": "여행 캐리어 추천", "keywords": ["여행"]})
+
+        clusterer = TopicClusterer(min_cluster_size=4, n_clusters=4)
+        clusterer.cluster_posts(posts)
+        result = clusterer.assign_clusters(posts)
+        self.assertEqual(len(result["clusters"]), 3)
+        for cluster in result["clusters"]:
+            self.assertGreaterEqual(cluster["size"], 4)
+            topic = cluster["pillar_slug"].split("-")[0]
+            members = [p for p in posts if p["id"] in cluster["members"] and p["id"] != 99]
+            self.assertTrue(all(p["slug"].startswith(topic) for p in members))
+        self.assertEqual(sum(p["is_pillar"] for p in posts), 3)
+
+        path = "test_topic_clusters.json"
+        try:
+            save_clusters(result, path)
+            recommender = InternalLinkRecommender({"internal_links": {"max_links_per_post": 2, "clusters_path": path}})
+        finally:
+            os.remove(path)
+        post = next(p for p in posts if not p["is_pillar"] and p["id"] != 99)
+        pillar = result["clusters"][post["cluster_id"]]
+        rec = recommender.recommend_links(post)
+        self.assertEqual(rec["recommendations"][0]["slug"], pillar["pillar_slug"])
+        self.assertIsNone(load_clusters(path))
+
+    def test_default_cluster_count_is_capped(self):
+        posts = [{"id": i, "slug": f"p-{i}", "title": f"주제{i % 40} 글 {i}", "keywords": [f"주제{i % 40}"]}
+                 for i in range(400)]
+        # sqrt(400 / 2) = 14 clusters by default, at most max_clusters
+        result = TopicClusterer(min_cluster_size=2, max_clusters=5).assign_clusters(posts)
+        self.assertLessEqual(len(result["clusters"]), 5)
+        self.assertEqual(sum(c["size"] for c in result["clusters"]), 400)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import os
+import shutil
+import subprocess
+from unittest import mock
+from app.pipeline import keyframes
+from app.pipeline.keyframes import extract_keyframes
+
+class FakeFFmpeg:
+    """
+    Stands in for subprocess.run: ffprobe reports `duration`, ffmpeg writes
+    `frames` files per call unless its mode is listed in `fail`. Scene frames
+    are logged as showinfo lines, `duration / frames` seconds apart.
+    """
+    def __init__(self, duration=60.0, frames=3, fail=()):
+        self.duration = duration
+        self.frames = frames
+        self.fail = set(fail)
+        self.calls = []
+        self.commands = []
+
+    def mode(self, cmd):
+        if "-skip_frame" in cmd:
+            return "iframe"
+        if "-ss" in cmd:
+            return "seek"
+        return "scene"
+
+    def __call__(self, cmd, **kwargs):
+        if cmd[0] == "ffprobe":
+            self.calls.append("probe")
+            return subprocess.CompletedProcess(cmd, 0, stdout=f"{self.duration}\n")
+        mode = self.mode(cmd)
+        self.calls.append(mode)
+        if mode in self.fail:
+            raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+        outputs = [c for c in cmd if c.endswith(".jpg")]
+        if mode == "seek":
+            paths = outputs
+        else:
+            paths = [outputs[0] % (i + 1) for i in range(self.frames)]
+        for path in paths:
+            with open(path, "wb") as f:
+                f.write(f"{mode}:{path}".encode("utf-8"))
+        self.commands.append(cmd)
+        stderr = "".join(f"[Parsed_showinfo_1] n:{i} pts_time:{i * self.duration / self.frames:.3f}\n"
+                         for i in range(len(paths))) if mode == "scene" else ""
+        return subprocess.CompletedProcess(cmd, 0, stderr=stderr.encode("utf-8"))
+
+class TestKeyframes(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_keyframes_root"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.video = os.path.join(self.test_dir, "video.mp4")
+        with open(self.video, "wb") as f:
+            f.write(b"not really a video")
+        self.out = os.path.join(self.test_dir, "frames")
+        self.cache = os.path.join(self.test_dir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def run_with(self, fake, **kwargs):
+        with mock.patch.object(keyframes.subprocess, "run", fake):
+            return extract_keyframes(self.video, self.out, **kwargs)
+
+    def test_scene_mode_spreads_picks_over_the_video(self):
+        fake = FakeFFmpeg(duration=70.0, frames=6)
+        frames = self.run_with(fake, max_frames=6)
+        self.assertEqual(fake.calls, ["probe", "scene"])
+        self.assertEqual(len(frames), 6)
+
+        cmd = keyframes._scene_cmd(self.video, "f_%03d.jpg", 6, 640, 2, 0.4, min_gap=10.0)
+        vf = cmd[cmd.index("-vf") + 1]
+        self.assertIn("gt(scene\\,0.4)", vf)
+        self.assertIn("gte(t-prev_selected_t\\,10.000)", vf)
+        self.assertIn("min(640,iw)", vf)
+        self.assertEqual(cmd[cmd.index("-threads") + 1], "2")
+        self.assertEqual(cmd.count("-i"), 1)
+
+    def test_low_motion_videos_are_topped_up_by_seeking(self):
+        # Only the first frame passes the scene filter
+        fake = FakeFFmpeg(duration=60.0, frames=1)
+        frames = self.run_with(fake, max_frames=6)
+        self.assertEqual(fake.calls, ["probe", "scene", "seek"])
+        self.assertEqual(len(frames), 6)
+        self.assertEqual([open(f).read().split(":")[0] for f in frames], ["scene"] + ["seek"] * 5)
+        cmd = fake.commands[-1]
+        seeks = [float(cmd[i + 1]) for i, c in enumerate(cmd) if c == "-ss"]
+        # The slot nearest the frame already taken at 0s is skipped
+        self.assertEqual(seeks, [15.0, 25.0, 35.0, 45.0, 55.0])
+
+    def test_long_videos_are_sampled_by_seeking(self):
+        fake = FakeFFmpeg(duration=3600.0)
+        frames = self.run_with(fake, max_frames=4)
+        self.assertEqual(fake.calls, ["probe", "seek"])
+        self.assertEqual(len(frames), 4)
+
+        cmd = keyframes._seek_cmd(self.video, self.out, [450.0, 1350.0], 1280, 0)
+        # -ss before each -i is an input seek
+        self.assertEqual(cmd[cmd.index("-ss") + 1], "450.000")
+        self.assertEqual(cmd.count("-frames:v"), 2)
+
+    def test_failures_fall_back_to_the_next_mode(self):
+        fake = FakeFFmpeg(fail=("scene", "seek"))
+        frames = self.run_with(fake, max_frames=6, timeout=5)
+        self.assertEqual(fake.calls, ["probe", "scene", "seek", "iframe"])
+        self.assertEqual(len(frames), 3)
+
+        self.assertEqual(self.run_with(FakeFFmpeg(fail=("scene", "seek", "iframe"))), [])
+
+    def test_frames_are_cached_per_video(self):
+        fake = FakeFFmpeg(frames=6)
+        first = self.run_with(fake, cache_dir=self.cache)
+        shutil.rmtree(self.out)
+        again = self.run_with(fake, cache_dir=self.cache)
+        self.assertEqual(fake.calls, ["probe", "scene"])
+        self.assertEqual([os.path.basename(f) for f in again], [os.path.basename(f) for f in first])
+        self.assertTrue(all(os.path.exists(f) for f in again))
+
+        # A changed video is decoded again
+        with open(self.video, "ab") as f:
+            f.write(b"edited")
+        self.run_with(fake, cache_dir=self.cache)
+        self.assertEqual(fake.calls, ["probe", "scene", "probe", "scene"])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            extract_keyframes(self.video, self.out, mode="fastest")
+
+if __name__ == '__main__':
+    unittest.main()
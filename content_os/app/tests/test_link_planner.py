@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from app.seo.link_planner import LinkPlanner
+from app.seo.neighbors import NeighborIndex
+from app.seo.internal_links import InternalLinkRecommender
+
+def star_graph(n, k=3):
+    """
+    Every post's best neighbour is post 0 (a popular post), then a few others.
+    """
+    ids = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    for i in range(n):
+        others = [j for j in [0, (i + 1) % n, (i + 2) % n] if j != i][:k]
+        ids[i, :len(others)] = others
+        scores[i, :len(others)] = [0.9, 0.3, 0.2][:len(others)]
+    return ids, scores
+
+class TestLinkPlanner(unittest.TestCase):
+    def setUp(self):
+        self.config = {"internal_links": {"max_links_per_post": 2, "max_inbound_per_post": 5, "min_inbound_per_post": 1}}
+        self.planner = LinkPlanner(self.config)
+
+    def test_caps_and_orphans(self):
+        ids, scores = star_graph(30)
+        plan = self.planner.plan(ids, scores)
+        inbound = np.bincount([t for _, t, _ in plan["links"]], minlength=30)
+        outbound = np.bincount([s for s, _, _ in plan["links"]], minlength=30)
+        self.assertLessEqual(inbound.max(), 5)
+        self.assertLessEqual(outbound.max(), 2)
+        self.assertEqual(plan["orphans"], [])
+        self.assertTrue((inbound >= 1).all())
+
+    def test_deterministic(self):
+        ids, scores = star_graph(30)
+        self.assertEqual(self.planner.plan(ids, scores)["links"], self.planner.plan(ids, scores)["links"])
+
+    def test_pillar_links_respect_inbound_cap(self):
+        ids, scores = star_graph(12)
+        pillars = [3] * 12
+        plan = self.planner.plan(ids, scores, pillars)
+        to_pillar = [s for s, t, _ in plan["links"] if t == 3]
+        self.assertEqual(len(to_pillar), 5)
+        self.assertEqual(plan["stats"]["pillar_links"], 5)
+        # Members most similar to the pillar link to it first
+        self.assertIn(2, to_pillar)
+
+        # Hubs may be allowed more inbound links explicitly
+        config = {"internal_links": {**self.config["internal_links"], "max_pillar_inbound": 20}}
+        plan = LinkPlanner(config).plan(ids, scores, pillars)
+        to_pillar = {s for s, t, _ in plan["links"] if t == 3}
+        self.assertEqual(to_pillar, set(range(12)) - {3})
+
+    def test_incremental_keeps_untouched_links(self):
+        ids, scores = star_graph(40)
+        first = self.planner.plan(ids, scores)
+        again = self.planner.plan(ids, scores, previous=first["links"], changed=[7])
+        untouched = lambda links: {(s, t) for s, t, _ in links if 7 not in (s, t)}
+        self.assertTrue(untouched(first["links"]) <= untouched(again["links"]))
+        self.assertLess(again["stats"]["replanned_posts"], 40)
+        self.assertTrue(any(s == 7 for s, _, _ in again["links"]))
+
+    def test_site_plan_renders_stable_anchors(self):
+        posts = [{"id": i, "slug": f"post-{i}", "title": t} for i, t in enumerate(
+            ["아이폰 리뷰", "아이폰 케이스", "아이폰 충전기", "갤럭시 리뷰", "갤럭시 케이스"])]
+        index = NeighborIndex(k=3).fit([p["title"] for p in posts])
+        recommender = InternalLinkRecommender(self.config)
+        first = recommender.plan_site(posts, index.ids, index.scores)
+        second = recommender.plan_site(posts, index.ids, index.scores)
+        self.assertEqual(first["results"], second["results"])
+        for result in first["results"]:
+            self.assertLessEqual(len(result["recommendations"]), 2)
+
+if __name__ == "__main__":
+    unittest.main()
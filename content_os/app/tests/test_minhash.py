@@ -0,0 +1,54 @@
+import unittest
+import os
+import shutil
+import numpy as np
+from app.eval.minhash import MinHasher, LSHIndex
+from app.storage.paragraph_index import ParagraphIndex
+
+class TestMinHash(unittest.TestCase):
+    def setUp(self):
+        self.hasher = MinHasher()
+        self.base = "무선 청소기를 3주 동안 사용해 보니 흡입력은 충분했고 배터리는 약 40분 정도 유지되었습니다."
+
+    def test_korean_near_duplicate_signatures(self):
+        edited = self.base.replace("40분", "45분")
+        unrelated = "오늘은 주방에서 쓰기 좋은 스테인리스 냄비 세트를 소개합니다."
+        sigs = self.hasher.signatures([self.base, edited, unrelated])
+        self.assertGreater((sigs[0] == sigs[1]).mean(), 0.7)
+        self.assertLess((sigs[0] == sigs[2]).mean(), 0.2)
+
+    def test_lsh_candidates(self):
+        texts = [self.base, "전혀 다른 내용의 문단입니다. 캠핑 의자 후기.", "Completely different English paragraph."]
+        lsh = LSHIndex(bands=32, rows=4).build(self.hasher.signatures(texts))
+        keys = lsh.band_keys(self.hasher.signatures([self.base.replace("충분했고", "좋았고")]))[0]
+        self.assertEqual(list(lsh.query(keys)), [0])
+
+class TestLSHPrefilter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_lsh_root"
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_prefilter_matches_full_search(self):
+        index = ParagraphIndex(self.test_dir, n_features=2 ** 16, compact_threshold=3)
+        paras = [
+            "This is a very specific sentence about a product that should be unique.",
+            "배터리 수명은 약 40분 정도이며 충전은 3시간이 걸립니다.",
+            "Shipping takes about three days within the country.",
+            "A tail paragraph appended after compaction about kitchen knives."
+        ]
+        for i, p in enumerate(paras):
+            index.add(i, [p])
+        self.assertEqual(index.meta["base_rows"], 3)
+
+        queries = [paras[0], paras[3], "Nothing in common here at all, zebra."]
+        full = index.search(queries, k=1)
+        lsh = index.search(queries, k=1, prefilter="lsh")
+        self.assertEqual([h[0][0] for h in lsh[:2]], [h[0][0] for h in full[:2]])
+        self.assertEqual(lsh[2], [])
+        self.assertTrue(np.isclose(lsh[0][0][1], 1.0))
+
+if __name__ == "__main__":
+    unittest.main()
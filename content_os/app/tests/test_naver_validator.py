@@ -1,5 +1,5 @@
 import unittest
-from app.seo.naver_validator import NaverValidator
+from app.seo.naver_validator import NaverValidator, tokenize
 
 class TestNaverValidator(unittest.TestCase):
     def setUp(self):
@@ -39,5 +39,40 @@ class TestNaverValidator(unittest.TestCase):
         report = self.validator.validate_naver_blog_content(content)
         self.assertTrue(report["valid"])
 
+    def test_josa_variants_count_as_one_term(self):
+        body = "아이폰이 좋다. 아이폰은 빠르다. 아이폰을 샀다. 아이폰의 화면. 아이폰으로 찍었다."
+        stuffing = self.validator.detect_stuffing(body)
+        self.assertEqual(stuffing["terms"][0]["term"], "아이폰")
+        self.assertEqual(stuffing["terms"][0]["count"], 5)
+
+    def test_bare_and_particle_forms_of_nouns_ending_in_josa(self):
+        self.assertEqual(tokenize("고양이 고양이가 고양이를 고양이는 고양이"), ["고양이"] * 5)
+        self.assertEqual(tokenize("어린이 어린이를 어린 아이"), ["어린이", "어린이", "어린", "아이"])
+        # Nothing else in the document supports a split
+        self.assertEqual(tokenize("고속도로 고양이"), ["고속도로", "고양이"])
+        stuffing = NaverValidator().detect_stuffing("고양이 고양이가 고양이를 고양이의 고양이")
+        self.assertEqual([(t["term"], t["count"]) for t in stuffing["terms"]], [("고양이", 5)])
+
+    def test_density_scales_with_length(self):
+        # 20 mentions would break a fixed threshold, but not in a long post
+        filler = " ".join(f"문장{i} 내용{i} 설명{i} 사례{i}" for i in range(500))
+        body = filler + " 아이폰" * 20
+        self.assertEqual(self.validator.detect_stuffing(body)["terms"], [])
+
+    def test_repeated_phrases(self):
+        body = " ".join(f"오늘 이야기 {i}번. 최저가 할인 쿠폰 받기" for i in range(6))
+        report = self.validator.validate_naver_blog_content({"body": body, "images": [{"is_unique": True}] * 3,
+                                                            "has_comparison_table": True})
+        self.assertTrue(any(v.startswith("Repeated phrases") and "할인 쿠폰 받기" in v for v in report["violations"]))
+
+    def test_validate_batch(self):
+        posts = [{"body": "애플 " * 17}, {"body": "자연스러운 문장으로 쓴 후기입니다.", "images": [{"is_unique": True}] * 3,
+                                         "has_comparison_table": True}] * 50
+        report = self.validator.validate_batch(posts)
+        self.assertEqual(report["summary"]["posts"], 100)
+        self.assertEqual(report["summary"]["stuffing"], 50)
+        self.assertEqual(report["summary"]["invalid"], 50)
+        self.assertIn("posts_per_sec", report["summary"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import random
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from app.seo.neighbors import NeighborIndex, top_k
+from app.seo.cluster import TopicClusterer
+
+def synthetic_texts(n, seed=0, vocab_size=300):
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(vocab_size)]
+    return [" ".join(rng.choices(vocab, k=12)) for _ in range(n)]
+
+class TestNeighbors(unittest.TestCase):
+    def test_blocked_top_k_matches_dense(self):
+        # A small vocabulary gives nearly dense blocks, a large one sparse blocks
+        for vocab_size in (300, 20000):
+            index = NeighborIndex(k=5, max_cells=64 * 400).fit(synthetic_texts(400, vocab_size=vocab_size))
+            dense = cosine_similarity(index.matrix)
+            np.fill_diagonal(dense, 0)
+            expected = -np.sort(-dense, axis=1)[:, :5]
+            self.assertTrue(np.allclose(index.scores, expected, atol=1e-5))
+            # Never its own neighbour
+            self.assertFalse((index.ids == np.arange(400)[:, None]).any())
+
+    def test_incremental_add_matches_full_rebuild(self):
+        texts = synthetic_texts(400)
+        index = NeighborIndex(k=5, max_cells=64 * 400).fit(texts[:300])
+        changed = index.add(texts[300:])
+        self.assertTrue(len(changed) > 0)
+        self.assertTrue((changed < 300).all())
+
+        # Same vocabulary, all at once
+        ids, scores = top_k(index.matrix, index.matrix, 5, max_cells=64 * 400, self_offset=0)
+        self.assertTrue(np.array_equal(ids, index.ids))
+        self.assertTrue(np.allclose(scores, index.scores))
+
+    def test_save_and_load(self):
+        path = "test_neighbors_index.npz"
+        try:
+            index = NeighborIndex(k=3).fit(synthetic_texts(50))
+            index.save(path)
+            loaded = NeighborIndex.load(path)
+            self.assertTrue(np.array_equal(loaded.ids, index.ids))
+            loaded.add(synthetic_texts(5, seed=1))
+            self.assertEqual(len(loaded), 55)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_clusterer_incremental_mode(self):
+        posts = [{"id": i, "slug": f"post-{i}", "title": text} for i, text in enumerate(synthetic_texts(60))]
+        clusterer = TopicClusterer(neighbors=4)
+        clusterer.cluster_posts(posts[:50])
+        updated = clusterer.add_posts(posts[50:])
+        self.assertTrue({p["id"] for p in posts[50:]} <= {p["id"] for p in updated})
+        for post in posts:
+            self.assertEqual(len(post["cluster_neighbors"]), 4)
+            self.assertNotIn(post["id"], [n["id"] for n in post["cluster_neighbors"]])
+
+if __name__ == "__main__":
+    unittest.main()
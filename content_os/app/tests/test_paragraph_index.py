@@ -0,0 +1,68 @@
+import unittest
+import os
+import shutil
+from unittest import mock
+from app.storage.paragraph_index import ParagraphIndex
+from app.storage.repo import ContentRepo
+from app.storage.models import ContentEntry
+from app.eval.similarity import SimilarityEvaluator
+
+class TestParagraphIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_paraidx_root"
+        os.makedirs(self.test_dir, exist_ok=True)
+        self.db_path = os.path.join(self.test_dir, "blogs.db")
+        self.config = {"similarity": {"thresholds": {"warn": 0.7, "reject": 0.85}}}
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_search_tail_and_compacted(self):
+        index = ParagraphIndex(os.path.join(self.test_dir, "idx"), n_features=2 ** 16, compact_threshold=1000)
+        index.add(1, ["무선 청소기 흡입력 비교 후기", "배터리 수명은 약 40분 정도입니다"])
+        index.add(2, ["This is a very specific sentence about a product."])
+
+        hits = index.search(["This is a very specific sentence about a product."], k=2)[0]
+        self.assertEqual(index.get_row(hits[0][0])["content_id"], 2)
+        self.assertAlmostEqual(hits[0][1], 1.0, places=5)
+
+        index.compact()
+        hits = index.search(["배터리 수명은 약 40분 정도입니다"], k=1)[0]
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(index.get_row(hits[0][0])["text"], "배터리 수명은 약 40분 정도입니다")
+
+    def test_auto_compaction_is_geometric(self):
+        index = ParagraphIndex(os.path.join(self.test_dir, "idx"), n_features=2 ** 12, compact_threshold=4,
+                               compact_ratio=1.0)
+        with mock.patch.object(ParagraphIndex, "compact", autospec=True, side_effect=ParagraphIndex.compact) as compact:
+            for i in range(64):
+                index.add(i, [f"paragraph number {i}"])
+        # Base after each run: 4, 8, 16, 32, 64 rows
+        self.assertEqual(compact.call_count, 5)
+        self.assertEqual(index.meta["base_rows"], 64)
+
+    def test_reopen_is_persistent(self):
+        path = os.path.join(self.test_dir, "idx")
+        ParagraphIndex(path, n_features=2 ** 16).add(7, ["Persisted paragraph about kitchen knives."])
+        reopened = ParagraphIndex(path)
+        self.assertEqual(len(reopened), 1)
+        hits = reopened.search(["Persisted paragraph about kitchen knives."])[0]
+        self.assertEqual(reopened.get_row(hits[0][0])["content_id"], 7)
+
+    def test_repo_and_evaluator_use_index(self):
+        repo = ContentRepo(self.db_path)
+        self.addCleanup(repo.close)
+        evaluator = SimilarityEvaluator(self.config, index=repo.index)
+        text = "This is a very specific sentence about a product that should be unique."
+        repo.add_content(ContentEntry(content=text, paragraphs=evaluator.split_paragraphs(text)))
+
+        res = evaluator.evaluate(text)
+        self.assertEqual(res["status"], "REJECT")
+        self.assertEqual(res["matches"][0]["existing_content_id"], 1)
+
+        res = evaluator.evaluate("Completely different content here.")
+        self.assertEqual(res["status"], "PASS")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import os
+import shutil
+import random
+import numpy as np
+from unittest import mock
+from app.pipeline.phash import MultiIndexHashTable, PerceptualIndex, dhash, phash, hamming, Image
+from app.pipeline.unique_pack import UniquePackGenerator
+
+def make_photo(path: str, seed: int, size=(640, 480), quality=90):
+    """
+    Smooth random blobs: survives resizing and re-encoding like a real photo.
+    """
+    rng = np.random.RandomState(seed)
+    small = rng.randint(0, 255, (6, 8, 3)).astype(np.uint8)
+    img = Image.fromarray(small).resize(size, Image.BICUBIC)
+    img.save(path, quality=quality)
+
+class TestHashTable(unittest.TestCase):
+    def test_multi_index_matches_brute_force(self):
+        rng = random.Random(0)
+        table = MultiIndexHashTable(max_distance=8)
+        stored = [rng.getrandbits(64) for _ in range(5000)]
+        for i, h in enumerate(stored):
+            table.add(h, i)
+        for _ in range(50):
+            base = rng.choice(stored)
+            query = base
+            for bit in rng.sample(range(64), rng.randint(0, 10)):
+                query ^= 1 << bit
+            expected = sorted(i for i, h in enumerate(stored) if hamming(h, query) <= 8)
+            self.assertEqual(sorted(label for _, label in table.query(query)), expected)
+
+    def test_remove_reuses_rows(self):
+        table = MultiIndexHashTable(max_distance=8)
+        first = table.add(0x0F0F, "a")
+        table.add(0xFFFFFFFF00000000, "b")
+        table.remove(first)
+        self.assertEqual([label for _, label in table.query(0x0F0F)], [])
+        self.assertEqual(table.add(0x0F0F, "c"), first)
+        self.assertEqual(len(table), 2)
+        self.assertEqual([label for _, label in table.query(0x0F0F)], ["c"])
+
+    def test_hash_shapes(self):
+        pixels = np.random.RandomState(1).rand(3, 32, 32)
+        self.assertEqual(phash(pixels).shape, (3,))
+        self.assertEqual(dhash(np.random.rand(8, 9)).dtype, np.uint64)
+
+class TestPerceptualIndex(unittest.TestCase):
+    def setUp(self):
+        self.db_path = "test_phash_index.db"
+        self.index = PerceptualIndex(self.db_path)
+
+    def tearDown(self):
+        self.index.close()
+        for path in (self.db_path, self.db_path + "-wal", self.db_path + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_rerecording_a_pack_does_not_reload(self):
+        self.index.replace("P1", [("/a.jpg", 0x0F0F), ("/b.jpg", 0xF0F0F0F0F0F0)])
+        self.index.replace("P2", [("/c.jpg", 0xFFFF0000)])
+        with mock.patch.object(PerceptualIndex, "_load") as load:
+            self.index.replace("P1", [("/d.jpg", 0x0F0F)])
+        load.assert_not_called()
+        self.assertEqual(self.index.find(0x0F0F), [(0, ("P1", "/d.jpg"))])
+        self.assertEqual(self.index.find(0xF0F0F0F0F0F0), [])
+        self.assertEqual(self.index.find(0xFFFF0000), [(0, ("P2", "/c.jpg"))])
+
+    def test_reservations(self):
+        self.assertEqual(self.index.reserve("P1", "/a.jpg", 0x0F0F), [])
+        # A concurrent build of another content sees the claim
+        self.assertEqual(self.index.reserve("P2", "/b.jpg", 0x0F0F), [(0, ("P1", "/a.jpg"))])
+        self.index.release("P1")
+        self.assertEqual(self.index.reserve("P2", "/b.jpg", 0x0F0F), [])
+        self.index.replace("P2", [("/b.jpg", 0x0F0F)])
+        self.assertEqual(len(self.index.table), 1)
+
+@unittest.skipIf(Image is None, "Pillow not installed")
+class TestNearDuplicateImages(unittest.TestCase):
+    def setUp(self):
+        self.root = "test_phash_root"
+        self.config = {
+            "content_sources": {"image_assets_dir": f"{self.root}/images", "video_assets_dir": f"{self.root}/videos"},
+            "unique_pack": {"required_per_post": {"min_images": 2}, "outputs": {"package_dir": f"{self.root}/out/packages"}}
+        }
+        sku_dir = f"{self.root}/images/SKU1"
+        os.makedirs(sku_dir, exist_ok=True)
+        make_photo(f"{sku_dir}/a.jpg", seed=1)
+        make_photo(f"{sku_dir}/a_small.jpg", seed=1, size=(320, 240), quality=60)  # re-encoded resize of a.jpg
+        make_photo(f"{sku_dir}/b.jpg", seed=2)
+        self.generator = UniquePackGenerator(self.config)
+
+    def tearDown(self):
+        self.generator.close()
+        shutil.rmtree(self.root)
+
+    def test_resized_copy_is_dropped(self):
+        res = self.generator.process("SKU1", "POST1")
+        self.assertEqual(res["status"], "PASS")
+        self.assertEqual(res["image_count"], 2)
+        self.assertEqual(res["near_duplicates"][0]["file"], "a_small.jpg")
+        self.assertEqual(res["near_duplicates"][0]["scope"], "pack")
+
+    def test_reuse_across_posts_is_caught(self):
+        self.generator.process("SKU1", "POST1")
+        sku_dir = f"{self.root}/images/SKU2"
+        os.makedirs(sku_dir, exist_ok=True)
+        make_photo(f"{sku_dir}/b_copy.jpg", seed=2, size=(800, 600))
+        make_photo(f"{sku_dir}/c.jpg", seed=3)
+        make_photo(f"{sku_dir}/d.jpg", seed=4)
+        res = self.generator.process("SKU2", "POST2")
+        self.assertEqual(res["image_count"], 2)
+        self.assertEqual(res["near_duplicates"][0]["scope"], "global")
+        self.assertEqual(res["near_duplicates"][0]["content_id"], "POST1")
+
+        # Rebuilding POST1 does not collide with its own earlier images
+        res = self.generator.process("SKU1", "POST1", force=True)
+        self.assertEqual(res["image_count"], 2)
+
+    def test_reuse_within_a_batch_is_caught(self):
+        sku_dir = f"{self.root}/images/SKU2"
+        os.makedirs(sku_dir, exist_ok=True)
+        make_photo(f"{sku_dir}/b_copy.jpg", seed=2, size=(800, 600))
+        make_photo(f"{sku_dir}/c.jpg", seed=3)
+        make_photo(f"{sku_dir}/d.jpg", seed=4)
+        self.generator.workers = 2
+        records = [r for r in self.generator.process_batch([("SKU1", "POST1"), ("SKU2", "POST2")]) if "sku" in r]
+        shared = [d for r in records for d in r["near_duplicates"] if d["scope"] == "global"]
+        # Exactly one of the two packs keeps the shared image
+        self.assertEqual(len(shared), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import os
+import threading
 from app.publish.state_machine import StateMachine, ContentState
 from app.publish.queue import PublishQueue
 
@@ -11,7 +13,14 @@ class TestPublishFlow(unittest.TestCase):
                 }
             }
         }
-        self.queue = PublishQueue(self.config)
+        self.db_path = "test_publish_queue.db"
+        self.queue = PublishQueue(self.config, self.db_path)
+
+    def tearDown(self):
+        self.queue.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
 
     def test_state_transitions(self):
         self.queue.add_item("POST001", {"platform": "wordpress"})
@@ -54,5 +63,72 @@ class TestPublishFlow(unittest.TestCase):
         ready = self.queue.get_ready_items("wordpress")
         self.assertEqual(len(ready), 1)
 
+    def test_queue_survives_restart(self):
+        self.queue.add_item("WP002", {"platform": "wordpress", "title": "재시작"})
+        self.queue.update_state("WP002", ContentState.QA_PASS)
+        self.queue.close()
+
+        reopened = PublishQueue(self.config, self.db_path)
+        item = reopened.items["WP002"]
+        self.assertEqual(item["state"], ContentState.QA_PASS)
+        self.assertEqual(item["data"]["title"], "재시작")
+        self.assertEqual(item["history"], [ContentState.DRAFT, ContentState.QA_PASS])
+        self.assertEqual([h["to"] for h in reopened.history("WP002")], ["DRAFT", "QA_PASS"])
+        self.assertNotIn("missing", reopened.items)
+        with self.assertRaises(ValueError):
+            reopened.update_state("missing", ContentState.QA_PASS)
+
+    def test_readding_keeps_state_and_history(self):
+        self.assertTrue(self.queue.add_item("WP003", {"platform": "wordpress"}))
+        self.queue.update_state("WP003", ContentState.QA_PASS)
+        self.queue.update_state("WP003", ContentState.READY)
+
+        # e.g. an ingestion job rerun
+        self.assertFalse(self.queue.add_item("WP003", {"platform": "wordpress", "title": "다시"}))
+        self.assertEqual(self.queue.add_items({"WP003": {"platform": "wordpress"}, "WP004": {"platform": "wordpress"}}), 1)
+        item = self.queue.items["WP003"]
+        self.assertEqual(item["state"], ContentState.READY)
+        self.assertEqual(item["history"], [ContentState.DRAFT, ContentState.QA_PASS, ContentState.READY])
+        self.assertNotIn("title", item["data"])
+
+        # Back to DRAFT only as a recorded transition
+        self.queue.update_state("WP003", ContentState.REJECTED)
+        self.queue.update_state("WP003", ContentState.DRAFT)
+        self.assertEqual([h["to"] for h in self.queue.history("WP003")], ["DRAFT", "QA_PASS", "READY", "REJECTED", "DRAFT"])
+
+    def test_concurrent_transition_applies_once(self):
+        self.queue.add_item("POST002", {"platform": "wordpress"})
+        self.queue.update_state("POST002", ContentState.QA_PASS)
+        results = []
+
+        def publish():
+            try:
+                self.queue.update_state("POST002", ContentState.READY)
+                results.append("ok")
+            except ValueError:
+                results.append("rejected")
+
+        threads = [threading.Thread(target=publish) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(results), ["ok", "rejected", "rejected", "rejected"])
+        self.assertEqual(self.queue.items["POST002"]["history"].count(ContentState.READY), 1)
+
+    def test_ready_items_use_index(self):
+        self.queue.add_items({f"P{i}": {"platform": "wordpress" if i % 2 else "naver"} for i in range(10)})
+        for cid in ("P1", "P3", "P5"):
+            self.queue.update_state(cid, ContentState.QA_PASS)
+            self.queue.update_state(cid, ContentState.READY)
+        self.assertEqual([item["id"] for item in self.queue.get_ready_items("wordpress")], ["P1", "P3", "P5"])
+        self.assertEqual(len(self.queue.get_ready_items("wordpress", limit=2)), 2)
+        with self.queue.db.connection() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM publish_items WHERE state = 'READY' AND platform = 'wordpress' "
+                "AND approval_required = 0 ORDER BY updated_at, id"
+            ))
+        self.assertIn("idx_publish_items_ready", plan)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from app.rules.matcher import KeywordMatcher, describe_location
+from app.rules.ko_rules import KoBannedClaimsRule
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_overlapping_keywords(self):
+        matcher = KeywordMatcher(["he", "she", "his", "hers"])
+        self.assertEqual(
+            sorted(matcher.find_all("ushers")),
+            [(1, "she"), (2, "he"), (2, "hers")]
+        )
+
+    def test_korean_and_ignore_case(self):
+        ko = KeywordMatcher(["부작용 없음", "완치", "100%"])
+        self.assertEqual(ko.scan("100% 완치, 완치!"), {"100%": [0], "완치": [5, 9]})
+
+        en = KeywordMatcher(["Guaranteed", "no side effects"], ignore_case=True)
+        self.assertEqual(en.scan("GUARANTEED results with No Side Effects"), {"Guaranteed": [0], "no side effects": [24]})
+
+    def test_location(self):
+        content = "첫 문단입니다.\n\n두 번째 문단은 무조건 좋습니다.\n\n세 번째 문단."
+        self.assertEqual(describe_location(content, [content.index("무조건")]), "2문단")
+
+    def test_rule_without_catalog(self):
+        rule = KoBannedClaimsRule(["무조건", "보장"])
+        res = rule.evaluate("무조건 좋아요.\n\n효과를 보장합니다.", {})
+        self.assertEqual(res["detail"], "금지된 표현 발견: 무조건, 보장")
+        self.assertEqual(res["location"], "1문단, 2문단")
+
+if __name__ == "__main__":
+    unittest.main()
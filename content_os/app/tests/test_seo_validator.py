@@ -1,5 +1,7 @@
 import unittest
 from app.seo.validator import SEOValidator
+from app.ads.dom_utils import HtmlDocument
+from app.ads.linter import AdsLinter
 
 class TestSEOValidator(unittest.TestCase):
     def setUp(self):
@@ -30,6 +32,25 @@ class TestSEOValidator(unittest.TestCase):
         self.assertFalse(report["valid"])
         self.assertIn("canonical", report["missing"])
 
+    def test_technical_seo_is_attribute_order_insensitive(self):
+        html = """
+        <html><head>
+            <link href="https://example.com" rel='canonical'>
+            <meta content="test" name="description">
+            <meta content="test" property="og:title">
+            <script type='application/ld+json'>{}</script>
+        </head></html>
+        """
+        self.assertTrue(self.validator.validate_technical_seo(html)["valid"])
+
+    def test_shared_document(self):
+        doc = HtmlDocument('<html><head><link rel="canonical" href="/"></head>'
+                           '<body><div class="ad-unit">Ad</div><button>Buy</button></body></html>')
+        report = self.validator.validate_technical_seo(doc)
+        self.assertTrue(report["checks"]["canonical"])
+        self.assertIn("json_ld", report["missing"])
+        self.assertEqual(AdsLinter({}).lint(doc)["status"], "FAIL")
+
     def test_unique_pack_validation(self):
         content_data = {
             "faq": [{"q": "a"}],
@@ -0,0 +1,129 @@
+import unittest
+import os
+import gzip
+import shutil
+from app.seo.site_audit import SiteAuditor, PageAuditor, iter_warc
+
+def page(title, canonical=None, description="설명", body="<p>본문</p>"):
+    head = f"<title>{title}</title><meta name=\"description\" content=\"{description}\">"
+    head += "<meta property=\"og:title\" content=\"x\"><script type=\"application/ld+json\">{\"@type\": \"Article\"}</script>"
+    if canonical:
+        head += f"<link rel=\"canonical\" href=\"{canonical}\">"
+    return f"<html><head>{head}</head><body>{body}</body></html>"
+
+class TestSiteAudit(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = "test_site_audit_root"
+        self.site = os.path.join(self.test_dir, "site")
+        os.makedirs(os.path.join(self.site, "b"), exist_ok=True)
+        self.state = os.path.join(self.test_dir, "state.json")
+        base = "https://example.com"
+        self.pages = {
+            "a.html": page("같은 제목", f"{base}/a.html"),
+            "b/index.html": page("같은 제목", f"{base}/b/", description="다른 설명"),
+            # Points at a duplicate page that itself points elsewhere
+            "c.html": page("C", f"{base}/d.html"),
+            "d.html": page("D", f"{base}/a.html"),
+            "e.html": page("E", f"{base}/missing.html"),
+            "ad.html": page("Ad", f"{base}/ad.html", body="<div class=\"ad-unit\">AD</div><button>Buy</button>")
+        }
+        for name, html in self.pages.items():
+            with open(os.path.join(self.site, name), "w", encoding="utf-8") as f:
+                f.write(html)
+        self.config = {"site_audit": {"base_url": base, "naver": False}}
+
+    def tearDown(self):
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def test_site_level_issues(self):
+        report = SiteAuditor(self.config, workers=0, state_path=self.state).run(self.site)
+        self.assertEqual(report["summary"]["pages"], 6)
+        titles = report["site"]["duplicate_titles"]
+        self.assertEqual(titles, [{"title": "같은 제목", "pages": ["https://example.com/a.html", "https://example.com/b/"]}])
+        # Non-indexable pages (canonicalised elsewhere) do not count as duplicates
+        descriptions = report["site"]["duplicate_descriptions"][0]["pages"]
+        self.assertNotIn("https://example.com/c.html", descriptions)
+        conflicts = {c["page"]: c["reason"] for c in report["site"]["canonical_conflicts"]}
+        self.assertIn("canonicalises", conflicts["https://example.com/c.html"])
+        self.assertIn("not in export", conflicts["https://example.com/e.html"])
+        self.assertNotIn("https://example.com/d.html", conflicts)
+        self.assertIn("https://example.com/ad.html", report["pages"])
+        self.assertEqual(report["summary"]["issues_by_check"], {"ads": 1})
+
+    def test_incremental_reaudits_changed_pages_only(self):
+        SiteAuditor(self.config, workers=0, state_path=self.state).run(self.site)
+        report = SiteAuditor(self.config, workers=0, state_path=self.state).run(self.site)
+        self.assertEqual((report["summary"]["audited"], report["summary"]["reused"]), (0, 6))
+
+        with open(os.path.join(self.site, "a.html"), "w", encoding="utf-8") as f:
+            f.write(page("새 제목", "https://example.com/a.html"))
+        os.remove(os.path.join(self.site, "e.html"))
+        report = SiteAuditor(self.config, workers=0, state_path=self.state).run(self.site)
+        self.assertEqual((report["summary"]["audited"], report["summary"]["reused"]), (1, 4))
+        self.assertEqual(report["summary"]["removed"], 1)
+        self.assertEqual(report["site"]["duplicate_titles"], [])
+
+        # A different config invalidates the saved records
+        config = {"site_audit": {"base_url": "https://example.com", "naver": True}}
+        report = SiteAuditor(config, workers=0, state_path=self.state).run(self.site)
+        self.assertEqual(report["summary"]["audited"], 5)
+
+    def _conflicts(self, pages, base_url):
+        site = os.path.join(self.test_dir, "site2")
+        os.makedirs(site, exist_ok=True)
+        for name, html in pages.items():
+            with open(os.path.join(site, name), "w", encoding="utf-8") as f:
+                f.write(html)
+        config = {"site_audit": {"base_url": base_url, "naver": False}}
+        report = SiteAuditor(config, workers=0).run(site)
+        return {c["page"]: c["reason"] for c in report["site"]["canonical_conflicts"]}
+
+    def test_absolute_canonicals_without_base_url(self):
+        conflicts = self._conflicts({
+            "a.html": page("A", "https://example.com/missing.html"),
+            "b.html": page("B", "https://example.com/a.html")
+        }, "")
+        self.assertIn("not in export", conflicts["/a.html"])
+        self.assertIn("canonicalises", conflicts["/b.html"])
+
+    def test_relative_canonicals_with_base_url(self):
+        conflicts = self._conflicts({
+            "a.html": page("A", "/missing.html"),
+            "b.html": page("B", "a.html"),
+            "c.html": page("C", "https://other.example.org/c.html")
+        }, "https://example.com")
+        self.assertIn("not in export", conflicts["https://example.com/a.html"])
+        self.assertIn("canonicalises", conflicts["https://example.com/b.html"])
+        # Cross-domain canonical
+        self.assertNotIn("https://example.com/c.html", conflicts)
+
+    def test_page_checks(self):
+        html = ("<html><head><link rel=\"canonical\" href=\"/x\"><link rel=\"canonical\" href=\"/y\">"
+                "<script type=\"application/ld+json\">{\"@type\": \"Product\", \"name\": \"P\"}</script>"
+                "<script type=\"application/ld+json\">{broken</script></head><body></body></html>")
+        record = PageAuditor({"site_audit": {"naver": False}}).audit("/x", html)
+        messages = [i["message"] for i in record["issues"]]
+        self.assertIn("Missing og_tags", messages)
+        self.assertIn("Missing title", messages)
+        self.assertTrue(any(m.startswith("Conflicting canonical") for m in messages))
+        self.assertIn("Product: Missing required field: offers", messages)
+        self.assertTrue(any(m.startswith("Invalid JSON-LD") for m in messages))
+
+    def test_warc_reader(self):
+        def record(uri, payload, content_type="text/html; charset=utf-8"):
+            http = f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n\r\n".encode() + payload
+            head = f"WARC/1.0\r\nWARC-Type: response\r\nWARC-Target-URI: {uri}\r\nContent-Length: {len(http)}\r\n\r\n"
+            return head.encode() + http + b"\r\n\r\n"
+
+        path = os.path.join(self.test_dir, "site.warc.gz")
+        with gzip.open(path, "wb") as f:
+            f.write(b"WARC/1.0\r\nWARC-Type: warcinfo\r\nContent-Length: 4\r\n\r\ninfo\r\n\r\n")
+            f.write(record("https://example.com/a", self.pages["a.html"].encode("utf-8")))
+            f.write(record("https://example.com/img.png", b"\x89PNG", content_type="image/png"))
+        pages = list(iter_warc(path))
+        self.assertEqual([url for url, _ in pages], ["https://example.com/a"])
+        self.assertEqual(pages[0][1].decode("utf-8"), self.pages["a.html"])
+
+if __name__ == '__main__':
+    unittest.main()
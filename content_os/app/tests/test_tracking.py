@@ -13,6 +13,7 @@ class TestTracking(unittest.TestCase):
         self.builder = LinkBuilder({})
 
     def tearDown(self):
+        self.collector.close()
         if os.path.exists(self.db_path):
             os.remove(self.db_path)
 
@@ -39,5 +40,76 @@ class TestTracking(unittest.TestCase):
         self.assertEqual(summary[0]["ctr"], 50.0)
         self.assertEqual(summary[0]["cvr"], 50.0)
 
+    def _event(self, event_type, timestamp, channel="naver"):
+        return {"event_type": event_type, "channel": channel, "content_id": "p1",
+                "sku": "s1", "intent": "info", "timestamp": timestamp}
+
+    def test_summary_time_range(self):
+        self.collector.collect_many([
+            self._event("page_view", "2024-05-01 09:15:00"),
+            self._event("cta_click", "2024-05-01 09:20:00"),
+            self._event("page_view", "2024-05-01 13:00:00", channel="insta"),
+            self._event("page_view", "2024-05-02 08:00:00"),
+        ])
+        self.assertEqual(self.aggregator.get_summary_by_content()[0]["views"], 3)
+        # Day-aligned bounds read the daily rollup
+        day = self.aggregator.get_summary_by_content(start="2024-05-01", end="2024-05-02")
+        self.assertEqual(day[0]["views"], 2)
+        self.assertEqual(day[0]["clicks"], 1)
+        # Hour bounds read the hourly rollup
+        morning = self.aggregator.get_summary_by_content(start="2024-05-01T09:00:00", end="2024-05-01T12:00:00")
+        self.assertEqual(morning[0]["views"], 1)
+        insta = self.aggregator.get_summary_by_content(channel="insta")
+        self.assertEqual(insta[0]["views"], 1)
+        self.assertEqual(self.aggregator.get_summary_by_content(start="2024-06-01"), [])
+
+    def test_rebuild_rollups_matches_incremental(self):
+        for i in range(5):
+            self.collector.collect("page_view", "naver", f"p{i % 2}", "s1", "info")
+        self.collector.collect("store_click", "naver", "p0", "s1", "info")
+        before = sorted(self.aggregator.get_summary_by_content(), key=lambda d: d["content_id"])
+        self.collector.rebuild_rollups()
+        after = sorted(self.aggregator.get_summary_by_content(), key=lambda d: d["content_id"])
+        self.assertEqual(before, after)
+        self.assertEqual(after[0]["clicks"], 1)
+
+    def test_query_api(self):
+        self.collector.collect_many(
+            [self._event("page_view", f"2024-05-01 0{i % 3}:00:00") for i in range(10)]
+            + [dict(self._event("cta_click", "2024-05-01 05:00:00"), content_id="p2")]
+        )
+        with self.assertRaises(ValueError):
+            self.collector.get_events({"1=1; --": "x"})
+        self.assertEqual(len(self.collector.get_events({"content_id": "p2"})), 1)
+        self.assertEqual(len(self.collector.get_events(start="2024-05-01 01:00:00", end="2024-05-01 02:00:00")), 3)
+
+        # Keyset pages cover every event exactly once
+        seen, after_id = [], None
+        while True:
+            page = self.collector.get_page(after_id=after_id, limit=4)
+            seen.extend(e["id"] for e in page["events"])
+            after_id = page["next_after_id"]
+            if after_id is None:
+                break
+        self.assertEqual(seen, sorted(seen))
+        self.assertEqual(len(set(seen)), 11)
+
+        streamed = list(self.collector.iter_events({"event_type": "page_view"}, batch_size=3))
+        self.assertEqual(len(streamed), 10)
+
+    def test_indexes_migrated(self):
+        import sqlite3
+        conn = sqlite3.connect(self.db_path)
+        try:
+            version = conn.execute("SELECT version FROM schema_version WHERE component = 'events'").fetchone()[0]
+            plan = " ".join(r[3] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM events WHERE content_id = ? AND id > ? ORDER BY id", ("p1", 0)))
+        finally:
+            conn.close()
+        self.assertEqual(version, 1)
+        self.assertIn("idx_events_content_id", plan)
+        # Re-opening does not re-apply migrations
+        EventCollector(self.db_path)
+
 if __name__ == "__main__":
     unittest.main()
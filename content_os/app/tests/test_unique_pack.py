@@ -2,7 +2,7 @@ import unittest
 import os
 import shutil
 import json
-from app.pipeline.unique_pack import UniquePackGenerator
+from app.pipeline.unique_pack import UniquePackGenerator, load_manifest
 
 class TestUniquePack(unittest.TestCase):
     def setUp(self):
@@ -23,6 +23,7 @@ class TestUniquePack(unittest.TestCase):
         self.generator = UniquePackGenerator(self.config)
 
     def tearDown(self):
+        self.generator.close()
         if os.path.exists("./test_assets"): shutil.rmtree("./test_assets")
         if os.path.exists("./test_out"): shutil.rmtree("./test_out")
 
@@ -37,5 +38,44 @@ class TestUniquePack(unittest.TestCase):
         res = self.generator.process("SKU002", "POST002")
         self.assertEqual(res["status"], "REJECT")
 
+    def test_unchanged_inputs_are_skipped(self):
+        first = self.generator.process("SKU001", "POST001")
+        self.assertNotIn("skipped", first)
+        again = self.generator.process("SKU001", "POST001")
+        self.assertTrue(again["skipped"])
+        self.assertEqual(again["status"], "PASS")
+
+        with open("./test_assets/images/SKU001/img3.jpg", "w") as f: f.write("fake image 3")
+        rebuilt = self.generator.process("SKU001", "POST001")
+        self.assertNotIn("skipped", rebuilt)
+        self.assertEqual(rebuilt["image_count"], 3)
+
+    def test_dedupe_settings_invalidate_packs(self):
+        self.generator.process("SKU001", "POST001")
+        self.generator.close()
+        self.config["unique_pack"]["perceptual"] = {"max_distance": 4}
+        self.generator = UniquePackGenerator(self.config)
+        self.assertNotIn("skipped", self.generator.process("SKU001", "POST001"))
+        self.assertTrue(self.generator.process("SKU001", "POST001")["skipped"])
+
+    def test_batch_manifest(self):
+        os.makedirs("./test_assets/images/SKU002", exist_ok=True)
+        with open("./test_assets/images/SKU002/img1.jpg", "w") as f: f.write("only one")
+        os.makedirs("./test_out", exist_ok=True)
+        with open("./test_out/manifest.csv", "w") as f:
+            f.write("sku,content_id\nSKU001,POST001\nSKU002,POST002\n")
+        items = list(load_manifest("./test_out/manifest.csv"))
+        self.assertEqual(items, [("SKU001", "POST001"), ("SKU002", "POST002")])
+
+        records = list(self.generator.process_batch(items))
+        stats = records[-1]["stats"]
+        by_sku = {r["sku"]: r for r in records[:-1]}
+        self.assertEqual(by_sku["SKU001"]["status"], "PASS")
+        self.assertEqual(by_sku["SKU002"]["status"], "REJECT")
+        self.assertEqual(stats["built"], 2)
+
+        stats = list(self.generator.process_batch(items))[-1]["stats"]
+        self.assertEqual(stats["skipped"], 2)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,111 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: pip install "content-compliance-engine[archive]"
+    pa = None
+    pq = None
+
+COLUMNS = ("id", "event_type", "channel", "content_id", "sku", "intent", "metadata", "timestamp")
+
+class EventArchive:
+    """
+    Cold storage for tracking events: one zstd-compressed Parquet file per UTC
+    day (`<dir>/day=YYYY-MM-DD/events.parquet`), holding exactly the columns of
+    the SQLite `events` table. Files are replaced atomically, and rows whose id
+    is already archived are skipped, so re-running a retention job is safe.
+    """
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+
+    @staticmethod
+    def path_for(db_path: str) -> str:
+        """
+        Default archive location next to a database: blogs.db -> blogs.events/
+        """
+        return os.path.splitext(db_path)[0] + ".events"
+
+    @property
+    def available(self) -> bool:
+        return pq is not None
+
+    def _require(self):
+        if pq is None:
+            raise ImportError("Event archive requires pyarrow: pip install 'content-compliance-engine[archive]'")
+
+    def _day_path(self, day: str) -> str:
+        return os.path.join(self.archive_dir, f"day={day}", "events.parquet")
+
+    def days(self) -> List[str]:
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(
+            name[4:] for name in os.listdir(self.archive_dir)
+            if name.startswith("day=") and os.path.exists(self._day_path(name[4:]))
+        )
+
+    def write_day(self, day: str, rows: List[Dict]) -> int:
+        """
+        Merges rows (all from one day) into that day's file. Returns rows added.
+        """
+        self._require()
+        path = self._day_path(day)
+        table = pa.Table.from_pylist(
+            [{c: row.get(c) for c in COLUMNS} for row in rows], schema=_schema()
+        )
+        if os.path.exists(path):
+            existing = pq.read_table(path, schema=_schema())
+            known = set(existing.column("id").to_pylist())
+            table = table.filter(pa.array([i not in known for i in table.column("id").to_pylist()], type=pa.bool_()))
+            added = table.num_rows
+            table = pa.concat_tables([existing, table])
+        else:
+            added = table.num_rows
+        if not added:
+            return 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        pq.write_table(table.sort_by("id"), tmp, compression="zstd")
+        os.replace(tmp, path)
+        return added
+
+    def read(self, filters: Optional[Dict] = None, start: Optional[str] = None,
+             end: Optional[str] = None, after_id: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yields archived events day by day, in id order within a day. `filters`
+        are column equality predicates; start/end bound the timestamp as
+        [start, end) and after_id skips ids up to and including it.
+        """
+        days = self.days()
+        if not days:
+            return
+        self._require()
+        predicates = [(k, "=", v) for k, v in (filters or {}).items()]
+        if start:
+            predicates.append(("timestamp", ">=", start))
+        if end:
+            predicates.append(("timestamp", "<", end))
+        if after_id is not None:
+            predicates.append(("id", ">", after_id))
+        for day in days:
+            # Partition pruning: skip whole files outside the requested range
+            if start and day < start[:10]:
+                continue
+            if end and day > end[:10]:
+                continue
+            table = pq.read_table(self._day_path(day), filters=predicates or None)
+            yield from table.to_pylist()
+
+def day_bounds(day: str):
+    """
+    'YYYY-MM-DD' -> ('YYYY-MM-DD 00:00:00', next day's midnight) timestamps.
+    """
+    start = datetime.strptime(day, "%Y-%m-%d")
+    return f"{day} 00:00:00", (start + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+
+def _schema():
+    return pa.schema([("id", pa.int64())] + [(c, pa.string()) for c in COLUMNS[1:]])
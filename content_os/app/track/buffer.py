@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from typing import Dict, List
+from .event_collector import EventCollector
+
+class BufferFullError(Exception):
+    pass
+
+class EventBuffer:
+    """
+    Write-behind buffer in front of EventCollector.
+
+    Events are queued in memory and a background task writes them with one
+    executemany transaction every `flush_interval_ms`, or as soon as
+    `max_batch` events are waiting. The queue is bounded by `max_queue`; when
+    it is full, overflow="block" waits up to `put_timeout` seconds for room
+    for the whole batch and then raises BufferFullError without queuing any
+    of it (so a client retrying the request does not duplicate events),
+    overflow="drop" discards the events that do not fit and counts them.
+    """
+    def __init__(self, collector: EventCollector, max_batch: int = 500, flush_interval_ms: int = 200,
+                 max_queue: int = 50000, overflow: str = "block", put_timeout: float = 1.0):
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.collector = collector
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.put_timeout = put_timeout
+
+        self._queue: asyncio.Queue = None
+        self._wake: asyncio.Event = None
+        self._space: asyncio.Event = None
+        self._write_lock: asyncio.Lock = None
+        self._task: asyncio.Task = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        # Created here so they bind to the running loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the flusher and writes everything still queued.
+        """
+        if self._task is None:
+            return
+        # Signalled rather than cancelled, so a batch being written is never interrupted
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+    async def put(self, event: Dict) -> bool:
+        return await self.put_many([event]) == 1
+
+    async def put_many(self, events: List[Dict]) -> int:
+        """
+        Queues events and returns how many were accepted.
+        Without a running flusher the events are written immediately.
+        """
+        if not self.running:
+            return await asyncio.to_thread(self.collector.collect_many, events)
+
+        if self.overflow == "drop":
+            accepted = 0
+            for event in events:
+                try:
+                    self._queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+                    continue
+                accepted += 1
+        else:
+            await self._reserve(len(events))
+            # No await between the capacity check and these puts, so nothing else can take the room
+            for event in events:
+                self._queue.put_nowait(event)
+            accepted = len(events)
+        if self._queue.qsize() >= self.max_batch:
+            self._wake.set()
+        return accepted
+
+    async def _reserve(self, count: int):
+        """
+        Waits until `count` more events fit in the queue, or raises
+        BufferFullError once `put_timeout` has passed.
+        """
+        if count > self.max_queue:
+            raise BufferFullError(f"Batch of {count} events exceeds the buffer size ({self.max_queue})")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.put_timeout
+        while self.max_queue - self._queue.qsize() < count:
+            remaining = deadline - loop.time()
+            self._space.clear()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                raise BufferFullError(f"Event buffer full ({self._queue.qsize()} of {self.max_queue} events pending)")
+
+    async def flush(self):
+        """
+        Writes all queued events now. Once this returns, every event accepted
+        before the call is visible to readers.
+        """
+        if self._queue is None:
+            return
+        async with self._write_lock:
+            while not self._queue.empty():
+                batch = []
+                while len(batch) < self.max_batch and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                self._space.set()
+                try:
+                    self.written += await asyncio.to_thread(self.collector.collect_many, batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logging.error(f"Event flush failed, {len(batch)} events lost: {e}")
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "max_queue": self.max_queue,
+            "overflow": self.overflow
+        }
@@ -1,15 +1,41 @@
 import sqlite3
 import json
-from datetime import datetime
-from typing import Dict, List
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Union
+from .rollup import init_rollup_tables, apply_rollups, rebuild_rollups, to_timestamp, TIMESTAMP_FORMAT
+from .archive import EventArchive, day_bounds
+from ..storage.db import Database, get_database
+from ..storage.migrations import migrate
+
+# Columns get_events/iter_events may filter on
+FILTER_COLUMNS = ("event_type", "channel", "content_id", "sku", "intent")
+
+# schema_version steps for the "events" component
+MIGRATIONS = [
+    [
+        # SQLite appends the rowid (= id) to every index, so each of these also
+        # serves "WHERE col = ? AND id > ? ORDER BY id" keyset pages
+        "CREATE INDEX IF NOT EXISTS idx_events_content_id ON events (content_id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_sku ON events (sku)",
+        "CREATE INDEX IF NOT EXISTS idx_events_event_type ON events (event_type)",
+        "CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp)",
+    ],
+]
 
 class EventCollector:
-    def __init__(self, db_path: str = "blogs.db"):
+    def __init__(self, db_path: str = "blogs.db", archive_dir: Optional[str] = None,
+                 db: Optional[Database] = None):
         self.db_path = db_path
+        self.db = db or get_database(db_path)
+        # Cold storage for events moved out by archive_older_than
+        self.archive = EventArchive(archive_dir or EventArchive.path_for(db_path))
         self._init_db()
 
+    def close(self):
+        self.db.close()
+
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -22,28 +48,166 @@ class EventCollector:
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            migrate(conn, "events", MIGRATIONS)
+            if init_rollup_tables(conn):
+                # Databases written before rollups existed: backfill once
+                rebuild_rollups(conn)
 
     def collect(self, event_type: str, channel: str, content_id: str, sku: str, intent: str, metadata: Dict = None):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT INTO events (event_type, channel, content_id, sku, intent, metadata) VALUES (?, ?, ?, ?, ?, ?)",
-                (event_type, channel, content_id, sku, intent, json.dumps(metadata or {}))
+        self.collect_many([{
+            "event_type": event_type,
+            "channel": channel,
+            "content_id": content_id,
+            "sku": sku,
+            "intent": intent,
+            "metadata": metadata
+        }])
+
+    def collect_many(self, events: List[Dict]) -> int:
+        """
+        Inserts a batch of events in a single transaction.
+        """
+        # Stamped here rather than by the column default so the rollup buckets match
+        now = datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+        rows = [
+            (e["event_type"], e["channel"], e["content_id"], e["sku"], e["intent"],
+             json.dumps(e.get("metadata") or {}), e.get("timestamp") or now)
+            for e in events
+        ]
+        if not rows:
+            return 0
+        with self.db.connection() as conn:
+            conn.executemany(
+                "INSERT INTO events (event_type, channel, content_id, sku, intent, metadata, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
             )
+            apply_rollups(conn, [(r[6], r[0], r[1], r[2], r[3], r[4]) for r in rows])
+        return len(rows)
+
+    def rebuild_rollups(self):
+        """
+        Recomputes the hourly/daily rollups from the raw events, hot and
+        archived, counting each event id once.
+        """
+        with self.db.connection() as conn:
+            rebuild_rollups(conn)
+            # Archived events left SQLite but still belong in the totals. A
+            # day whose rows were archived but not yet deleted (crash between
+            # the two steps) is already counted from the hot table.
+            batch, day, hot = [], None, set()
+            for row in self.archive.read():
+                if row["timestamp"][:10] != day:
+                    day = row["timestamp"][:10]
+                    hot = {r[0] for r in conn.execute(
+                        "SELECT id FROM events WHERE timestamp >= ? AND timestamp < ?", day_bounds(day)
+                    )}
+                if row["id"] in hot:
+                    continue
+                batch.append((row["timestamp"], row["event_type"], row["channel"],
+                              row["content_id"], row["sku"], row["intent"]))
+                if len(batch) >= 10000:
+                    apply_rollups(conn, batch)
+                    batch = []
+            apply_rollups(conn, batch)
+
+    def archive_older_than(self, days: int, now: Optional[datetime] = None) -> Dict:
+        """
+        Moves events older than `days` days (whole UTC days only) into the
+        Parquet archive, one day at a time: the day's file is written first
+        and the rows are deleted from SQLite afterwards. Rollups are kept, so
+        summaries still include archived events.
+        """
+        cutoff = ((now or datetime.utcnow()) - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self.db.connection() as conn:
+            old_days = [row[0] for row in conn.execute(
+                "SELECT DISTINCT substr(timestamp, 1, 10) FROM events WHERE timestamp < ? ORDER BY 1", (cutoff,)
+            )]
+
+        stats = {"cutoff": cutoff, "days": [], "archived": 0, "deleted": 0}
+        for day in old_days:
+            start, end = day_bounds(day)
+            with self.db.connection() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = [dict(r) for r in conn.execute(
+                    "SELECT * FROM events WHERE timestamp >= ? AND timestamp < ? ORDER BY id", (start, end)
+                )]
+            if not rows:
+                continue
+            stats["archived"] += self.archive.write_day(day, rows)
+            with self.db.connection() as conn:
+                stats["deleted"] += conn.execute(
+                    "DELETE FROM events WHERE timestamp >= ? AND timestamp < ? AND id <= ?",
+                    (start, end, rows[-1]["id"])
+                ).rowcount
+            stats["days"].append(day)
+        return stats
+
+    def get_events(self, filters: Dict = None, start: Union[str, datetime, None] = None,
+                   end: Union[str, datetime, None] = None, after_id: Optional[int] = None,
+                   limit: Optional[int] = None) -> List[Dict]:
+        """
+        Matching events from the archive followed by those still in SQLite.
+        See iter_events for the arguments.
+        """
+        return list(self.iter_events(filters, start, end, after_id, limit))
+
+    def get_page(self, filters: Dict = None, start: Union[str, datetime, None] = None,
+                 end: Union[str, datetime, None] = None, after_id: Optional[int] = None,
+                 limit: int = 100) -> Dict:
+        """
+        One keyset page; pass `next_after_id` back as `after_id` for the next one.
+        """
+        events = self.get_events(filters, start, end, after_id, limit)
+        next_after_id = events[-1]["id"] if len(events) == limit else None
+        return {"events": events, "next_after_id": next_after_id}
+
+    def iter_events(self, filters: Dict = None, start: Union[str, datetime, None] = None,
+                    end: Union[str, datetime, None] = None, after_id: Optional[int] = None,
+                    limit: Optional[int] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """
+        Streams events in id order. `filters` maps FILTER_COLUMNS to values,
+        start/end bound the timestamp as [start, end) and `after_id` resumes
+        after a previously seen id. SQLite rows are fetched in keyset batches
+        of `batch_size`, so no read transaction stays open between batches.
+        """
+        filters = filters or {}
+        unknown = set(filters) - set(FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown event filter(s): {', '.join(sorted(unknown))}")
+        start, end = to_timestamp(start), to_timestamp(end)
+
+        remaining = limit
+        for event in self.archive.read(filters, start, end, after_id):
+            if remaining is not None and remaining <= 0:
+                return
+            yield event
+            if remaining is not None:
+                remaining -= 1
+
+        conditions, params = [], []
+        for column in FILTER_COLUMNS:
+            if column in filters:
+                conditions.append(f"{column} = ?")
+                params.append(filters[column])
+        if start:
+            conditions.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            conditions.append("timestamp < ?")
+            params.append(end)
+        conditions.append("id > ?")
+        query = f"SELECT * FROM events WHERE {' AND '.join(conditions)} ORDER BY id LIMIT ?"
 
-    def get_events(self, filters: Dict = None) -> List[Dict]:
-        query = "SELECT * FROM events"
-        params = []
-        if filters:
-            conditions = []
-            for k, v in filters.items():
-                conditions.append(f"{k} = ?")
-                params.append(v)
-            query += " WHERE " + " AND ".join(conditions)
-            
-        events = []
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query, params)
-            for row in cursor:
-                events.append(dict(row))
-        return events
+        last_id = after_id if after_id is not None else 0
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            with self.db.connection() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute(query, params + [last_id, size]).fetchall()
+            for row in rows:
+                yield dict(row)
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                return
+            last_id = rows[-1]["id"]
@@ -1,27 +1,61 @@
 import sqlite3
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional, Union
+from .rollup import to_timestamp, pick_table, bucket_range
+from ..storage.db import Database, get_database
 
 class MetricsAggregator:
-    def __init__(self, db_path: str = "blogs.db"):
+    """
+    Reads the hourly/daily rollups maintained by EventCollector, so a summary
+    costs the same no matter how many raw events are stored.
+    """
+    def __init__(self, db_path: str = "blogs.db", db: Optional[Database] = None):
         self.db_path = db_path
+        self.db = db or get_database(db_path)
 
-    def get_summary_by_content(self) -> List[Dict]:
-        query = """
-            SELECT 
-                content_id, 
-                sku, 
+    def close(self):
+        self.db.close()
+
+    def get_summary_by_content(self, start: Union[str, datetime, None] = None,
+                               end: Union[str, datetime, None] = None,
+                               channel: Optional[str] = None) -> List[Dict]:
+        """
+        Views/clicks/conversions per (content_id, sku, intent) for events in
+        [start, end). Bounds inside an hour or day include that whole bucket.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+        table = pick_table(start, end)
+        first, last = bucket_range(table, start, end)
+
+        conditions, params = [], []
+        if first:
+            conditions.append("bucket >= ?")
+            params.append(first)
+        if last:
+            conditions.append("bucket < ?")
+            params.append(last)
+        if channel:
+            conditions.append("channel = ?")
+            params.append(channel)
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+        query = f"""
+            SELECT
+                content_id,
+                sku,
                 intent,
-                COUNT(CASE WHEN event_type = 'page_view' THEN 1 END) as views,
-                COUNT(CASE WHEN event_type IN ('cta_click', 'store_click') THEN 1 END) as clicks,
-                COUNT(CASE WHEN event_type = 'copy_coupon' THEN 1 END) as conversions
-            FROM events
+                SUM(views) as views,
+                SUM(clicks) as clicks,
+                SUM(conversions) as conversions
+            FROM {table}
+            {where}
             GROUP BY content_id, sku, intent
         """
-        
+
         results = []
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.connection() as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute(query)
+            cursor = conn.execute(query, params)
             for row in cursor:
                 d = dict(row)
                 # Calculate CTR
@@ -0,0 +1,134 @@
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+# event_type -> rollup counter column; other event types only count towards `events`
+EVENT_COLUMNS = {
+    "page_view": "views",
+    "cta_click": "clicks",
+    "store_click": "clicks",
+    "copy_coupon": "conversions",
+}
+COUNTERS = ("events", "views", "clicks", "conversions")
+
+# Rollup table -> length of the timestamp prefix that forms its bucket
+# ('YYYY-MM-DD HH' for hourly, 'YYYY-MM-DD' for daily)
+ROLLUP_TABLES = {
+    "events_hourly": 13,
+    "events_daily": 10,
+}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def init_rollup_tables(conn: sqlite3.Connection) -> bool:
+    """
+    Creates the rollup tables. Returns True if they did not exist yet.
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    created = False
+    for table in ROLLUP_TABLES:
+        if table in existing:
+            continue
+        created = True
+        conn.execute(f"""
+            CREATE TABLE {table} (
+                bucket TEXT NOT NULL,
+                content_id TEXT NOT NULL,
+                sku TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                channel TEXT NOT NULL,
+                events INTEGER NOT NULL DEFAULT 0,
+                views INTEGER NOT NULL DEFAULT 0,
+                clicks INTEGER NOT NULL DEFAULT 0,
+                conversions INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, content_id, sku, intent, channel)
+            ) WITHOUT ROWID
+        """)
+    return created
+
+def aggregate(rows: List[Tuple]) -> Dict[str, Dict[Tuple, List[int]]]:
+    """
+    (timestamp, event_type, channel, content_id, sku, intent) rows ->
+    table -> (bucket, content_id, sku, intent, channel) -> counters.
+    """
+    out: Dict[str, Dict[Tuple, List[int]]] = {table: {} for table in ROLLUP_TABLES}
+    for timestamp, event_type, channel, content_id, sku, intent in rows:
+        column = EVENT_COLUMNS.get(event_type)
+        for table, width in ROLLUP_TABLES.items():
+            key = (timestamp[:width], content_id or "", sku or "", intent or "", channel or "")
+            counters = out[table].get(key)
+            if counters is None:
+                counters = out[table][key] = [0, 0, 0, 0]
+            counters[0] += 1
+            if column:
+                counters[COUNTERS.index(column)] += 1
+    return out
+
+def apply_rollups(conn: sqlite3.Connection, rows: List[Tuple]):
+    """
+    Adds a batch of events to the rollups. Runs inside the caller's
+    transaction, so rollups and raw events are committed together.
+    """
+    for table, groups in aggregate(rows).items():
+        conn.executemany(f"""
+            INSERT INTO {table} (bucket, content_id, sku, intent, channel, events, views, clicks, conversions)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (bucket, content_id, sku, intent, channel) DO UPDATE SET
+                events = events + excluded.events,
+                views = views + excluded.views,
+                clicks = clicks + excluded.clicks,
+                conversions = conversions + excluded.conversions
+        """, [key + tuple(counters) for key, counters in groups.items()])
+
+def rebuild_rollups(conn: sqlite3.Connection):
+    """
+    Recomputes every rollup from the raw events table.
+    """
+    init_rollup_tables(conn)
+    counted = {column: tuple(t for t, c in EVENT_COLUMNS.items() if c == column) for column in COUNTERS[1:]}
+    select = ", ".join(
+        f"SUM(CASE WHEN event_type IN ({', '.join(repr(t) for t in types)}) THEN 1 ELSE 0 END)"
+        for types in counted.values()
+    )
+    for table, width in ROLLUP_TABLES.items():
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"""
+            INSERT INTO {table} (bucket, content_id, sku, intent, channel, events, views, clicks, conversions)
+            SELECT substr(timestamp, 1, {width}), COALESCE(content_id, ''), COALESCE(sku, ''),
+                   COALESCE(intent, ''), COALESCE(channel, ''), COUNT(*), {select}
+            FROM events
+            GROUP BY 1, 2, 3, 4, 5
+        """)
+
+def to_timestamp(value: Union[str, datetime, None]) -> Optional[str]:
+    """
+    Normalizes a bound to the 'YYYY-MM-DD HH:MM:SS' form stored in events.timestamp.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    return value.replace("T", " ")
+
+def pick_table(start: Optional[str], end: Optional[str]) -> str:
+    """
+    Daily rollups when both bounds fall on midnight, hourly otherwise.
+    """
+    for bound in (start, end):
+        if bound and bound[11:].strip("0:") != "":
+            return "events_hourly"
+    return "events_daily"
+
+def bucket_range(table: str, start: Optional[str], end: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    [start, end) timestamps -> [first, last) buckets of the given table.
+    A partially covered bucket is included whole.
+    """
+    width = ROLLUP_TABLES[table]
+    first = start[:width] if start else None
+    last = None
+    if end:
+        last = end[:width]
+        if end[width:].strip("0: ") != "":
+            last += "\x7f"  # end falls inside this bucket, keep it
+    return first, last
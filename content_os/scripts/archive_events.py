@@ -0,0 +1,30 @@
+import sys
+import os
+import json
+import argparse
+import sqlite3
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.track.event_collector import EventCollector
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old tracking events from SQLite into the Parquet archive")
+    parser.add_argument("--db", default="blogs.db")
+    parser.add_argument("--days", type=int, default=90, help="Keep this many days of events in SQLite")
+    parser.add_argument("--archive-dir", help="Defaults to <db name>.events/ next to the database")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards to return freed pages to the OS")
+    args = parser.parse_args()
+
+    collector = EventCollector(args.db, archive_dir=args.archive_dir)
+    stats = collector.archive_older_than(args.days)
+    if args.vacuum and stats["deleted"]:
+        conn = sqlite3.connect(args.db)
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    stats["archive_dir"] = collector.archive.archive_dir
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import sys
+import os
+import json
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.seo.site_audit import SiteAuditor, save_report
+
+CONFIG = {
+    "ads_ux": {
+        "rules": {
+            "min_distance_from_cta_px": 120,
+            "forbid_near_elements": ["button", "input", "select"]
+        }
+    },
+    "structured_data": {
+        "validation": {"fail_on_missing": ["name", "image", "offers"]}
+    }
+}
+
+def audit_site(path: str, out: str, state: str = None, base_url: str = "", workers: int = None,
+               batch_size: int = 200, full: bool = False, naver: bool = True):
+    state = state or os.path.splitext(out)[0] + ".state.json"
+    if full and os.path.exists(state):
+        os.remove(state)
+    config = {**CONFIG, "site_audit": {"base_url": base_url, "naver": naver}}
+
+    print(f"Auditing {path} (state: {state})...", file=sys.stderr)
+    auditor = SiteAuditor(config, workers=workers, batch_size=batch_size, state_path=state)
+    report = auditor.run(path, progress=lambda r: print(
+        f"  {r['pages']} pages, {r['audited']} audited, {r['reused']} unchanged", file=sys.stderr
+    ))
+    save_report(report, out)
+    print(json.dumps(report["summary"], indent=2, ensure_ascii=False))
+    print(f"Report written to {out}", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit a rendered site export (HTML directory or WARC) without crawling")
+    parser.add_argument("path", help="Directory of rendered .html files, or a .warc/.warc.gz file")
+    parser.add_argument("--out", default="out/site_audit.json")
+    parser.add_argument("--state", help="Page hash state for incremental runs (default: <out name>.state.json)")
+    parser.add_argument("--base-url", default="", help="Site origin the directory is served from, e.g. https://example.com")
+    parser.add_argument("--workers", type=int, help="Audit processes (default: CPU count, 0 = inline)")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--full", action="store_true", help="Ignore the saved state and re-audit every page")
+    parser.add_argument("--no-naver", action="store_true", help="Skip Naver blog content rules")
+    args = parser.parse_args()
+    audit_site(args.path, args.out, args.state, args.base_url, args.workers, args.batch_size, args.full, not args.no_naver)
@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import shutil
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.storage.db import get_database
+
+INSERT = "INSERT INTO events (event_type, channel, content_id, sku, intent, metadata) VALUES (?, ?, ?, ?, ?, ?)"
+SELECT = "SELECT COUNT(*) FROM events WHERE content_id = ?"
+
+def connect_per_call(path):
+    """
+    The pre-pool access pattern: a fresh connection for every operation.
+    """
+    def run(sql, params):
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+    return run
+
+def pooled(path):
+    db = get_database(path)
+    def run(sql, params):
+        with db.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+    return run
+
+def measure(run, sql, make_params, n):
+    timings = []
+    for i in range(n):
+        start = time.perf_counter()
+        run(sql, make_params(i))
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "mean_us": round(sum(timings) / n * 1e6, 1),
+        "p50_us": round(timings[n // 2] * 1e6, 1),
+        "p99_us": round(timings[min(n - 1, int(n * 0.99))] * 1e6, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-operation SQLite latency: connect-per-call vs the pooled Database")
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=50000, help="Rows pre-loaded before measuring")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_db_")
+    try:
+        report = {}
+        for name, factory in (("connect_per_call", connect_per_call), ("pooled", pooled)):
+            path = os.path.join(workdir, f"{name}.db")
+            with sqlite3.connect(path) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT, event_type TEXT, channel TEXT, content_id TEXT,
+                        sku TEXT, intent TEXT, metadata TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                conn.execute("CREATE INDEX idx_events_content_id ON events (content_id)")
+                conn.executemany(INSERT, [("page_view", "naver", f"p{i % 500}", "s1", "info", "{}") for i in range(args.rows)])
+            conn.close()
+
+            run = factory(path)
+            report[name] = {
+                "insert": measure(run, INSERT, lambda i: ("page_view", "naver", f"p{i % 500}", "s1", "info", "{}"), args.ops),
+                "select": measure(run, SELECT, lambda i: (f"p{i % 500}",), args.ops)
+            }
+        get_database(os.path.join(workdir, "pooled.db")).close()
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pipeline.hashing import HashCache, file_digest, xxhash
+
+def make_jpegs(directory: str, count: int, size_mb: float):
+    """
+    Random payloads framed as JPEGs (SOI ... EOI); content is irrelevant to hashing cost.
+    """
+    size = int(size_mb * (1 << 20))
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"img_{i:04d}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"\xff\xd8\xff\xe0" + os.urandom(size - 6) + b"\xff\xd9")
+        paths.append(path)
+    return paths
+
+def legacy_md5(path: str) -> str:
+    """
+    The previous UniquePackGenerator._get_file_hash: whole file in memory.
+    """
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+def timed(fn, paths):
+    start = time.perf_counter()
+    for p in paths:
+        fn(p)
+    elapsed = time.perf_counter() - start
+    total_mb = sum(os.path.getsize(p) for p in paths) / (1 << 20)
+    return {"sec": round(elapsed, 4), "mb_per_sec": round(total_mb / elapsed, 1) if elapsed else None}
+
+def main():
+    parser = argparse.ArgumentParser(description="Asset hashing throughput: legacy full-read MD5 vs streamed digests vs the hash cache")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_hashing_")
+    try:
+        paths = make_jpegs(workdir, args.count, args.size_mb)
+        algorithms = ["md5", "sha1", "blake2b"] + (["xxh3_128", "xxh64"] if xxhash else [])
+        report = {"files": args.count, "size_mb": args.size_mb, "legacy_md5_full_read": timed(legacy_md5, paths)}
+        for algorithm in algorithms:
+            report[f"streamed_{algorithm}"] = timed(lambda p: file_digest(p, algorithm), paths)
+
+        cache = HashCache(os.path.join(workdir, "hashes.db"))
+        report["cache_cold"] = timed(cache.digest, paths)
+        report["cache_warm"] = timed(cache.digest, paths)
+        report["cache"] = cache.stats()
+        cache.close()
+        print(json.dumps(report, indent=2))
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import sys
+import os
+import re
+import json
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from app.ads.dom_utils import HtmlDocument, DEFAULT_PARSER
+from app.ads.linter import AdsLinter
+from app.seo.validator import SEOValidator
+
+CONFIG = {"ads_ux": {"rules": {"min_distance_from_cta_px": 120, "forbid_near_elements": ["button", "input", "select"]}}}
+
+def load_pages(directory: str):
+    pages = []
+    for root, dirs, names in os.walk(directory):
+        dirs.sort()
+        for name in sorted(names):
+            if name.lower().endswith((".html", ".htm")):
+                with open(os.path.join(root, name), "r", encoding="utf-8", errors="replace") as f:
+                    pages.append(f.read())
+    return pages
+
+def synthetic_pages(count: int, blocks: int, seed: int = 0):
+    """
+    Long rendered posts: head tags, paragraphs, product cards with CTAs and ads.
+    """
+    rng = random.Random(seed)
+    head = ('<head><link rel="canonical" href="https://example.com/p"><meta name="description" content="d">'
+            '<meta property="og:title" content="t"><script type="application/ld+json">{}</script></head>')
+    pages = []
+    for _ in range(count):
+        body = []
+        for i in range(blocks):
+            kind = rng.random()
+            if kind < 0.6:
+                body.append(f"<p>{'본문 내용 ' * rng.randint(10, 40)}</p>")
+            elif kind < 0.9:
+                body.append(f'<div class="card"><h3>상품 {i}</h3><p>설명</p><a class="cta-button" href="#">구매</a></div>')
+            else:
+                body.append('<div class="ad-unit">Ad</div>')
+        pages.append(f"<html>{head}<body><article>{''.join(body)}</article></body></html>")
+    return pages
+
+def legacy_checks(html: str):
+    """
+    The previous pipeline: the linter parsed the page twice with html.parser and
+    scanned every sibling of every ad; the SEO check regex-scanned the raw HTML.
+    """
+    found = {}
+    for name, selectors in (("ads", [".ad-unit", "ins.adsbygoogle", ".cos-ad"]),
+                            ("interactive", ["button", "input", "select", ".cta-button"])):
+        soup = BeautifulSoup(html, "html.parser")
+        found[name] = [el for selector in selectors for el in soup.select(selector)]
+    for ad in found["ads"]:
+        for sibling in ad.find_next_siblings() + ad.find_previous_siblings():
+            sibling.name in ("button", "input", "select") or "cta-button" in sibling.get("class", [])
+    for pattern in (r'<link rel="canonical"', r'property="og:', r'<meta name="description"', r'type="application/ld\+json"'):
+        re.search(pattern, html)
+
+def shared_checks(html: str, linter: AdsLinter, validator: SEOValidator):
+    doc = HtmlDocument(html)
+    linter.lint(doc)
+    validator.validate_technical_seo(doc)
+
+def timed(fn, pages) -> float:
+    start = time.perf_counter()
+    for page in pages:
+        fn(page)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse-once HTML checks vs the previous parse-per-call pipeline")
+    parser.add_argument("--dir", help="Directory of rendered post HTML files")
+    parser.add_argument("--count", type=int, default=50, help="Synthetic pages when --dir is not given")
+    parser.add_argument("--blocks", type=int, default=400, help="Content blocks per synthetic page")
+    args = parser.parse_args()
+
+    pages = load_pages(args.dir) if args.dir else synthetic_pages(args.count, args.blocks)
+    linter, validator = AdsLinter(CONFIG), SEOValidator({})
+    parse_only = timed(lambda html: HtmlDocument(html), pages)
+    shared = timed(lambda html: shared_checks(html, linter, validator), pages)
+    legacy = timed(legacy_checks, pages)
+    print(json.dumps({
+        "pages": len(pages),
+        "avg_kb": round(sum(len(p) for p in pages) / len(pages) / 1024, 1),
+        "parser": DEFAULT_PARSER,
+        "parse_ms_per_page": round(parse_only / len(pages) * 1000, 2),
+        "shared_document_ms_per_page": round(shared / len(pages) * 1000, 2),
+        "legacy_ms_per_page": round(legacy / len(pages) * 1000, 2)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import sys
+import os
+import json
+import time
+import resource
+import argparse
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.metrics.pairwise import cosine_similarity
+from app.seo.neighbors import NeighborIndex
+
+def synthetic_posts(n: int, vocab_size: int = 50000, seed: int = 0):
+    """
+    Title/summary/keyword-sized texts (8-24 words) over a Zipf-distributed
+    vocabulary, so a few terms are shared widely as in real archives.
+    """
+    rng = np.random.default_rng(seed)
+    ranks = np.arange(1, vocab_size + 1)
+    weights = 1.0 / ranks
+    weights /= weights.sum()
+    lengths = rng.integers(8, 25, size=n)
+    words = rng.choice(vocab_size, size=int(lengths.sum()), p=weights)
+    texts, pos = [], 0
+    for length in lengths:
+        texts.append(" ".join(f"w{w}" for w in words[pos:pos + length]))
+        pos += length
+    return texts
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def bench(n: int, k: int, max_cells: int, dense_max: int, add: int) -> dict:
+    texts = synthetic_posts(n + add)
+    report = {"posts": n, "k": k, "max_cells": max_cells}
+
+    start = time.perf_counter()
+    index = NeighborIndex(k, max_cells, {"max_df": 0.5}).fit(texts[:n])
+    report["blocked_sec"] = round(time.perf_counter() - start, 3)
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    if add:
+        start = time.perf_counter()
+        changed = index.add(texts[n:])
+        report["incremental"] = {"added": add, "sec": round(time.perf_counter() - start, 3),
+                                 "existing_updated": int(len(changed))}
+
+    if n <= dense_max:
+        # The previous TopicClusterer: dense N x N matrix and a full argsort per row
+        start = time.perf_counter()
+        sims = cosine_similarity(index.matrix[:n])
+        for i in range(n):
+            order = np.argsort(sims[i])[::-1]
+            [j for j in order if j != i][:k]
+        report["dense_sec"] = round(time.perf_counter() - start, 3)
+        report["dense_matrix_mb"] = round(sims.nbytes / 2 ** 20, 1)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Blocked sparse top-k neighbours vs the dense N x N baseline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--max-cells", type=int, default=1 << 24, help="Similarities scored per block")
+    parser.add_argument("--dense-max", type=int, default=20000, help="Skip the dense baseline above this size")
+    parser.add_argument("--add", type=int, default=100, help="Posts added incrementally after the fit")
+    args = parser.parse_args()
+    for n in args.sizes:
+        print(json.dumps(bench(n, args.k, args.max_cells, args.dense_max, args.add)), flush=True)
+
+if __name__ == "__main__":
+    main()
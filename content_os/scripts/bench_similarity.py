@@ -0,0 +1,120 @@
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from app.eval.similarity import SimilarityEvaluator
+from app.eval.minhash import LSHIndex
+from app.storage.paragraph_index import ParagraphIndex
+from app.storage.repo import ContentRepo
+
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후"
+
+def synthetic_corpus(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(5000)]
+    return [" ".join(rng.choices(vocab, k=rng.randint(30, 80))) for _ in range(n)], vocab
+
+def make_queries(corpus, vocab, n: int, seed: int = 1):
+    """
+    Half edited copies of corpus paragraphs (0-30% of words replaced), half unrelated paragraphs.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for i in range(n):
+        if i % 2:
+            queries.append(" ".join(rng.choices(vocab, k=rng.randint(30, 80))))
+            continue
+        words = rng.choice(corpus).split()
+        rate = rng.uniform(0.0, 0.3)
+        queries.append(" ".join(rng.choice(vocab) if rng.random() < rate else w for w in words))
+    return queries
+
+def brute_force(queries, corpus):
+    """
+    Mirrors SimilarityEvaluator.calculate_similarity: refit TF-IDF, full cosine matrix.
+    """
+    vectorizer = TfidfVectorizer().fit(queries + corpus)
+    sims = cosine_similarity(vectorizer.transform(queries), vectorizer.transform(corpus))
+    best = sims.argmax(axis=1)
+    return best, sims[np.arange(len(queries)), best]
+
+def run(corpus, queries, configs, warn: float, reject: float):
+    evaluator = SimilarityEvaluator({"similarity": {"thresholds": {"warn": warn, "reject": reject}}})
+    start = time.perf_counter()
+    evaluator.calculate_similarity(queries, corpus)
+    brute_sec = time.perf_counter() - start
+    best, best_score = brute_force(queries, corpus)
+
+    workdir = tempfile.mkdtemp(prefix="bench_similarity_")
+    try:
+        index = ParagraphIndex(workdir, compact_threshold=len(corpus) + 1)
+        index.add_many((i, [p]) for i, p in enumerate(corpus))
+        index.compact()
+        signatures = np.asarray(index._signatures)
+        query_sigs = index.minhasher.signatures(queries)
+
+        report = {
+            "corpus_paragraphs": len(corpus),
+            "queries": len(queries),
+            "brute_force": {"total_sec": round(brute_sec, 4), "per_query_ms": round(brute_sec / len(queries) * 1000, 3)},
+            "lsh": []
+        }
+        for bands, rows in configs:
+            lsh = LSHIndex(bands, rows).build(signatures)
+            start = time.perf_counter()
+            query_keys = lsh.band_keys(index.minhasher.signatures(queries))
+            candidates = [lsh.query(keys) for keys in query_keys]
+            hits = index.search_candidates(queries, candidates, k=5)
+            lsh_sec = time.perf_counter() - start
+
+            recall = {}
+            for level, threshold in (("reject", reject), ("warn", warn)):
+                relevant = np.nonzero(best_score >= threshold)[0]
+                found = sum(1 for i in relevant if best[i] in candidates[i])
+                recall[level] = {"relevant": int(len(relevant)), "found": found,
+                                 "recall": round(found / len(relevant), 4) if len(relevant) else None}
+            report["lsh"].append({
+                "bands": bands,
+                "rows": rows,
+                "jaccard_threshold": round(lsh.threshold(), 3),
+                "avg_candidates": round(float(np.mean([len(c) for c in candidates])), 2),
+                "total_sec": round(lsh_sec, 4),
+                "per_query_ms": round(lsh_sec / len(queries) * 1000, 3),
+                "recall": recall,
+                "flagged": sum(1 for h in hits if h and h[0][1] >= warn)
+            })
+        return report
+    finally:
+        shutil.rmtree(workdir)
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/latency of the MinHash LSH pre-filter vs brute-force cosine similarity")
+    parser.add_argument("--db", help="Use paragraphs from this ContentRepo database instead of a synthetic corpus")
+    parser.add_argument("--corpus", type=int, default=20000, help="Synthetic corpus size (paragraphs)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--configs", default="16x8,20x5,32x4,64x2", help="Comma separated BANDSxROWS list")
+    parser.add_argument("--warn", type=float, default=0.80)
+    parser.add_argument("--reject", type=float, default=0.88)
+    args = parser.parse_args()
+
+    if args.db:
+        corpus = ContentRepo(args.db, use_index=False).get_all_paragraphs()
+        vocab = sorted({w for p in corpus for w in p.split()})
+    else:
+        corpus, vocab = synthetic_corpus(args.corpus)
+    queries = make_queries(corpus, vocab, args.queries)
+    configs = [tuple(int(x) for x in c.split("x")) for c in args.configs.split(",")]
+
+    print(json.dumps(run(corpus, queries, configs, args.warn, args.reject), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 import sys
 import os
 import json
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.seo.cluster import TopicClusterer
+from app.seo.cluster import TopicClusterer, save_clusters
 from app.seo.internal_links import InternalLinkRecommender
+from app.seo.link_planner import save_plan, load_plan
 
-def build_internal_links():
+PLAN_PATH = "./out/link_plan.json"
+
+def build_internal_links(posts_path=None, changed_ids=None, max_links=3, max_inbound=20):
     # Mock content list
     posts = [
         {"id": 1, "slug": "iphone-15-review", "title": "아이폰 15 리뷰", "summary": "애플 최신폰", "keywords": ["아이폰"]},
@@ -15,21 +19,37 @@ def build_internal_links():
         {"id": 4, "slug": "macbook-m3", "title": "맥북 M3 리뷰", "summary": "신형 노트북", "keywords": ["맥북"]},
         {"id": 5, "slug": "ipad-pro", "title": "아이패드 프로", "summary": "태블릿 추천", "keywords": ["아이패드"]}
     ]
+    if posts_path:
+        with open(posts_path, "r", encoding="utf-8") as f:
+            posts = json.load(f)
 
     config = {
         "internal_links": {
-            "max_links_per_post": 3
+            "max_links_per_post": max_links,
+            "max_inbound_per_post": max_inbound
         }
     }
 
-    clusterer = TopicClusterer()
-    recommender = InternalLinkRecommender(config)
-
+    clusterer = TopicClusterer(min_cluster_size=2)
     clustered = clusterer.cluster_posts(posts)
-    
-    results = []
-    for post in clustered:
-        results.append(recommender.recommend_links(post))
+
+    # Topic clusters and their pillar posts, persisted for the sitemap and later runs
+    clusters = clusterer.assign_clusters(clustered)
+    save_clusters(clusters, "./out/topic_clusters.json")
+    recommender = InternalLinkRecommender(config, clusters)
+
+    # Whole-site plan under inbound caps; with --changed, links not touching those posts are kept
+    post_ids = [p["id"] for p in clustered]
+    previous, changed = None, None
+    if changed_ids is not None:
+        previous = load_plan(PLAN_PATH, post_ids)
+    if previous is not None:
+        planned = {s for s, _, _ in previous}
+        wanted = {str(i) for i in changed_ids}
+        changed = [row for row, post_id in enumerate(post_ids) if str(post_id) in wanted or row not in planned]
+    plan = recommender.plan_site(clustered, clusterer.index.ids, clusterer.index.scores, previous, changed)
+    save_plan(plan["links"], post_ids, PLAN_PATH)
+    results = plan["results"]
 
     output_path = "./out/internal_links.json"
     os.makedirs("./out", exist_ok=True)
@@ -37,6 +57,14 @@ def build_internal_links():
         json.dump(results, f, indent=2, ensure_ascii=False)
 
     print(f"Internal link recommendations built and saved to {output_path}")
+    print(json.dumps(plan["stats"]))
 
 if __name__ == "__main__":
-    build_internal_links()
+    parser = argparse.ArgumentParser(description="Plan internal links for the whole site")
+    parser.add_argument("--posts", help="JSON list of posts (id, slug, title, summary, keywords)")
+    parser.add_argument("--changed", nargs="*",
+                        help="Ids of new or edited posts; keeps the rest of the previous plan")
+    parser.add_argument("--max-links", type=int, default=3)
+    parser.add_argument("--max-inbound", type=int, default=20)
+    args = parser.parse_args()
+    build_internal_links(args.posts, args.changed, args.max_links, args.max_inbound)
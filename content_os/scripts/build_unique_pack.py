@@ -2,12 +2,13 @@ import sys
 import os
 import json
 import yaml
+import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.pipeline.unique_pack import UniquePackGenerator
+from app.pipeline.unique_pack import UniquePackGenerator, load_manifest
 
-def build_unique_pack(sku, content_id):
+def make_config(workers=None):
     # Mock config
     config = {
         "content_sources": {
@@ -19,13 +20,35 @@ def build_unique_pack(sku, content_id):
             "outputs": {"package_dir": "./out/packages"}
         }
     }
-    
-    generator = UniquePackGenerator(config)
-    result = generator.process(sku, content_id)
+    if workers:
+        config["unique_pack"]["batch"] = {"workers": workers}
+    return config
+
+def build_unique_pack(sku, content_id, force=False):
+    generator = UniquePackGenerator(make_config())
+    result = generator.process(sku, content_id, force=force)
     print(json.dumps(result, indent=2, ensure_ascii=False))
 
+def build_from_manifest(manifest, workers=None, force=False):
+    """
+    Streams one JSON line per SKU as packages finish, then a stats line.
+    """
+    generator = UniquePackGenerator(make_config(workers))
+    for record in generator.process_batch(load_manifest(manifest), force=force):
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python scripts/build_unique_pack.py <sku> <content_id>")
+    parser = argparse.ArgumentParser(description="Build unique image/fact packages")
+    parser.add_argument("sku", nargs="?")
+    parser.add_argument("content_id", nargs="?")
+    parser.add_argument("--manifest", help="CSV (sku,content_id) or JSONL manifest for a batch run")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if inputs are unchanged")
+    args = parser.parse_args()
+
+    if args.manifest:
+        build_from_manifest(args.manifest, args.workers, args.force)
+    elif args.sku and args.content_id:
+        build_unique_pack(args.sku, args.content_id, args.force)
     else:
-        build_unique_pack(sys.argv[1], sys.argv[2])
+        parser.print_usage()
@@ -21,12 +21,12 @@ def check_one(file_path):
             "ignore_sections": ["가격", "배송", "옵션"]
         }
     }
-    evaluator = SimilarityEvaluator(config)
-    
-    existing_entries = repo.get_all_entries()
-    existing_contents = [e.content for e in existing_entries]
-    
-    result = evaluator.evaluate(content, existing_contents)
+    if not len(repo.index) and repo.count():
+        # Database predates the paragraph index
+        repo.rebuild_index()
+    evaluator = SimilarityEvaluator(config, index=repo.index)
+
+    result = evaluator.evaluate(content)
     print(json.dumps(result, indent=2, ensure_ascii=False))
 
 if __name__ == "__main__":
@@ -1,13 +1,15 @@
 import sys
 import os
 import csv
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.track.metrics import MetricsAggregator
+from app.track.event_collector import EventCollector
 
-def export_metrics():
+def export_metrics(start: str = None, end: str = None, channel: str = None):
     agg = MetricsAggregator()
-    summary = agg.get_summary_by_content()
+    summary = agg.get_summary_by_content(start=start, end=end, channel=channel)
     
     output_dir = "./out"
     os.makedirs(output_dir, exist_ok=True)
@@ -26,4 +28,12 @@ def export_metrics():
     print(f"Metrics exported to {output_file}")
 
 if __name__ == "__main__":
-    export_metrics()
+    parser = argparse.ArgumentParser(description="Export per-content metrics to out/metrics.csv")
+    parser.add_argument("--start", help="Inclusive start, e.g. 2024-05-01 or '2024-05-01 09:00:00' (UTC)")
+    parser.add_argument("--end", help="Exclusive end")
+    parser.add_argument("--channel")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute rollups from raw events first")
+    args = parser.parse_args()
+    if args.rebuild:
+        EventCollector().rebuild_rollups()
+    export_metrics(args.start, args.end, args.channel)
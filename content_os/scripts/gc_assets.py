@@ -0,0 +1,27 @@
+import sys
+import os
+import json
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pipeline.asset_store import AssetStore, referenced_digests
+
+def gc_assets(store_root, packages_dirs, min_age_sec=3600, dry_run=False):
+    store = AssetStore(store_root)
+    referenced = referenced_digests(packages_dirs)
+    result = store.gc(referenced, min_age_sec=min_age_sec, dry_run=dry_run)
+    result["referenced"] = len(referenced)
+    print(json.dumps(result, indent=2))
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete asset store blobs no package references")
+    parser.add_argument("--store", default="./out/assets", help="Asset store root")
+    parser.add_argument("--packages", nargs="+", default=["./out/packages"],
+                        help="Package directories whose assets.json files are scanned")
+    parser.add_argument("--min-age", type=float, default=3600,
+                        help="Keep blobs younger than this many seconds (packs still being built)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    args = parser.parse_args()
+    gc_assets(args.store, args.packages, args.min_age, args.dry_run)
@@ -1,20 +1,42 @@
 import sys
 import os
+import json
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.storage.repo import ContentRepo
-from app.storage.models import ContentEntry
-from app.eval.similarity import SimilarityEvaluator
+from app.storage.ingest import BulkIngester
 
-def index_existing():
-    repo = ContentRepo()
-    evaluator = SimilarityEvaluator({}) # Default config
-    
-    # Example: Indexing some sample files if they existed
-    # For now, we just ensure the DB is ready.
-    print("Indexing existing content into blogs.db...")
-    entries = repo.get_all_entries()
-    print(f"Current index size: {len(entries)} documents.")
+CONFIG = {
+    "similarity": {
+        "thresholds": {"warn": 0.80, "reject": 0.88},
+        "ignore_sections": ["가격", "배송", "옵션"]
+    }
+}
+
+def index_existing(path: str, db_path: str = "blogs.db", workers: int = None, batch_size: int = 500,
+                   checkpoint: str = None, restart: bool = False):
+    repo = ContentRepo(db_path)
+    checkpoint = checkpoint or os.path.splitext(db_path)[0] + ".ingest.json"
+    if restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    print(f"Indexing {path} into {db_path} (checkpoint: {checkpoint})...", file=sys.stderr)
+    ingester = BulkIngester(repo, CONFIG, workers=workers, batch_size=batch_size, checkpoint_path=checkpoint)
+    report = ingester.run(path, progress=lambda r: print(
+        f"  {r['consumed']} docs, {r['ingested']} ingested, {r['duplicates']} duplicates, {r['docs_per_sec']} docs/sec",
+        file=sys.stderr
+    ))
+    report["total_documents"] = repo.count()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
 
 if __name__ == "__main__":
-    index_existing()
+    parser = argparse.ArgumentParser(description="Bulk-load Markdown/HTML files or a WordPress WXR export into blogs.db")
+    parser.add_argument("path", help="Directory of .md/.html files, or a .xml WXR export")
+    parser.add_argument("--db", default="blogs.db")
+    parser.add_argument("--workers", type=int, help="Paragraph splitting processes (default: CPU count, 0 = inline)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Posts per transaction")
+    parser.add_argument("--checkpoint", help="Resume file (default: <db name>.ingest.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+    index_existing(args.path, args.db, args.workers, args.batch_size, args.checkpoint, args.restart)
@@ -5,6 +5,8 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.ads.linter import AdsLinter
+from app.ads.dom_utils import HtmlDocument
+from app.seo.validator import SEOValidator
 
 def lint_html(file_path: str):
     if not os.path.exists(file_path):
@@ -23,12 +25,17 @@ def lint_html(file_path: str):
         }
     }
 
+    # Parsed once, shared by every check
+    doc = HtmlDocument(html)
     linter = AdsLinter(config)
-    report = linter.lint(html)
+    report = linter.lint(doc)
 
     print("--- Ads UX Lint Report ---")
     print(json.dumps(report, indent=2, ensure_ascii=False))
 
+    print("--- Technical SEO Report ---")
+    print(json.dumps(SEOValidator(config).validate_technical_seo(doc), indent=2, ensure_ascii=False))
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         # Create a dummy file for testing if none provided
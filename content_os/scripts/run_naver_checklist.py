@@ -1,6 +1,7 @@
 import sys
 import os
 import json
+import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -50,5 +51,23 @@ def run_naver_checklist():
     else:
         print("\n⚠️  Overall Status: IMPROVEMENTS NEEDED")
 
+def run_batch(path: str):
+    """
+    Validates every post of a JSON Lines file (one content dict per line).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        posts = [json.loads(line) for line in f if line.strip()]
+    report = NaverValidator().validate_batch(posts)
+    for i, result in enumerate(report["results"]):
+        if not result["valid"]:
+            print(f"#{i}: {'; '.join(result['violations'])}")
+    print(json.dumps(report["summary"], indent=2))
+
 if __name__ == "__main__":
-    run_naver_checklist()
+    parser = argparse.ArgumentParser(description="Naver exposure checklist")
+    parser.add_argument("--batch", help="JSON Lines file of posts to validate instead of the sample post")
+    args = parser.parse_args()
+    if args.batch:
+        run_batch(args.batch)
+    else:
+        run_naver_checklist()